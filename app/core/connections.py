@@ -0,0 +1,186 @@
+"""Client construction and startup connection management.
+
+Every MongoDB and Redis client (worker and scripts) is built here so pool
+sizes, timeouts and wire compression come from ``Settings`` in one place.
+``ConnectionManager`` connects the worker's backends concurrently, retrying
+each with jittered exponential backoff, and records how long each took.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def mongo_client_options() -> Dict:
+    """Pool, timeout and compression options for MongoDB clients."""
+    options = {
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "maxIdleTimeMS": settings.mongodb_max_idle_time_ms,
+        "connectTimeoutMS": settings.mongodb_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+    }
+    if settings.mongodb_socket_timeout_ms:
+        options["socketTimeoutMS"] = settings.mongodb_socket_timeout_ms
+    if settings.mongodb_compressors:
+        # zstd needs the 'zstandard' package; pymongo skips unavailable compressors
+        options["compressors"] = settings.mongodb_compressors
+    return options
+
+
+def create_mongo_client(url: Optional[str] = None):
+    """Create a MongoDB client with the configured pool.
+
+    Args:
+        url: Connection URL (default: settings.mongodb_url)
+
+    Returns:
+        AsyncIOMotorClient
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    return AsyncIOMotorClient(url or settings.mongodb_url, **mongo_client_options())
+
+
+def redis_client_options() -> Dict:
+    """Pool and timeout options for Redis clients."""
+    return {
+        "max_connections": settings.redis_max_connections,
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_connect_timeout,
+        "socket_keepalive": True,
+        "health_check_interval": settings.redis_health_check_interval,
+    }
+
+
+def create_redis_client(url: Optional[str] = None):
+    """Create a Redis client with the configured pool.
+
+    Values are binary (see RedisCodec), so responses are not decoded.
+
+    Args:
+        url: Connection URL (default: settings.redis_url)
+
+    Returns:
+        redis.asyncio.Redis
+    """
+    import redis.asyncio as redis
+
+    return redis.from_url(url or settings.redis_url, decode_responses=False, **redis_client_options())
+
+
+class ConnectionManager:
+    """Connect backends concurrently with jittered retry."""
+
+    def __init__(
+        self,
+        attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+    ):
+        """Initialize manager (defaults from settings.connect_retry_*).
+
+        Args:
+            attempts: Connection attempts per backend
+            base_delay: Backoff before the second attempt in seconds
+            max_delay: Upper bound on a single backoff in seconds
+        """
+        self.attempts = attempts or settings.connect_retry_attempts
+        self.base_delay = base_delay or settings.connect_retry_base_delay
+        self.max_delay = max_delay or settings.connect_retry_max_delay
+        self.results: Dict[str, Dict] = {}
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def connect(self, name: str, connect: Callable[[], Awaitable]):
+        """Connect one backend, retrying failures.
+
+        Args:
+            name: Backend name for logs and stats
+            connect: Coroutine function establishing the connection
+
+        Raises:
+            The last connection error once all attempts have failed
+        """
+        start = time.perf_counter()
+        for attempt in range(1, self.attempts + 1):
+            attempt_start = time.perf_counter()
+            try:
+                await connect()
+            except Exception as e:
+                if attempt == self.attempts:
+                    self.results[name] = {
+                        "connected": False,
+                        "attempts": attempt,
+                        "total_seconds": time.perf_counter() - start,
+                        "error": str(e),
+                    }
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(
+                    f"Connecting to {name} failed (attempt {attempt}/{self.attempts}): {e}; "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.results[name] = {
+                "connected": True,
+                "attempts": attempt,
+                "connect_seconds": time.perf_counter() - attempt_start,
+                "total_seconds": time.perf_counter() - start,
+            }
+            logger.info(f"Connected to {name} in {self.results[name]['total_seconds']:.3f}s")
+            return
+
+    async def connect_all(
+        self,
+        backends: Dict[str, Callable[[], Awaitable]],
+        disconnects: Optional[Dict[str, Callable[[], Awaitable]]] = None,
+    ):
+        """Connect all backends concurrently.
+
+        Args:
+            backends: Connect coroutine function per backend name
+            disconnects: Disconnect coroutine function per backend name, used to
+                close the backends that did connect when another one failed
+
+        Raises:
+            The first backend's error if any backend could not connect
+        """
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *[self.connect(name, connect) for name, connect in backends.items()],
+            return_exceptions=True,
+        )
+        logger.info(f"Connected {len(backends)} backends in {time.perf_counter() - start:.3f}s")
+
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if not errors:
+            return
+
+        for name, outcome in zip(backends, outcomes):
+            if isinstance(outcome, BaseException) or name not in (disconnects or {}):
+                continue
+            try:
+                await disconnects[name]()
+            except Exception as e:
+                logger.warning(f"Error closing {name} after a failed startup: {e}")
+        raise errors[0]
+
+    def stats(self) -> Dict[str, Dict]:
+        """Connect latency and attempts per backend."""
+        return dict(self.results)
+
+
+# Global connection manager instance
+connection_manager = ConnectionManager()
@@ -1,8 +1,12 @@
 """Database connections and utilities."""
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from app.core.config import get_settings
+from app.core.connections import create_mongo_client
+
+if TYPE_CHECKING:
+    # motor is imported when the client is created (see create_mongo_client)
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 settings = get_settings()
 
@@ -10,12 +14,19 @@ settings = get_settings()
 class MongoDB:
     """MongoDB connection manager."""
 
-    client: Optional[AsyncIOMotorClient] = None
-    db: Optional[AsyncIOMotorDatabase] = None
+    client: Optional["AsyncIOMotorClient"] = None
+    db: Optional["AsyncIOMotorDatabase"] = None
 
     async def connect(self):
-        """Connect to MongoDB."""
-        self.client = AsyncIOMotorClient(settings.mongodb_url)
+        """Connect to MongoDB (pool options from settings) and verify with a ping."""
+        client = create_mongo_client()
+        try:
+            await client.admin.command("ping")
+        except Exception:
+            client.close()
+            raise
+
+        self.client = client
         self.db = self.client[settings.mongodb_db_name]
         print(f"Connected to MongoDB at {settings.mongodb_url}")
 
@@ -40,8 +51,17 @@ class MongoDB:
         await self.db.knowledge_base.create_index([("id", 1)], unique=True)
 
         # Medical reports indexes
-        await self.db.medical_reports.create_index([("user_id", 1), ("created_at", -1)])
+        # report_id is a tie-breaker for keyset pagination of user listings
+        await self.db.medical_reports.create_index(
+            [("user_id", 1), ("created_at", -1), ("report_id", -1)]
+        )
         await self.db.medical_reports.create_index([("report_id", 1)], unique=True)
+        await self.db.medical_reports.create_index([("created_at", -1)])
+
+        # The old (user_id, created_at) index is a prefix of the pagination index;
+        # drop it on existing deployments so inserts stop maintaining both
+        if "user_id_1_created_at_-1" in await self.db.medical_reports.index_information():
+            await self.db.medical_reports.drop_index("user_id_1_created_at_-1")
 
         print("Database indexes created successfully")
 
@@ -50,7 +70,7 @@ class MongoDB:
 mongodb = MongoDB()
 
 
-async def get_database() -> AsyncIOMotorDatabase:
+async def get_database() -> "AsyncIOMotorDatabase":
     """Get database instance."""
     if mongodb.db is None:
         await mongodb.connect()
@@ -12,7 +12,11 @@ from app.models.schemas import (
     CategoryReportItem,
     MedicalReport,
     KnowledgeBaseItem,
+    KnowledgeBaseImportResult,
     CategoryReport,
+    MultiCategoryReport,
+    CategoryPreface,
+    ReportPersonalization,
     ReportRequest,
 )
 
@@ -28,6 +32,10 @@ __all__ = [
     "CategoryReportItem",
     "MedicalReport",
     "KnowledgeBaseItem",
+    "KnowledgeBaseImportResult",
     "CategoryReport",
+    "MultiCategoryReport",
+    "CategoryPreface",
+    "ReportPersonalization",
     "ReportRequest",
 ]
@@ -79,6 +79,7 @@ class CategoryReportItem(BaseModel):
     category: str
     text: str
     sources: List[str]
+    preface: Optional[str] = None  # patient-tailored intro (two-stage generation)
 
 
 class MedicalReport(BaseModel):
@@ -110,14 +111,50 @@ class KnowledgeBaseItem(BaseModel):
     status: str
 
 
+class KnowledgeBaseImportResult(BaseModel):
+    """Outcome of a knowledge base import."""
+
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    @property
+    def total(self) -> int:
+        """Number of items present after the import."""
+        return self.added + self.changed + self.unchanged
+
+
 class CategoryReport(BaseModel):
-    """AI-generated category report."""
+    """AI-generated category report (sources are added from the KB items used)."""
 
     category: str = Field(description="The category of the report")
     text: str = Field(
         description="The one-page friendly report text with inline source links"
     )
-    sources: List[str] = Field(description="List of source URLs used")
+
+
+class MultiCategoryReport(BaseModel):
+    """AI-generated reports for several categories in one response."""
+
+    reports: List[CategoryReport] = Field(
+        description="One report per requested category, in the requested order"
+    )
+
+
+class CategoryPreface(BaseModel):
+    """AI-generated personalized preface for one category guide."""
+
+    category: str = Field(description="The category the preface introduces")
+    text: str = Field(description="Short preface tailored to the patient")
+
+
+class ReportPersonalization(BaseModel):
+    """AI-generated prefaces personalizing cached category guides."""
+
+    prefaces: List[CategoryPreface] = Field(
+        description="One preface per requested category, in the requested order"
+    )
 
 
 class ReportRequest(BaseModel):
@@ -179,6 +216,20 @@ class ReportGenerationResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ReportProgressMessage(BaseModel):
+    """RabbitMQ progress message published while a report is generated."""
+
+    request_id: str = Field(description="Original request identifier")
+    user_id: str = Field(description="User identifier")
+    status: str = Field(default="processing", description="Always 'processing'")
+    progress: int = Field(description="Estimated completion percentage (0-99)")
+    category: Optional[str] = Field(default=None, description="Category being generated")
+    category_report: Optional[CategoryReportItem] = Field(
+        default=None, description="Completed category report, sent once per category"
+    )
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
 # MongoDB Storage Schemas
 
 class StoredUser(BaseModel):
@@ -201,3 +252,5 @@ class StoredReport(BaseModel):
     generation_time_seconds: Optional[float] = None
     tokens_used: Optional[int] = None
     estimated_cost: Optional[float] = None
+    token_usage: Optional[dict] = None  # prompt/completion/cached tokens, per model
+    output_lengths: Optional[dict] = None  # requested vs actual words per category
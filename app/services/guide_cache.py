@@ -0,0 +1,65 @@
+"""Cache of generic category guides for two-stage generation.
+
+A guide is the report generated from a category's full KB content, with no
+patient data in the prompt, so it can be shared by every request for that
+category. Keys include a version derived from the KB content, the prompt and
+the model, so editing the KB or the prompt naturally misses the cache.
+
+Guides are read on every two-stage request and rarely change, so they are
+served through the two-tier cache (in-process LRU in front of Redis).
+"""
+
+import logging
+from typing import Dict, Optional
+
+from app.services.two_tier_cache import TwoTierCache, two_tier_cache
+
+logger = logging.getLogger(__name__)
+
+GUIDE_NAMESPACE = "guide"
+
+
+class GuideCache:
+    """Generated category guides, keyed by category and version."""
+
+    def __init__(self, cache: Optional[TwoTierCache] = None):
+        """Initialize cache.
+
+        Args:
+            cache: Two-tier cache (default: the global instance); the Redis
+                TTL is its "guide" namespace TTL (settings.guide_cache_ttl_seconds)
+        """
+        self.cache = cache or two_tier_cache
+
+    @staticmethod
+    def key(category: str, version: str) -> str:
+        """Key of one guide version within the guide namespace."""
+        return f"{category}:{version}"
+
+    async def get_many(self, versions: Dict[str, str]) -> Dict[str, Dict]:
+        """Look up cached guides.
+
+        Args:
+            versions: Guide version per category
+
+        Returns:
+            Cached guide (CategoryReportItem dict) per category found
+        """
+        keys = {category: self.key(category, version) for category, version in versions.items()}
+        cached = await self.cache.get_many(GUIDE_NAMESPACE, keys.values())
+        return {category: cached[key] for category, key in keys.items() if key in cached}
+
+    async def set_many(self, versions: Dict[str, str], guides: Dict[str, Dict]):
+        """Store generated guides in one round trip (best effort).
+
+        Args:
+            versions: Guide version per category
+            guides: CategoryReportItem dict per category
+        """
+        try:
+            await self.cache.set_many(
+                GUIDE_NAMESPACE,
+                {self.key(category, versions[category]): guide for category, guide in guides.items()},
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache guides for {', '.join(guides)}: {e}")
@@ -0,0 +1,158 @@
+"""Hedged LLM requests to cut tail latency.
+
+A call that has not finished by the observed latency percentile for its key
+gets a second, concurrent request (to the same or a faster fallback model);
+whichever finishes first wins and the other is cancelled. Hedges are capped
+to a fraction of calls so the extra cost stays bounded; the cancelled call
+records its estimated usage, so the cost totals include it. Only the primary
+call's own completion times feed the percentile.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Latency samples kept per key
+LATENCY_WINDOW = 200
+
+
+class LatencyTracker:
+    """Rolling latency samples and percentiles per key."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """Initialize tracker.
+
+        Args:
+            window: Number of recent samples kept per key
+        """
+        self.samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, key: str, seconds: float):
+        """Record a call latency."""
+        self.samples[key].append(seconds)
+
+    def percentile(self, key: str, p: float, min_samples: int = 1) -> Optional[float]:
+        """Get a latency percentile, or None with too few samples.
+
+        Args:
+            key: Latency key (e.g. category name)
+            p: Percentile in [0, 1]
+            min_samples: Samples required before a percentile is reported
+        """
+        samples = self.samples.get(key)
+        if not samples or len(samples) < min_samples:
+            return None
+
+        ordered = sorted(samples)
+        index = min(math.ceil(p * len(ordered)) - 1, len(ordered) - 1)
+        return ordered[max(index, 0)]
+
+
+class HedgingPolicy:
+    """Run calls with a budget-capped hedge after the latency percentile."""
+
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        max_fraction: Optional[float] = None,
+        min_samples: Optional[int] = None,
+    ):
+        """Initialize policy.
+
+        Args:
+            percentile: Latency percentile that triggers a hedge
+            max_fraction: Max share of calls that may be hedged
+            min_samples: Samples per key required before hedging
+        """
+        self.percentile = percentile or settings.hedge_percentile
+        self.max_fraction = settings.hedge_max_fraction if max_fraction is None else max_fraction
+        self.min_samples = settings.hedge_min_samples if min_samples is None else min_samples
+        self.latencies = LatencyTracker()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.cancelled = 0
+
+    def _hedge_allowed(self) -> bool:
+        """Check the hedge budget."""
+        return (self.hedges + 1) <= self.max_fraction * self.calls
+
+    async def run(
+        self,
+        key: str,
+        primary: Callable[[], Awaitable[T]],
+        hedge: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Run a call, hedging it if it is slow.
+
+        Args:
+            key: Latency key (calls with the same key share a percentile)
+            primary: Factory for the primary call
+            hedge: Factory for the hedge call
+
+        Returns:
+            Result of whichever call finished first
+        """
+        self.calls += 1
+        start = time.monotonic()
+        threshold = self.latencies.percentile(key, self.percentile, self.min_samples)
+
+        primary_task = asyncio.ensure_future(primary())
+        tasks = [primary_task]
+        try:
+            if threshold is not None:
+                done, _ = await asyncio.wait({primary_task}, timeout=threshold)
+                if not done and self._hedge_allowed():
+                    self.hedges += 1
+                    logger.info(f"Hedging {key} after {threshold:.2f}s ({self.hedges}/{self.calls} calls hedged)")
+                    tasks.append(asyncio.ensure_future(hedge()))
+
+            if len(tasks) == 1:
+                result = await primary_task
+                self.latencies.record(key, time.monotonic() - start)
+                return result
+
+            hedge_task = tasks[1]
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            # The primary's own latency is unknown; recording the
+                            # hedged time would pull down the next hedge delay
+                            self.hedge_wins += 1
+                        else:
+                            self.latencies.record(key, time.monotonic() - start)
+                        return task.result()
+                    if not pending:
+                        raise task.exception()
+        finally:
+            # Cancel the loser (or everything, if this call was cancelled) and
+            # wait for it, so its usage is recorded before the caller moves on
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                self.cancelled += len(losers)
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Hedging counters."""
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "cancelled": self.cancelled,
+            "hedge_fraction": (self.hedges / self.calls) if self.calls else 0.0,
+        }
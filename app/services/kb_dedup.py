@@ -0,0 +1,205 @@
+"""Near-duplicate paragraph elimination across knowledge base items.
+
+KB files in the same category often repeat the same guidance. At import
+time every paragraph (a line or bullet of normalized content) is shingled
+and MinHashed; LSH banding finds candidate pairs, and a paragraph whose
+estimated Jaccard similarity with an earlier one reaches the threshold is
+dropped. The kept paragraph is annotated with the sources of the dropped
+copies so attribution survives.
+"""
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+_WORD = re.compile(r"[a-z0-9]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+# Mersenne prime used by the universal hash family
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingle_hashes(text: str, size: int = 3) -> Set[int]:
+    """Hash the word shingles of a paragraph."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    return {
+        int.from_bytes(
+            hashlib.blake2b(" ".join(words[i:i + size]).encode(), digest_size=4).digest(),
+            "big",
+        )
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """MinHash signatures with LSH banding."""
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        """Initialize hash permutations.
+
+        Args:
+            num_perm: Signature length
+            bands: LSH bands (num_perm must be divisible by bands)
+            seed: Seed for the permutation coefficients
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.coefficients = [
+            (rng.randint(1, _PRIME - 1), rng.randint(0, _PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, shingles: Set[int]) -> Tuple[int, ...]:
+        """Compute the MinHash signature of a shingle set."""
+        return tuple(
+            min(((a * s + b) % _PRIME) & _MAX_HASH for s in shingles)
+            for a, b in self.coefficients
+        )
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """Split a signature into hashable LSH band keys."""
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimate Jaccard similarity from two signatures."""
+        return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def find_near_duplicates(
+    paragraphs: List[str],
+    threshold: Optional[float] = None,
+    min_words: int = 8,
+    hasher: Optional[MinHasher] = None,
+) -> Dict[int, int]:
+    """Find paragraphs that near-duplicate an earlier paragraph.
+
+    Args:
+        paragraphs: Paragraph texts in priority order (earlier ones are kept)
+        threshold: Estimated Jaccard similarity at or above which two
+            paragraphs are duplicates (default: settings.kb_dedup_threshold)
+        min_words: Shorter paragraphs (headings, labels) are never collapsed
+        hasher: MinHasher to use
+
+    Returns:
+        Mapping of duplicate paragraph index to the kept paragraph index
+    """
+    threshold = settings.kb_dedup_threshold if threshold is None else threshold
+    hasher = hasher or MinHasher()
+
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    signatures: Dict[int, Tuple[int, ...]] = {}
+    duplicates: Dict[int, int] = {}
+
+    for index, paragraph in enumerate(paragraphs):
+        if len(paragraph.split()) < min_words:
+            continue
+
+        signature = hasher.signature(shingle_hashes(paragraph))
+        keys = hasher.band_keys(signature)
+
+        candidates = {other for key in keys for other in buckets.get(key, [])}
+        best = None
+        for other in sorted(candidates):
+            if hasher.similarity(signature, signatures[other]) >= threshold:
+                best = other
+                break
+
+        if best is not None:
+            duplicates[index] = best
+            continue
+
+        # Only kept paragraphs are indexed, so duplicates chain to the original
+        signatures[index] = signature
+        for key in keys:
+            buckets[key].append(index)
+
+    return duplicates
+
+
+def deduplicate_documents(docs: List[Dict], threshold: Optional[float] = None) -> Dict[str, int]:
+    """Collapse near-duplicate paragraphs across the KB items of each category.
+
+    Reads ``normalized_content`` and sets ``deduplicated_content`` and
+    ``duplicate_paragraphs`` on every document. Items are processed in list
+    order, so earlier items keep their paragraphs.
+
+    Args:
+        docs: KB documents (mutated in place)
+        threshold: Similarity threshold (default: settings.kb_dedup_threshold)
+
+    Returns:
+        Number of paragraphs removed per category
+    """
+    by_category: Dict[str, List[Dict]] = defaultdict(list)
+    for doc in docs:
+        by_category[doc["category"]].append(doc)
+
+    removed: Dict[str, int] = {}
+    hasher = MinHasher()
+
+    for category, category_docs in by_category.items():
+        # (doc index, line index, text) for every line in the category
+        lines = []
+        doc_lines = []
+        for doc_index, doc in enumerate(category_docs):
+            content_lines = doc["normalized_content"].split("\n")
+            doc_lines.append(content_lines)
+            lines.extend((doc_index, line_index, line) for line_index, line in enumerate(content_lines))
+
+        duplicates = find_near_duplicates([text for _, _, text in lines], threshold, hasher=hasher)
+
+        dropped: Dict[int, Set[int]] = defaultdict(set)
+        also_in: Dict[int, List[str]] = defaultdict(list)
+        duplicate_records: Dict[int, List[Dict]] = defaultdict(list)
+
+        for duplicate, original in duplicates.items():
+            dup_doc, dup_line, _ = lines[duplicate]
+            orig_doc, _, _ = lines[original]
+            dropped[dup_doc].add(dup_line)
+            duplicate_records[dup_doc].append({
+                "line": dup_line,
+                "duplicate_of": category_docs[orig_doc]["id"],
+            })
+
+            source_url = category_docs[dup_doc]["source_url"]
+            if dup_doc != orig_doc and source_url not in also_in[original]:
+                also_in[original].append(source_url)
+
+        line_offsets = {}
+        for flat_index, (doc_index, line_index, _) in enumerate(lines):
+            line_offsets[(doc_index, line_index)] = flat_index
+
+        for doc_index, doc in enumerate(category_docs):
+            kept = []
+            for line_index, line in enumerate(doc_lines[doc_index]):
+                if line_index in dropped[doc_index]:
+                    continue
+                sources = also_in.get(line_offsets[(doc_index, line_index)])
+                if sources:
+                    line = f"{line} [also: {', '.join(sources)}]"
+                kept.append(line)
+
+            doc["deduplicated_content"] = _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip() + "\n"
+            doc["duplicate_paragraphs"] = duplicate_records[doc_index]
+
+        removed[category] = len(duplicates)
+
+    return removed
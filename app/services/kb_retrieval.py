@@ -0,0 +1,272 @@
+"""Patient-relevant knowledge base retrieval.
+
+KB items are chunked at import time. The worker loads every chunk into an
+in-memory BM25 index per category and, for each request, keeps only the
+chunks that best match the patient's assessment, CVD risk factors, flagged
+labs and derived ``applies_to`` tags.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.models.schemas import ReportGenerationRequest
+
+settings = get_settings()
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have if in is it its of on or "
+    "that the their this to was were will with you your"
+    .split()
+)
+
+# applies_to tag -> phrases in the patient query that imply it
+TAG_KEYWORDS = {
+    "hypertension": ["blood pressure", "hypertension", "hypertensive"],
+    "cardiovascular_risk": ["cardiovascular", "heart attack", "heart disease", "cvd"],
+    "hyperlipidaemia": ["cholesterol", "ldl", "hdl", "lipid", "triglyceride"],
+    "overweight": ["overweight", "bmi", "waist"],
+    "obesity": ["obese", "obesity"],
+    "stroke_risk": ["stroke"],
+    "pregnancy": ["pregnant", "pregnancy", "breastfeeding"],
+    "first_nations": ["aboriginal", "torres strait", "first nations", "indigenous"],
+}
+
+# Tags that are always equivalent for eligibility
+TAG_ALIASES = {
+    "first_nations": {"aboriginal", "indigenous", "indigenous_health"},
+}
+
+# Lifestyle answers meaning the patient does not smoke / drink
+_NEGATIVE_ANSWER = re.compile(r"^\s*(never|no|none|non|does not|doesn't|nil|quit|ex)\b", re.IGNORECASE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def _is_heading(paragraph: str) -> bool:
+    """Guess whether a paragraph is a section heading."""
+    line = paragraph.strip()
+    return "\n" not in line and len(line) <= 80 and not line.endswith((".", ":", "!", "?"))
+
+
+def chunk_kb_content(content: str, max_words: Optional[int] = None) -> List[str]:
+    """Split KB content into section-aligned chunks of roughly max_words words.
+
+    Args:
+        content: Normalized markdown content
+        max_words: Soft word limit per chunk (default: settings.kb_chunk_words)
+
+    Returns:
+        List of chunk texts
+    """
+    max_words = max_words or settings.kb_chunk_words
+    chunks = []
+    current = []
+    current_words = 0
+
+    for paragraph in content.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        words = len(paragraph.split())
+        starts_section = _is_heading(paragraph) and current_words > 0
+
+        if current and (starts_section or current_words + words > max_words):
+            chunks.append("\n\n".join(current))
+            current, current_words = [], 0
+
+        current.append(paragraph)
+        current_words += words
+
+    if current:
+        chunks.append("\n\n".join(current))
+
+    return chunks
+
+
+def build_patient_query(request: ReportGenerationRequest) -> Tuple[str, Set[str]]:
+    """Build the retrieval query text and applies_to tags for a request.
+
+    Args:
+        request: Report generation request
+
+    Returns:
+        Tuple of (query text, applies_to tags)
+    """
+    parts = [request.assessment.summary]
+    lifestyle = request.assessment.lifestyle
+    parts.extend([lifestyle.diet, lifestyle.physical_activity])
+
+    if request.cvd_summary:
+        parts.extend(request.cvd_summary.modifiable_risk_factors)
+        parts.extend(request.cvd_summary.risk_reduction_advice)
+
+    parts.extend(
+        f"{lab.flag} {lab.test_name}"
+        for lab in request.labs
+        if lab.flag and lab.flag.lower() != "normal"
+    )
+    parts.extend(item.advice for item in request.plan)
+    parts.extend(flag.symptom for flag in request.red_flags)
+
+    query = " ".join(parts)
+    lowered = query.lower()
+
+    tags = {"all"}
+    for tag, phrases in TAG_KEYWORDS.items():
+        if any(phrase in lowered for phrase in phrases):
+            tags.add(tag)
+            tags |= TAG_ALIASES.get(tag, set())
+
+    if request.cvd_summary and request.cvd_summary.risk_level.lower() not in ("low", ""):
+        tags.add("cardiovascular_risk")
+    if lifestyle.smoking and not _NEGATIVE_ANSWER.match(lifestyle.smoking):
+        tags.add("smoker")
+        query += " " + lifestyle.smoking
+    if lifestyle.alcohol and not _NEGATIVE_ANSWER.match(lifestyle.alcohol):
+        tags.add("alcohol_risk")
+        query += " " + lifestyle.alcohol
+    if request.patient.age < 18:
+        tags.add("under18")
+
+    return query, tags
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, documents: Iterable[str], k1: float = 1.5, b: float = 0.75):
+        """Build the index.
+
+        Args:
+            documents: Document texts
+            k1: Term frequency saturation
+            b: Length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_freqs: List[Counter] = [Counter(tokenize(doc)) for doc in documents]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        doc_freqs = Counter()
+        for tf in self.term_freqs:
+            doc_freqs.update(tf.keys())
+        n = len(self.term_freqs)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freqs.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """Score every document against a query."""
+        terms = set(tokenize(query)) & self.idf.keys()
+        results = []
+
+        for tf, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            results.append(score)
+
+        return results
+
+
+class KnowledgeBaseRetriever:
+    """In-memory, per-category retrieval over chunked KB items."""
+
+    def __init__(self, items: List[Dict], top_k: Optional[int] = None, tag_boost: float = 1.0):
+        """Build per-category indexes.
+
+        Args:
+            items: KB documents with ``chunks`` (falls back to chunking content)
+            top_k: Chunks kept per category (default: settings.kb_retrieval_top_k)
+            tag_boost: Score added per patient tag matched by an item's applies_to
+        """
+        self.top_k = top_k or settings.kb_retrieval_top_k
+        self.tag_boost = tag_boost
+        self.items: Dict[str, List[Dict]] = defaultdict(list)
+        self.chunks: Dict[str, List[Tuple[int, int, str]]] = defaultdict(list)
+        self.indexes: Dict[str, BM25Index] = {}
+
+        for item in items:
+            category = item["category"]
+            item_index = len(self.items[category])
+            self.items[category].append(item)
+
+            chunks = item.get("chunks") or chunk_kb_content(
+                item.get("deduplicated_content")
+                or item.get("normalized_content")
+                or item["content"]
+            )
+            for chunk_index, chunk in enumerate(chunks):
+                self.chunks[category].append((item_index, chunk_index, chunk))
+
+        for category, chunks in self.chunks.items():
+            self.indexes[category] = BM25Index(chunk for _, _, chunk in chunks)
+
+    def _eligible(self, item: Dict, tags: Set[str]) -> bool:
+        """Check whether an item applies to a patient with the given tags."""
+        applies_to = set(item.get("applies_to") or ["all"])
+        return "all" in applies_to or bool(applies_to & tags)
+
+    def retrieve(self, category: str, query: str, tags: Set[str]) -> List[Tuple[Dict, List[str]]]:
+        """Select the top-k relevant chunks of a category.
+
+        Args:
+            category: KB category
+            query: Patient query text
+            tags: Patient applies_to tags
+
+        Returns:
+            List of (item, chunks) in original KB order
+        """
+        items = self.items.get(category, [])
+        if not items:
+            return []
+
+        eligible = {i for i, item in enumerate(items) if self._eligible(item, tags)}
+        if not eligible:
+            # Never drop a category the backend asked for
+            eligible = set(range(len(items)))
+
+        scores = self.indexes[category].scores(query)
+        ranked = []
+        for (item_index, chunk_index, chunk), score in zip(self.chunks[category], scores):
+            if item_index not in eligible:
+                continue
+            matched_tags = set(items[item_index].get("applies_to", [])) & (tags - {"all"})
+            ranked.append((score + self.tag_boost * len(matched_tags), item_index, chunk_index, chunk))
+
+        ranked.sort(key=lambda row: row[0], reverse=True)
+        selected = sorted(ranked[:self.top_k], key=lambda row: (row[1], row[2]))
+
+        grouped: Dict[int, List[str]] = defaultdict(list)
+        for _, item_index, _, chunk in selected:
+            grouped[item_index].append(chunk)
+
+        return [(items[i], grouped[i]) for i in sorted(grouped)]
+
+    def get_content_for_category(self, category: str, query: str, tags: Set[str]) -> str:
+        """Get aggregated relevant content for a category.
+
+        Same layout as KnowledgeBaseService.get_content_for_category.
+        """
+        content_parts = []
+        for item, chunks in self.retrieve(category, query, tags):
+            content_parts.append(f"# {item['title']}\n\n")
+            content_parts.append(f"Source: {item['source_url']}\n\n")
+            content_parts.append("\n\n".join(chunks) + "\n\n")
+            content_parts.append("---\n\n")
+
+        return "".join(content_parts)
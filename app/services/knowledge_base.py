@@ -1,11 +1,19 @@
 """Knowledge base management service."""
 
+import asyncio
+import hashlib
 import json
 from pathlib import Path
-from typing import List, Dict
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.models.schemas import KnowledgeBaseItem
+from typing import TYPE_CHECKING, List, Dict, Optional
+from app.models.schemas import KnowledgeBaseItem, KnowledgeBaseImportResult
 from app.core.config import get_settings
+from app.services.kb_dedup import deduplicate_documents
+from app.services.kb_retrieval import KnowledgeBaseRetriever, chunk_kb_content
+from app.utils.text_normalization import NORMALIZATION_VERSION, normalize_kb_content
+from app.utils.tokens import count_tokens
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorDatabase
 
 settings = get_settings()
 
@@ -13,10 +21,14 @@ settings = get_settings()
 class KnowledgeBaseService:
     """Service for managing knowledge base content."""
 
-    def __init__(self, db: AsyncIOMotorDatabase):
-        """Initialize service."""
+    def __init__(self, db: Optional["AsyncIOMotorDatabase"] = None):
+        """Initialize service.
+
+        Without a database only the file-based helpers (metadata loading and
+        document building) are usable.
+        """
         self.db = db
-        self.kb_collection = db.knowledge_base
+        self.kb_collection = db.knowledge_base if db is not None else None
 
     async def load_metadata(self) -> List[KnowledgeBaseItem]:
         """Load knowledge base metadata from JSON file."""
@@ -37,27 +49,129 @@ class KnowledgeBaseService:
         if not file_path.exists():
             raise FileNotFoundError(f"Markdown file not found: {file_path}")
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return await asyncio.to_thread(file_path.read_text, encoding="utf-8")
 
-    async def import_to_database(self) -> int:
-        """Import knowledge base from files to MongoDB."""
-        metadata_items = await self.load_metadata()
-        imported_count = 0
+    @staticmethod
+    def compute_content_hash(doc: Dict) -> str:
+        """Compute a stable hash of a knowledge base document."""
+        payload = json.dumps(doc, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-        for item in metadata_items:
-            # Load markdown content
-            content = await self.load_markdown_content(item.file_name)
+    async def build_documents(self) -> List[Dict]:
+        """Load metadata and markdown files into hashed documents.
 
-            # Create document with content
+        Markdown files are read concurrently. Content is normalized,
+        near-duplicate paragraphs are collapsed within each category and
+        the result is chunked for retrieval.
+        """
+        metadata_items = await self.load_metadata()
+        contents = await asyncio.gather(
+            *[self.load_markdown_content(item.file_name) for item in metadata_items]
+        )
+
+        docs = []
+        for item, content in zip(metadata_items, contents):
             doc = item.model_dump()
             doc["content"] = content
+            doc.update(self.normalize_document(content))
+            docs.append(doc)
+
+        if settings.kb_dedup_enabled:
+            deduplicate_documents(docs)
+
+        for doc in docs:
+            prompt_content = self.prompt_content(doc)
+            doc["chunks"] = chunk_kb_content(prompt_content)
+            doc["token_counts"]["deduplicated"] = count_tokens(prompt_content, settings.openai_model)
+            doc["content_hash"] = self.compute_content_hash(doc)
+
+        return docs
+
+    @staticmethod
+    def prompt_content(item: Dict) -> str:
+        """Get the best available content of a KB item for prompts."""
+        return (
+            item.get("deduplicated_content")
+            or item.get("normalized_content")
+            or item["content"]
+        )
+
+    @staticmethod
+    def normalize_document(content: str) -> Dict:
+        """Build the normalized-content fields stored next to the original.
+
+        Args:
+            content: Raw markdown content
+
+        Returns:
+            Fields with the cleaned content and token counts for both versions
+        """
+        normalized = normalize_kb_content(content)
+        return {
+            "normalized_content": normalized,
+            "normalization_version": NORMALIZATION_VERSION,
+            "token_counts": {
+                "original": count_tokens(content, settings.openai_model),
+                "normalized": count_tokens(normalized, settings.openai_model),
+            },
+        }
+
+    async def sync_to_database(self) -> KnowledgeBaseImportResult:
+        """Sync knowledge base files to MongoDB, writing only what changed.
+
+        Items whose content hash matches the stored one are skipped, new and
+        changed items replace their stored document (so dropped fields go
+        too) and items no longer listed in the metadata are deleted, all in a
+        single bulk write.
 
-            # Upsert to database
-            await self.kb_collection.update_one(
-                {"id": item.id}, {"$set": doc}, upsert=True
-            )
-            imported_count += 1
+        Returns:
+            Counts of added, changed, unchanged and removed items
+        """
+        from pymongo import DeleteMany, ReplaceOne
+
+        docs = await self.build_documents()
+
+        existing = {}
+        async for stored in self.kb_collection.find({}, {"_id": 0, "id": 1, "content_hash": 1}):
+            existing[stored["id"]] = stored.get("content_hash")
+
+        result = KnowledgeBaseImportResult()
+        operations = []
+
+        for doc in docs:
+            if doc["id"] not in existing:
+                result.added += 1
+            elif existing[doc["id"]] != doc["content_hash"]:
+                result.changed += 1
+            else:
+                result.unchanged += 1
+                continue
+
+            # Replace, not $set, so fields an item no longer has are dropped
+            operations.append(ReplaceOne({"id": doc["id"]}, doc, upsert=True))
+
+        removed_ids = set(existing) - {doc["id"] for doc in docs}
+        if removed_ids:
+            result.removed = len(removed_ids)
+            operations.append(DeleteMany({"id": {"$in": sorted(removed_ids)}}))
+
+        if operations:
+            await self.kb_collection.bulk_write(operations, ordered=False)
+
+        print(
+            f"Knowledge base sync: {result.added} added, {result.changed} changed, "
+            f"{result.unchanged} unchanged, {result.removed} removed"
+        )
+        return result
+
+    async def import_to_database(self) -> int:
+        """Import knowledge base from files to MongoDB.
+
+        Returns:
+            Number of knowledge base items present after the import
+        """
+        result = await self.sync_to_database()
+        imported_count = result.total
 
         print(f"Imported {imported_count} knowledge base items to database")
         return imported_count
@@ -83,7 +197,11 @@ class KnowledgeBaseService:
     async def get_content_for_category(self, category: str) -> str:
         """Get aggregated content for a category."""
         items = await self.get_by_category(category)
+        return self.format_category_content(items)
 
+    @classmethod
+    def format_category_content(cls, items: List[Dict]) -> str:
+        """Aggregate KB items into prompt content with source headers."""
         if not items:
             return ""
 
@@ -91,11 +209,44 @@ class KnowledgeBaseService:
         for item in items:
             content_parts.append(f"# {item['title']}\n\n")
             content_parts.append(f"Source: {item['source_url']}\n\n")
-            content_parts.append(f"{item['content']}\n\n")
+            content_parts.append(f"{cls.prompt_content(item)}\n\n")
             content_parts.append("---\n\n")
 
         return "".join(content_parts)
 
+    async def load_retriever(self, status: str = "draft") -> KnowledgeBaseRetriever:
+        """Load all KB items into an in-memory retrieval index."""
+        projection = {"_id": 0, "id": 1, "title": 1, "category": 1, "applies_to": 1,
+                      "source_url": 1, "content": 1, "normalized_content": 1,
+                      "deduplicated_content": 1, "chunks": 1}
+        items = await self.kb_collection.find({"status": status}, projection).to_list(length=None)
+        return KnowledgeBaseRetriever(items)
+
+    async def get_category_source_words(self, status: str = "draft") -> Dict[str, int]:
+        """Sum summary_length_words per category (input to output budgets)."""
+        pipeline = [
+            {"$match": {"status": status}},
+            {"$group": {"_id": "$category", "words": {"$sum": "$summary_length_words"}}},
+        ]
+        rows = await self.kb_collection.aggregate(pipeline).to_list(length=None)
+        return {row["_id"]: row["words"] for row in rows}
+
+    async def get_category_versions(self, status: str = "draft") -> Dict[str, str]:
+        """Version per category, derived from its items' content hashes.
+
+        The version changes whenever an item of the category is added,
+        removed or edited, so it can key caches of generated guides.
+        """
+        pipeline = [
+            {"$match": {"status": status}},
+            {"$group": {"_id": "$category", "hashes": {"$push": {"$ifNull": ["$content_hash", "$id"]}}}},
+        ]
+        rows = await self.kb_collection.aggregate(pipeline).to_list(length=None)
+        return {
+            row["_id"]: hashlib.sha256("\n".join(sorted(row["hashes"])).encode("utf-8")).hexdigest()[:16]
+            for row in rows
+        }
+
     async def get_unique_categories(self) -> List[str]:
         """Get list of unique categories in knowledge base."""
         categories = await self.kb_collection.distinct("category", {"status": "draft"})
@@ -0,0 +1,345 @@
+"""Pluggable chat model backends.
+
+``ReportGeneratorService`` asks the backend selected by
+``settings.llm_backend`` for its chat models. Every backend returns objects
+with the LangChain chat model surface the generator uses (``ainvoke``,
+``astream`` and ``bind``):
+
+- ``openai``: OpenAI's API
+- ``openai_compatible``: any server speaking the chat-completions protocol
+  at ``settings.llm_base_url`` (vLLM, llama.cpp, a local mock server)
+- ``local``: a deterministic in-process model that builds schema-valid
+  reports from the prompt's KB content, with configurable latency, for
+  offline tests and benchmarks
+
+The HTTP backends share one pooled client (``llm_http_client``).
+"""
+
+import asyncio
+import json
+import re
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.services.llm_client import llm_http_client
+from app.utils.tokens import count_tokens
+
+if TYPE_CHECKING:
+    # langchain imports are deferred to first use, like langchain_openai below
+    from langchain_core.messages import AIMessage, BaseMessage
+
+settings = get_settings()
+
+# Words written per category report by the local model (about one page)
+LOCAL_REPORT_WORDS = 350
+
+# Streamed pieces per local response
+LOCAL_STREAM_PIECES = 20
+
+_PREFACE_TASK = re.compile(r"Write a preface for each of these categories: ([^\n]+)\.\nKeep each preface to about (\d+) words\.")
+_MULTI_TASK = re.compile(r"for each of these categories: ([^\n]+)\.")
+_SINGLE_TASK = re.compile(r"summary report about (\S+) from the content above")
+_CATEGORY_SECTION = re.compile(r"## Category: (\S+)\n\n(.*?)(?=\n## Category: |\Z)", re.DOTALL)
+_TARGET_WORDS = re.compile(r"Keep it to about (\d+) words\.")
+_MULTI_TARGET_WORDS = re.compile(r"(\w+) about (\d+) words")
+_TITLE = re.compile(r"^# (.+)$", re.MULTILINE)
+_SOURCE = re.compile(r"^Source: (\S+)$", re.MULTILINE)
+_CONTENT_PREFIX = "Content:\n"
+
+
+class LLMBackend(ABC):
+    """Factory for the chat models used by report generation."""
+
+    name = "base"
+
+    @abstractmethod
+    def chat_model(self, model: str, temperature: float, max_tokens: int):
+        """Create a chat model.
+
+        Args:
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Max output tokens per call
+
+        Returns:
+            Chat model with ainvoke, astream and bind
+        """
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI's hosted API."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        """Initialize backend.
+
+        Args:
+            api_key: OpenAI API key (default: settings.openai_api_key)
+        """
+        self.api_key = api_key or settings.openai_api_key
+        if not self.api_key:
+            raise ValueError("openai_api_key is required for the openai backend")
+
+    def chat_model(self, model: str, temperature: float, max_tokens: int):
+        """Create a ChatOpenAI model."""
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=self.api_key,
+            http_async_client=llm_http_client.get(),
+            stream_usage=True,
+        )
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Self-hosted server speaking the OpenAI chat-completions protocol."""
+
+    name = "openai_compatible"
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+        """Initialize backend.
+
+        Args:
+            base_url: Server URL including the API prefix, e.g. http://localhost:8000/v1
+            api_key: Key sent to the server (many servers accept any value)
+        """
+        self.base_url = base_url or settings.llm_base_url
+        self.api_key = api_key or settings.llm_api_key or settings.openai_api_key or "not-needed"
+        if not self.base_url:
+            raise ValueError("llm_base_url is required for the openai_compatible backend")
+
+    def chat_model(self, model: str, temperature: float, max_tokens: int):
+        """Create a ChatOpenAI model pointed at the configured server."""
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_async_client=llm_http_client.get(),
+            stream_usage=True,
+        )
+
+
+class LocalChatModel:
+    """Deterministic chat model that writes reports from the prompt content.
+
+    Latency follows a simple model: a fixed time to first token, plus input
+    tokens over the prefill rate, plus output tokens over the decode rate.
+    Rates of 0 disable that part of the delay.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_tokens: int,
+        ttft: float = 0.0,
+        prefill_tps: float = 0.0,
+        decode_tps: float = 0.0,
+        usage: Optional[Dict[str, int]] = None,
+    ):
+        """Initialize the model.
+
+        Args:
+            model: Model name used for token counting
+            max_tokens: Max output tokens (recorded, output is not truncated)
+            ttft: Fixed time to first token in seconds
+            prefill_tps: Input tokens processed per second
+            decode_tps: Output tokens generated per second
+            usage: Shared usage counters (calls, input_tokens, output_tokens)
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.ttft = ttft
+        self.prefill_tps = prefill_tps
+        self.decode_tps = decode_tps
+        self.usage = usage if usage is not None else defaultdict(int)
+
+    def bind(self, **kwargs) -> "LocalChatModel":
+        """Return a copy with bound call options (max_tokens), sharing usage."""
+        return LocalChatModel(
+            model=self.model,
+            max_tokens=kwargs.get("max_tokens", self.max_tokens),
+            ttft=self.ttft,
+            prefill_tps=self.prefill_tps,
+            decode_tps=self.decode_tps,
+            usage=self.usage,
+        )
+
+    @staticmethod
+    def respond(messages: List["BaseMessage"]) -> str:
+        """Synthesize the output for a compiled prompt."""
+        prompt = messages[-1].content
+        content, task = prompt, prompt
+        if prompt.startswith(_CONTENT_PREFIX):
+            # Compiled prompts end with a task paragraph after the content
+            content, _, task = prompt[len(_CONTENT_PREFIX):].rpartition("\n\n")
+
+        preface = _PREFACE_TASK.search(task)
+        if preface:
+            # Personalization: open each preface with the patient context
+            words = content.split()[:int(preface.group(2))]
+            prefaces = [
+                {"category": category.strip(), "text": " ".join(words)}
+                for category in preface.group(1).split(",")
+            ]
+            return json.dumps({"prefaces": prefaces})
+
+        multi = _MULTI_TASK.search(task)
+        if multi:
+            sections = dict(_CATEGORY_SECTION.findall(content))
+            targets = {category: int(words) for category, words in _MULTI_TARGET_WORDS.findall(task)}
+            reports = [
+                LocalChatModel.report(
+                    category.strip(),
+                    sections.get(category.strip(), content),
+                    targets.get(category.strip(), LOCAL_REPORT_WORDS),
+                )
+                for category in multi.group(1).split(",")
+            ]
+            return json.dumps({"reports": reports})
+
+        single = _SINGLE_TASK.search(task)
+        if single:
+            target = _TARGET_WORDS.search(task)
+            words = int(target.group(1)) if target else LOCAL_REPORT_WORDS
+            return json.dumps(LocalChatModel.report(single.group(1), content, words))
+
+        # Map-step summary: keep the first third of the chunk
+        words = content.split()
+        return " ".join(words[:max(len(words) // 3, 1)])
+
+    @staticmethod
+    def report(category: str, content: str, max_words: int = LOCAL_REPORT_WORDS) -> Dict:
+        """Build one CategoryReport-shaped dict from KB content."""
+        sources = list(dict.fromkeys(_SOURCE.findall(content)))
+        titles = _TITLE.findall(content)
+
+        body = _SOURCE.sub("", _TITLE.sub("", content)).replace("---", " ")
+        words = body.split() or category.replace("_", " ").split()
+        text = " ".join(words[:max_words])
+
+        if sources:
+            title = titles[0] if titles else category.replace("_", " ").title()
+            text = f"[{title}]({sources[0]}): {text}"
+
+        return {"category": category, "text": text}
+
+    def _account(self, messages: List["BaseMessage"], output: str) -> Dict[str, int]:
+        """Count tokens, update usage and return usage metadata."""
+        input_tokens = sum(count_tokens(m.content, self.model) for m in messages)
+        output_tokens = count_tokens(output, self.model)
+        self.usage["calls"] += 1
+        self.usage["input_tokens"] += input_tokens
+        self.usage["output_tokens"] += output_tokens
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _prefill_delay(self, input_tokens: int) -> float:
+        """Delay before the first output token."""
+        return self.ttft + (input_tokens / self.prefill_tps if self.prefill_tps else 0.0)
+
+    def _decode_delay(self, output_tokens: int) -> float:
+        """Delay for generating output tokens."""
+        return output_tokens / self.decode_tps if self.decode_tps else 0.0
+
+    async def ainvoke(self, messages: List["BaseMessage"]) -> "AIMessage":
+        """Return the full response after the simulated latency."""
+        from langchain_core.messages import AIMessage
+
+        output = self.respond(messages)
+        usage = self._account(messages, output)
+
+        delay = self._prefill_delay(usage["input_tokens"]) + self._decode_delay(usage["output_tokens"])
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=output, usage_metadata=usage)
+
+    async def astream(self, messages: List["BaseMessage"]):
+        """Yield the response in pieces paced by the decode rate."""
+        from langchain_core.messages import AIMessageChunk
+
+        output = self.respond(messages)
+        usage = self._account(messages, output)
+
+        delay = self._prefill_delay(usage["input_tokens"])
+        if delay:
+            await asyncio.sleep(delay)
+
+        step = max(len(output) // LOCAL_STREAM_PIECES, 1)
+        piece_delay = self._decode_delay(usage["output_tokens"]) / LOCAL_STREAM_PIECES
+        for i in range(0, len(output), step):
+            if piece_delay:
+                await asyncio.sleep(piece_delay)
+            yield AIMessageChunk(content=output[i:i + step])
+
+        yield AIMessageChunk(content="", usage_metadata=usage)
+
+
+class LocalBackend(LLMBackend):
+    """Deterministic in-process backend, no network."""
+
+    name = "local"
+
+    def __init__(
+        self,
+        ttft: Optional[float] = None,
+        prefill_tps: Optional[float] = None,
+        decode_tps: Optional[float] = None,
+    ):
+        """Initialize backend.
+
+        Args:
+            ttft: Time to first token in seconds (default: settings.local_llm_ttft_seconds)
+            prefill_tps: Input tokens/s (default: settings.local_llm_prefill_tps)
+            decode_tps: Output tokens/s (default: settings.local_llm_decode_tps)
+        """
+        self.ttft = settings.local_llm_ttft_seconds if ttft is None else ttft
+        self.prefill_tps = settings.local_llm_prefill_tps if prefill_tps is None else prefill_tps
+        self.decode_tps = settings.local_llm_decode_tps if decode_tps is None else decode_tps
+        self.usage: Dict[str, int] = defaultdict(int)
+
+    def chat_model(self, model: str, temperature: float, max_tokens: int) -> LocalChatModel:
+        """Create a local model sharing this backend's usage counters."""
+        return LocalChatModel(
+            model=model,
+            max_tokens=max_tokens,
+            ttft=self.ttft,
+            prefill_tps=self.prefill_tps,
+            decode_tps=self.decode_tps,
+            usage=self.usage,
+        )
+
+
+LLM_BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    OpenAICompatibleBackend.name: OpenAICompatibleBackend,
+    LocalBackend.name: LocalBackend,
+}
+
+
+def get_llm_backend(name: Optional[str] = None) -> LLMBackend:
+    """Create the configured LLM backend.
+
+    Args:
+        name: Backend name (default: settings.llm_backend)
+
+    Returns:
+        Backend instance
+    """
+    name = name or settings.llm_backend
+    try:
+        return LLM_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend '{name}', expected one of: {', '.join(LLM_BACKENDS)}")
@@ -0,0 +1,161 @@
+"""Process-wide pooled HTTP client for LLM calls.
+
+Every chat model created by the OpenAI and OpenAI-compatible backends shares
+one ``httpx.AsyncClient``, so concurrent generation reuses keep-alive
+connections (and TLS sessions) instead of each model opening its own pool.
+Limits, timeouts and HTTP/2 come from ``settings.llm_http_*``.
+"""
+
+import weakref
+from typing import Dict, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class LLMHttpClient:
+    """Lazily created shared async HTTP client with pool statistics."""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        """Initialize client configuration (defaults from settings.llm_http_*).
+
+        Args:
+            max_connections: Max open connections across all hosts
+            max_keepalive_connections: Max idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for response data (per read, so
+                streamed responses are not cut off)
+            http2: Negotiate HTTP/2 (requires the 'h2' package)
+        """
+        self.max_connections = max_connections or settings.llm_http_max_connections
+        self.max_keepalive_connections = max_keepalive_connections or settings.llm_http_max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry or settings.llm_http_keepalive_expiry
+        self.connect_timeout = connect_timeout or settings.llm_http_connect_timeout
+        self.read_timeout = read_timeout or settings.llm_http_read_timeout
+        self.http2 = settings.llm_http2 if http2 is None else http2
+
+        self._client = None
+        self._seen_connections = weakref.WeakSet()
+        self.requests = 0
+        self.connections_opened = 0
+        self.peak_connections = 0
+
+    def get(self):
+        """Get the shared client, creating it on first use.
+
+        Returns:
+            httpx.AsyncClient
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._create()
+        return self._client
+
+    def _create(self):
+        """Create the pooled client."""
+        import httpx
+
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise RuntimeError("llm_http2 requires the 'h2' package: pip install httpx[http2]")
+
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                self.read_timeout,
+                connect=self.connect_timeout,
+                pool=self.connect_timeout,
+            ),
+            event_hooks={"response": [self._on_response]},
+        )
+
+    def _connections(self) -> Optional[list]:
+        """Connections currently held by the client's pool.
+
+        httpx does not expose its pool, so this reads the private
+        ``_transport._pool.connections`` (httpx 0.2x / httpcore 1.x).
+
+        Returns:
+            Pool connections, or None if the pool cannot be inspected
+        """
+        if self._client is None:
+            return []
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return None if connections is None else list(connections)
+
+    async def _on_response(self, response):
+        """Count requests and newly opened connections."""
+        self.requests += 1
+        connections = self._connections()
+        if connections is None:
+            return
+        self.peak_connections = max(self.peak_connections, len(connections))
+        for connection in connections:
+            if connection not in self._seen_connections:
+                self._seen_connections.add(connection)
+                self.connections_opened += 1
+
+    def pool_stats(self) -> Dict:
+        """Pool configuration and usage for sizing against worker concurrency.
+
+        Connection figures are None when the installed httpx cannot be
+        inspected; the request count comes from the response hook and is
+        always available.
+        """
+        stats = {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "http2": self.http2,
+            "requests": self.requests,
+        }
+        connections = self._connections()
+        if connections is None:
+            return {
+                **stats,
+                "open_connections": None,
+                "idle_connections": None,
+                "active_connections": None,
+                "peak_connections": None,
+                "connections_opened": None,
+                "connection_reuse_ratio": None,
+            }
+
+        idle = sum(1 for connection in connections if getattr(connection, "is_idle", lambda: False)())
+        return {
+            **stats,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "peak_connections": self.peak_connections,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_ratio": (
+                1 - self.connections_opened / self.requests if self.requests else 0.0
+            ),
+        }
+
+    async def aclose(self):
+        """Close the client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global shared LLM HTTP client
+llm_http_client = LLMHttpClient()
@@ -0,0 +1,159 @@
+"""Event-loop lag monitor.
+
+A sampler task sleeps for a fixed interval and measures how late it wakes
+up; the delay is time the loop spent running other callbacks without
+yielding. Lags go into a histogram.
+
+Stacks cannot be taken after the fact, so a watchdog thread checks the
+sampler's heartbeat: once the loop has not come back for longer than the
+threshold, it captures the loop thread's current stack (the code that is
+blocking) with ``sys._current_frames``. Each stall is logged and kept in a
+bounded list of recent stalls. Both surface through the metrics registry.
+
+The overhead is one wake-up per interval on the loop plus a few per
+threshold on the watchdog thread, which never touches the loop.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Histogram bucket upper bounds in milliseconds (last bucket: above the largest)
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Innermost frames kept per captured stack
+STACK_DEPTH = 15
+
+
+class LoopLagMonitor:
+    """Sample event-loop lag and capture the stack of blocking code."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        threshold: Optional[float] = None,
+        max_stalls: Optional[int] = None,
+    ):
+        """Initialize monitor (defaults from settings.loop_monitor_*).
+
+        Args:
+            interval: Seconds between lag samples
+            threshold: Lag in seconds that counts as a stall and triggers a stack capture
+            max_stalls: Recent stalls kept for the metrics snapshot
+        """
+        self.interval = interval or settings.loop_monitor_interval_seconds
+        self.threshold = threshold or settings.loop_monitor_threshold_seconds
+        self.stalls: deque = deque(maxlen=max_stalls or settings.loop_monitor_max_stalls)
+
+        self.buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stall_count = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+
+    def record(self, lag: float):
+        """Add one lag sample to the histogram."""
+        lag_ms = lag * 1000
+        index = next((i for i, bound in enumerate(LAG_BUCKETS_MS) if lag_ms <= bound), len(LAG_BUCKETS_MS))
+        self.buckets[index] += 1
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        """Start sampling on the running loop and the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        """Stop sampling."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, self.interval * 2)
+            self._watchdog = None
+
+    async def _sample(self):
+        """Measure how late each timed wake-up is."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._heartbeat = time.monotonic()
+            self.record(max(loop.time() - expected, 0.0))
+
+    def _watch(self):
+        """Capture the loop thread's stack once per stall."""
+        # Poll well inside the shortest stall worth reporting, or blocks just
+        # over the threshold end between two polls and are never captured
+        poll = min(self.interval, self.threshold) / 2
+        captured_for = None
+        while not self._stopped.wait(poll):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.threshold:
+                continue
+            if captured_for == heartbeat:
+                # Same stall; the stack was already taken
+                continue
+
+            captured_for = heartbeat
+            stack = self.loop_stack()
+            self.stall_count += 1
+            self.stalls.append({"at": time.time(), "blocked_seconds": round(blocked, 3), "stack": stack})
+            logger.warning(
+                f"Event loop blocked for {blocked:.3f}s+ (threshold {self.threshold}s) in:\n"
+                + "".join(stack)
+            )
+
+    def loop_stack(self) -> List[str]:
+        """Formatted innermost frames of the loop thread."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return []
+        return traceback.format_stack(frame)[-STACK_DEPTH:]
+
+    def stats(self) -> Dict:
+        """Lag histogram, summary and recent stalls."""
+        labels = [f"le_{bound}ms" for bound in LAG_BUCKETS_MS] + [f"gt_{LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            "samples": self.samples,
+            "mean_lag_ms": self.total_lag / self.samples * 1000 if self.samples else 0.0,
+            "max_lag_ms": self.max_lag * 1000,
+            "histogram": dict(zip(labels, self.buckets)),
+            "stalls": self.stall_count,
+            "threshold_ms": self.threshold * 1000,
+            "recent_stalls": list(self.stalls),
+        }
+
+
+# Global event-loop monitor
+loop_monitor = LoopLagMonitor()
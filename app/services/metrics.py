@@ -0,0 +1,57 @@
+"""In-process worker metrics.
+
+Counters are incremented by the worker; other services register sources
+(callables returning a dict) that are sampled when a snapshot is taken. The
+worker publishes snapshots to Redis so they can be read with
+``scripts/worker_metrics.py``.
+"""
+
+import time
+from collections import Counter
+from typing import Callable, Dict
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Redis key prefix for published snapshots
+METRICS_KEY_PREFIX = "metrics:"
+
+
+class MetricsRegistry:
+    """Counters plus registered metric sources."""
+
+    def __init__(self):
+        """Initialize empty registry."""
+        self.counters: Counter = Counter()
+        self.sources: Dict[str, Callable[[], Dict]] = {}
+        self.started_at = time.time()
+
+    def incr(self, name: str, value: float = 1):
+        """Increment a counter."""
+        self.counters[name] += value
+
+    def register(self, name: str, source: Callable[[], Dict]):
+        """Register a source sampled on every snapshot.
+
+        Args:
+            name: Section name in the snapshot
+            source: Callable returning a JSON-serializable dict
+        """
+        self.sources[name] = source
+
+    def snapshot(self) -> Dict:
+        """Collect counters and all sources."""
+        snapshot = {
+            "worker": settings.worker_name,
+            "timestamp": time.time(),
+            "uptime_seconds": time.time() - self.started_at,
+            "counters": dict(self.counters),
+        }
+        for name, source in self.sources.items():
+            snapshot[name] = source()
+        return snapshot
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
@@ -0,0 +1,123 @@
+"""Per-category output length budgets.
+
+A category's target report length follows from how much source material it
+has (the ``summary_length_words`` of its KB items) through a configurable
+policy: a ratio of the source words, clamped to a range, with per-category
+overrides. The target is stated in the prompt, and ``max_tokens`` is set from
+it with headroom so a runaway generation is cut off instead of holding a
+worker slot.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class OutputBudgetPolicy:
+    """Derive target words and max_tokens per category."""
+
+    def __init__(
+        self,
+        ratio: Optional[float] = None,
+        min_words: Optional[int] = None,
+        max_words: Optional[int] = None,
+        tokens_per_word: Optional[float] = None,
+        headroom: Optional[float] = None,
+        overhead_tokens: Optional[int] = None,
+        overrides: Optional[Dict[str, int]] = None,
+    ):
+        """Initialize policy (defaults from settings.output_budget_*).
+
+        Args:
+            ratio: Target words per source word
+            min_words: Lower bound on target words
+            max_words: Upper bound on target words
+            tokens_per_word: Output tokens per word, including inline links
+            headroom: Factor on the target tokens allowed before cut-off
+            overhead_tokens: Fixed tokens for the JSON wrapper
+            overrides: Target words per category, bypassing the ratio
+        """
+        self.ratio = settings.output_budget_ratio if ratio is None else ratio
+        self.min_words = min_words or settings.output_budget_min_words
+        self.max_words = max_words or settings.output_budget_max_words
+        self.tokens_per_word = tokens_per_word or settings.output_budget_tokens_per_word
+        self.headroom = headroom or settings.output_budget_headroom
+        self.overhead_tokens = settings.output_budget_overhead_tokens if overhead_tokens is None else overhead_tokens
+        self.overrides = settings.output_budget_words if overrides is None else overrides
+
+    def target_words(self, category: str, source_words: int) -> int:
+        """Target report length for a category.
+
+        Args:
+            category: Category name
+            source_words: Sum of summary_length_words of the category's items
+
+        Returns:
+            Target words
+        """
+        if category in self.overrides:
+            return self.overrides[category]
+        return int(min(max(source_words * self.ratio, self.min_words), self.max_words))
+
+    def max_tokens(self, words: int) -> int:
+        """Output token cap for a report of the given target length."""
+        return int(words * self.tokens_per_word * self.headroom) + self.overhead_tokens
+
+    def expected_tokens(self, words: int) -> int:
+        """Output tokens of a report that hits the given target length."""
+        return int(words * self.tokens_per_word) + self.overhead_tokens
+
+    def category_budgets(self, source_words: Dict[str, int]) -> Dict[str, int]:
+        """Target words for every category.
+
+        Args:
+            source_words: Sum of summary_length_words per category
+
+        Returns:
+            Target words per category
+        """
+        return {category: self.target_words(category, words) for category, words in source_words.items()}
+
+    @staticmethod
+    def source_words(items: Iterable) -> Dict[str, int]:
+        """Sum summary_length_words per category over KB items or metadata."""
+        totals: Dict[str, int] = defaultdict(int)
+        for item in items:
+            if isinstance(item, dict):
+                totals[item["category"]] += item.get("summary_length_words") or 0
+            else:
+                totals[item.category] += item.summary_length_words
+        return dict(totals)
+
+
+class OutputLengthTracker:
+    """Requested vs actual report lengths per category."""
+
+    def __init__(self):
+        """Initialize empty totals."""
+        self.rows: Dict[str, Dict[str, float]] = {}
+
+    def record(self, category: str, requested_words: Optional[int], actual_words: int):
+        """Record one generated report."""
+        row = self.rows.setdefault(category, {"reports": 0, "requested_words": 0, "actual_words": 0, "over": 0})
+        row["reports"] += 1
+        row["actual_words"] += actual_words
+        if requested_words:
+            row["requested_words"] += requested_words
+            row["over"] += actual_words > requested_words
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Average requested and actual words and the share over budget."""
+        return {
+            category: {
+                "reports": row["reports"],
+                "avg_requested_words": row["requested_words"] / row["reports"],
+                "avg_actual_words": row["actual_words"] / row["reports"],
+                "over_budget_ratio": row["over"] / row["reports"],
+            }
+            for category, row in self.rows.items()
+        }
+
@@ -0,0 +1,86 @@
+"""Throttled progress reporting for a single report request."""
+
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.core.config import get_settings
+from app.models.schemas import CategoryReportItem, ReportProgressMessage
+
+settings = get_settings()
+
+# Share of a category's progress credited while its output is still streaming
+STREAMING_PROGRESS_CAP = 0.95
+
+
+class ProgressReporter:
+    """Turn generation events into throttled progress messages."""
+
+    def __init__(
+        self,
+        request_id: str,
+        user_id: str,
+        total_categories: int,
+        publish: Callable[[dict], Awaitable[None]],
+        min_interval: Optional[float] = None,
+        expected_tokens: Optional[Dict[str, int]] = None,
+    ):
+        """Initialize reporter.
+
+        Args:
+            request_id: Request identifier
+            user_id: User identifier
+            total_categories: Number of categories to generate
+            publish: Coroutine function publishing a message dict
+            min_interval: Minimum seconds between streamed progress messages
+            expected_tokens: Expected output tokens per category (default:
+                settings.openai_max_tokens for every category)
+        """
+        self.request_id = request_id
+        self.user_id = user_id
+        self.total_categories = max(total_categories, 1)
+        self.publish = publish
+        self.min_interval = (
+            settings.progress_min_interval_seconds if min_interval is None else min_interval
+        )
+        self.expected_tokens = expected_tokens or {}
+        self.completed_categories = 0
+        self._last_sent = 0.0
+
+    def _percent(self, partial: float = 0.0) -> int:
+        """Overall completion percentage, kept below 100 until the final response."""
+        done = (self.completed_categories + partial) / self.total_categories
+        return min(int(done * 100), 99)
+
+    async def _send(self, progress: int, category: Optional[str] = None,
+                    category_report: Optional[CategoryReportItem] = None):
+        """Publish a progress message."""
+        message = ReportProgressMessage(
+            request_id=self.request_id,
+            user_id=self.user_id,
+            progress=progress,
+            category=category,
+            category_report=category_report,
+        )
+        self._last_sent = time.monotonic()
+        await self.publish(message.model_dump(mode="json"))
+
+    async def on_tokens(self, category: str, tokens: int):
+        """Report streamed output tokens for a category (throttled).
+
+        Args:
+            category: Category being generated (comma-joined for a multi-category call)
+            tokens: Output tokens received so far for the call
+        """
+        if time.monotonic() - self._last_sent < self.min_interval:
+            return
+
+        # A multi-category call streams under its comma-joined categories
+        categories = category.split(",")
+        expected = sum(self.expected_tokens.get(name, settings.openai_max_tokens) for name in categories)
+        partial = min(tokens / max(expected, 1), STREAMING_PROGRESS_CAP) * len(categories)
+        await self._send(self._percent(partial), category=category)
+
+    async def on_category_complete(self, report: CategoryReportItem):
+        """Report a finished category with its content (never throttled)."""
+        self.completed_categories += 1
+        await self._send(self._percent(), category=report.category, category_report=report)
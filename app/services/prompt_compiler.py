@@ -0,0 +1,258 @@
+"""Prompt construction with a stable, cache-friendly prefix.
+
+Providers cache prompt prefixes, so messages are laid out from most to least
+stable: the system text and output schema (identical for every call) come
+first, then the per-category knowledge base content, and only then the short
+task instruction. Static parts are rendered once at construction time.
+"""
+
+import hashlib
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+from app.models.schemas import ReportGenerationRequest
+
+if TYPE_CHECKING:
+    # langchain_core is imported when the compiler is built (worker startup)
+    from langchain_core.messages import BaseMessage, SystemMessage
+    from langchain_core.output_parsers import JsonOutputParser
+
+REPORT_SYSTEM_TEXT = """You are a helpful health information assistant.
+Create a friendly, one-page report summarizing the provided content.
+Keep the tone warm and encouraging.
+Include inline links in the text using markdown format [text](url).
+Only link to source URLs that appear in the provided content."""
+
+REPORT_TASK_TEXT = """Create a one-page friendly summary report about {category} from the content above.
+Include inline source links in markdown format throughout the text."""
+
+MULTI_REPORT_SYSTEM_TEXT = f"""{REPORT_SYSTEM_TEXT}
+Write one separate report per requested category, using only that category's content."""
+
+MULTI_REPORT_TASK_TEXT = """Create one one-page friendly summary report for each of these categories: {categories}.
+Include inline source links in markdown format throughout each text."""
+
+PERSONALIZE_SYSTEM_TEXT = """You are a helpful health information assistant.
+The patient will receive general health guides on the listed categories.
+Write a short, warm preface for each guide that connects it to this patient's
+assessment, cardiovascular risk and care plan.
+Do not give new medical advice, do not include links and do not repeat the guide."""
+
+PERSONALIZE_TASK_TEXT = """Write a preface for each of these categories: {categories}.
+Keep each preface to about {words} words."""
+
+LENGTH_TEXT = "Keep it to about {words} words."
+
+MULTI_LENGTH_TEXT = "Target lengths: {targets}."
+
+SUMMARY_SYSTEM_TEXT = """You condense health information for a later report-writing step.
+Keep every concrete recommendation, number and threshold.
+Keep source titles and URLs next to the facts they support.
+Drop repetition, filler and formatting."""
+
+SUMMARY_TASK_TEXT = "Condense the content above about {category}."
+
+# Distinct prefix hashes tracked before the counters are reset
+MAX_TRACKED_PREFIXES = 10000
+
+
+def format_patient_context(request: ReportGenerationRequest) -> str:
+    """Condense the parts of a request that personalization needs.
+
+    Args:
+        request: Report generation request
+
+    Returns:
+        Short plain-text patient profile (no name)
+    """
+    lifestyle = request.assessment.lifestyle
+    lines = [
+        f"Age: {request.patient.age}, sex: {request.patient.sex}",
+        f"Assessment: {request.assessment.summary}",
+        f"Lifestyle: smoking {lifestyle.smoking}; alcohol {lifestyle.alcohol}; "
+        f"diet {lifestyle.diet}; physical activity {lifestyle.physical_activity}",
+    ]
+
+    cvd = request.cvd_summary
+    if cvd:
+        lines.append(f"Cardiovascular risk: {cvd.risk_level} ({cvd.five_year_risk_percent}% over 5 years)")
+        if cvd.modifiable_risk_factors:
+            lines.append(f"Modifiable risk factors: {'; '.join(cvd.modifiable_risk_factors)}")
+
+    if request.plan:
+        lines.append("Plan:")
+        lines.extend(f"- {item.advice}" for item in request.plan)
+
+    return "\n".join(lines)
+
+
+def prefix_hash(*parts: str) -> str:
+    """Hash prompt parts into a short identifier."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:16]
+
+
+class CompiledPrompt(NamedTuple):
+    """Messages for one LLM call plus hashes of their stable prefixes."""
+
+    messages: List["BaseMessage"]
+    static_prefix_hash: str
+    content_prefix_hash: str
+
+
+class PromptCompiler:
+    """Build report and summary prompts around precomputed static parts."""
+
+    def __init__(
+        self,
+        parser: "JsonOutputParser",
+        multi_parser: Optional["JsonOutputParser"] = None,
+        personalize_parser: Optional["JsonOutputParser"] = None,
+    ):
+        """Render the static prompt parts once.
+
+        Args:
+            parser: Output parser whose format instructions go into the prefix
+            multi_parser: Output parser for single-call multi-category reports
+            personalize_parser: Output parser for personalized prefaces
+        """
+        from langchain_core.messages import SystemMessage
+
+        self.format_instructions = parser.get_format_instructions()
+
+        self.report_system_text = f"{REPORT_SYSTEM_TEXT}\n\n{self.format_instructions}"
+        self.report_system_message = SystemMessage(content=self.report_system_text)
+        self.report_static_hash = prefix_hash(self.report_system_text)
+
+        if multi_parser is not None:
+            multi_system_text = f"{MULTI_REPORT_SYSTEM_TEXT}\n\n{multi_parser.get_format_instructions()}"
+            self.multi_report_system_message = SystemMessage(content=multi_system_text)
+            self.multi_report_static_hash = prefix_hash(multi_system_text)
+
+        if personalize_parser is not None:
+            personalize_system_text = (
+                f"{PERSONALIZE_SYSTEM_TEXT}\n\n{personalize_parser.get_format_instructions()}"
+            )
+            self.personalize_system_message = SystemMessage(content=personalize_system_text)
+            self.personalize_static_hash = prefix_hash(personalize_system_text)
+
+        self.summary_system_message = SystemMessage(content=SUMMARY_SYSTEM_TEXT)
+        self.summary_static_hash = prefix_hash(SUMMARY_SYSTEM_TEXT)
+
+        self.prefix_counts: Counter = Counter()
+
+    def _compile(
+        self,
+        system_message: "SystemMessage",
+        static_hash: str,
+        content: str,
+        task: str,
+    ) -> CompiledPrompt:
+        """Lay out system prefix, content and task, and record prefix reuse."""
+        from langchain_core.messages import HumanMessage
+
+        content_block = f"Content:\n{content}"
+        human_message = HumanMessage(content=f"{content_block}\n\n{task}")
+
+        content_hash = prefix_hash(system_message.content, content_block)
+        if len(self.prefix_counts) >= MAX_TRACKED_PREFIXES:
+            self.prefix_counts.clear()
+        self.prefix_counts[static_hash] += 1
+        self.prefix_counts[content_hash] += 1
+
+        return CompiledPrompt(
+            messages=[system_message, human_message],
+            static_prefix_hash=static_hash,
+            content_prefix_hash=content_hash,
+        )
+
+    def compile_report(self, category: str, content: str, target_words: Optional[int] = None) -> CompiledPrompt:
+        """Compile the prompt for a category report.
+
+        Args:
+            category: Category name
+            content: Category KB content
+            target_words: Requested report length, stated after the task
+        """
+        task = REPORT_TASK_TEXT.format(category=category)
+        if target_words:
+            task += "\n" + LENGTH_TEXT.format(words=target_words)
+
+        return self._compile(self.report_system_message, self.report_static_hash, content, task)
+
+    def compile_multi_report(
+        self,
+        categories_content: Dict[str, str],
+        target_words: Optional[Dict[str, int]] = None,
+    ) -> CompiledPrompt:
+        """Compile one prompt covering several categories.
+
+        Args:
+            categories_content: Category name to KB content
+            target_words: Requested report length per category
+        """
+        content = "\n\n".join(
+            f"## Category: {category}\n\n{text}"
+            for category, text in categories_content.items()
+        )
+        task = MULTI_REPORT_TASK_TEXT.format(categories=", ".join(categories_content))
+        targets = [
+            f"{category} about {words} words"
+            for category, words in (target_words or {}).items()
+            if words and category in categories_content
+        ]
+        if targets:
+            task += "\n" + MULTI_LENGTH_TEXT.format(targets=", ".join(targets))
+
+        return self._compile(self.multi_report_system_message, self.multi_report_static_hash, content, task)
+
+    def compile_personalization(self, patient_context: str, categories: List[str], words: int) -> CompiledPrompt:
+        """Compile the prompt for personalized guide prefaces.
+
+        Args:
+            patient_context: Output of format_patient_context
+            categories: Categories needing a preface
+            words: Target words per preface
+        """
+        return self._compile(
+            self.personalize_system_message,
+            self.personalize_static_hash,
+            patient_context,
+            PERSONALIZE_TASK_TEXT.format(categories=", ".join(categories), words=words),
+        )
+
+    def compile_summary(self, category: str, chunk: str) -> CompiledPrompt:
+        """Compile the prompt for a map-step chunk summary."""
+        return self._compile(
+            self.summary_system_message,
+            self.summary_static_hash,
+            chunk,
+            SUMMARY_TASK_TEXT.format(category=category),
+        )
+
+    def reuse_stats(self) -> Dict[str, float]:
+        """Summarize how often compiled prompts shared a prefix.
+
+        Returns:
+            Calls, distinct prefixes and the share of calls whose prefix
+            was seen before (an upper bound on provider cache hits)
+        """
+        static_hashes = {self.report_static_hash, self.summary_static_hash}
+        if hasattr(self, "multi_report_static_hash"):
+            static_hashes.add(self.multi_report_static_hash)
+        if hasattr(self, "personalize_static_hash"):
+            static_hashes.add(self.personalize_static_hash)
+        calls = sum(self.prefix_counts[key] for key in static_hashes)
+        content_counts = [
+            count for key, count in self.prefix_counts.items() if key not in static_hashes
+        ]
+        repeated = sum(count - 1 for count in content_counts)
+
+        return {
+            "calls": calls,
+            "distinct_content_prefixes": len(content_counts),
+            "content_prefix_reuse_ratio": (repeated / calls) if calls else 0.0,
+        }
@@ -3,12 +3,19 @@
 import json
 import asyncio
 import logging
-from typing import Callable, Optional
-from aio_pika import connect_robust, Message, DeliveryMode
-from aio_pika.abc import AbstractRobustConnection, AbstractRobustChannel, AbstractQueue
+from typing import TYPE_CHECKING, Callable, Optional
 
 from app.core.config import get_settings
 
+if TYPE_CHECKING:
+    # aio_pika is imported on first use
+    from aio_pika.abc import (
+        AbstractExchange,
+        AbstractRobustConnection,
+        AbstractRobustChannel,
+        AbstractQueue,
+    )
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
@@ -18,16 +25,22 @@ class RabbitMQService:
 
     def __init__(self):
         """Initialize RabbitMQ service."""
-        self.connection: Optional[AbstractRobustConnection] = None
-        self.channel: Optional[AbstractRobustChannel] = None
-        self.request_queue: Optional[AbstractQueue] = None
+        self.connection: Optional["AbstractRobustConnection"] = None
+        self.channel: Optional["AbstractRobustChannel"] = None
+        self.request_queue: Optional["AbstractQueue"] = None
         self.response_queue_name: str = settings.rabbitmq_response_queue
+        self.progress_exchange: Optional["AbstractExchange"] = None
 
     async def connect(self):
         """Establish connection to RabbitMQ."""
+        from aio_pika import ExchangeType, connect_robust
+
         try:
             logger.info(f"Connecting to RabbitMQ at {settings.rabbitmq_url}")
-            self.connection = await connect_robust(settings.rabbitmq_url)
+            self.connection = await connect_robust(
+                settings.rabbitmq_url,
+                timeout=settings.rabbitmq_connect_timeout,
+            )
             self.channel = await self.connection.channel()
             await self.channel.set_qos(prefetch_count=settings.rabbitmq_prefetch_count)
 
@@ -43,9 +56,27 @@ class RabbitMQService:
                 durable=True
             )
 
+            # Declare progress exchange (publisher); consumers bind their own queues
+            if settings.rabbitmq_progress_exchange:
+                self.progress_exchange = await self.channel.declare_exchange(
+                    settings.rabbitmq_progress_exchange,
+                    ExchangeType.TOPIC,
+                    durable=True
+                )
+
             logger.info("Successfully connected to RabbitMQ")
         except Exception as e:
             logger.error(f"Failed to connect to RabbitMQ: {e}")
+            # connect() may be retried; don't leave a robust connection reconnecting in the background
+            if self.connection:
+                try:
+                    await self.connection.close()
+                except Exception as close_error:
+                    logger.warning(f"Error closing failed RabbitMQ connection: {close_error}")
+            self.connection = None
+            self.channel = None
+            self.request_queue = None
+            self.progress_exchange = None
             raise
 
     async def disconnect(self):
@@ -92,6 +123,8 @@ class RabbitMQService:
         Args:
             response_data: Dictionary containing response data
         """
+        from aio_pika import DeliveryMode, Message
+
         if not self.channel:
             raise RuntimeError("RabbitMQ not connected. Call connect() first.")
 
@@ -112,6 +145,47 @@ class RabbitMQService:
             logger.error(f"Failed to publish response: {e}")
             raise
 
+    async def publish_progress(self, progress_data: dict):
+        """
+        Publish a progress message.
+
+        Messages go to the progress exchange with the user ID as routing key,
+        or to the response queue when no progress exchange is configured.
+        Progress is transient, so messages are not persisted.
+
+        Args:
+            progress_data: Dictionary containing progress data
+        """
+        from aio_pika import DeliveryMode, Message
+
+        if not self.channel:
+            raise RuntimeError("RabbitMQ not connected. Call connect() first.")
+
+        message = Message(
+            body=json.dumps(progress_data).encode(),
+            delivery_mode=DeliveryMode.NOT_PERSISTENT,
+            content_type="application/json"
+        )
+
+        try:
+            if self.progress_exchange:
+                await self.progress_exchange.publish(
+                    message,
+                    routing_key=progress_data.get("user_id", "unknown")
+                )
+            else:
+                await self.channel.default_exchange.publish(
+                    message,
+                    routing_key=self.response_queue_name
+                )
+            logger.debug(
+                f"Published progress {progress_data.get('progress')}% "
+                f"for {progress_data.get('request_id', 'unknown')}"
+            )
+        except Exception as e:
+            # Progress is best effort and must not fail the request
+            logger.warning(f"Failed to publish progress: {e}")
+
 
 # Global RabbitMQ service instance
 rabbitmq_service = RabbitMQService()
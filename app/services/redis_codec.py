@@ -0,0 +1,120 @@
+"""Serialization and compression of Redis cache values.
+
+Encoded values start with a 3-byte header: a zero marker byte, the
+serializer id and the compression id. Plain JSON text (written before this
+codec existed) never starts with a zero byte, so it is still decoded.
+
+Serializers: ``json`` (stdlib), ``orjson`` and ``msgpack``. Compression:
+``none``, ``zlib`` (stdlib) and ``zstd``; values smaller than the threshold
+are stored uncompressed. The optional packages are imported on first use.
+"""
+
+import json
+import zlib
+from typing import Any, Optional, Union
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+MARKER = b"\x00"
+
+SERIALIZER_IDS = {"json": b"j", "orjson": b"o", "msgpack": b"m"}
+COMPRESSION_IDS = {"none": b"n", "zlib": b"z", "zstd": b"s"}
+_SERIALIZERS = {value: key for key, value in SERIALIZER_IDS.items()}
+_COMPRESSIONS = {value: key for key, value in COMPRESSION_IDS.items()}
+
+
+def _require(module: str, package: str):
+    """Import an optional dependency with a helpful error."""
+    try:
+        return __import__(module)
+    except ImportError:
+        raise RuntimeError(f"Redis codec requires the '{package}' package: pip install {package}")
+
+
+class RedisCodec:
+    """Encode values to compact bytes and decode any supported format."""
+
+    def __init__(
+        self,
+        serializer: Optional[str] = None,
+        compression: Optional[str] = None,
+        threshold: Optional[int] = None,
+        level: Optional[int] = None,
+    ):
+        """Initialize codec (defaults from settings.redis_*).
+
+        Args:
+            serializer: json, orjson or msgpack
+            compression: none, zlib or zstd
+            threshold: Minimum serialized size in bytes to compress
+            level: Compression level (None = the library default)
+        """
+        self.serializer = serializer or settings.redis_serializer
+        self.compression = compression or settings.redis_compression
+        self.threshold = settings.redis_compression_threshold if threshold is None else threshold
+        self.level = level if level is not None else (settings.redis_compression_level or None)
+
+        if self.serializer not in SERIALIZER_IDS:
+            raise ValueError(f"Unsupported Redis serializer: {self.serializer}")
+        if self.compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unsupported Redis compression: {self.compression}")
+
+        # Fail at startup rather than on the first cache write
+        if self.serializer != "json":
+            _require(self.serializer, self.serializer)
+        if self.compression == "zstd":
+            _require("zstandard", "zstandard")
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize and, above the threshold, compress a value."""
+        payload = self._dumps(self.serializer, value)
+        compression = self.compression if len(payload) >= self.threshold else "none"
+        header = MARKER + SERIALIZER_IDS[self.serializer] + COMPRESSION_IDS[compression]
+        return header + self._compress(compression, payload)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Decode a value written by any codec configuration or as plain JSON."""
+        if isinstance(data, str) or not data.startswith(MARKER):
+            return json.loads(data)
+
+        serializer = _SERIALIZERS[data[1:2]]
+        compression = _COMPRESSIONS[data[2:3]]
+        return self._loads(serializer, self._decompress(compression, data[3:]))
+
+    @staticmethod
+    def _dumps(serializer: str, value: Any) -> bytes:
+        """Serialize a value."""
+        if serializer == "orjson":
+            return _require("orjson", "orjson").dumps(value)
+        if serializer == "msgpack":
+            return _require("msgpack", "msgpack").packb(value, use_bin_type=True)
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _loads(serializer: str, payload: bytes) -> Any:
+        """Deserialize a value."""
+        if serializer == "orjson":
+            return _require("orjson", "orjson").loads(payload)
+        if serializer == "msgpack":
+            return _require("msgpack", "msgpack").unpackb(payload, raw=False)
+        return json.loads(payload)
+
+    def _compress(self, compression: str, payload: bytes) -> bytes:
+        """Compress a payload."""
+        if compression == "zlib":
+            return zlib.compress(payload, self.level or zlib.Z_DEFAULT_COMPRESSION)
+        if compression == "zstd":
+            zstandard = _require("zstandard", "zstandard")
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(payload)
+        return payload
+
+    @staticmethod
+    def _decompress(compression: str, payload: bytes) -> bytes:
+        """Decompress a payload."""
+        if compression == "zlib":
+            return zlib.decompress(payload)
+        if compression == "zstd":
+            return _require("zstandard", "zstandard").ZstdDecompressor().decompress(payload)
+        return payload
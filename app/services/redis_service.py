@@ -1,33 +1,43 @@
 """Redis service for caching previous inputs."""
 
-import json
 import logging
-from typing import Optional, Any
-import redis.asyncio as redis
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from app.core.config import get_settings
+from app.core.connections import create_redis_client
+from app.services.redis_codec import RedisCodec
+
+if TYPE_CHECKING:
+    # redis is imported when the client is created (see create_redis_client)
+    import redis.asyncio as redis
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Reports are cached longer than inputs (24 hours)
+REPORT_CACHE_TTL = 86400
+
 
 class RedisService:
     """Redis service for caching operations."""
 
     def __init__(self):
         """Initialize Redis service."""
-        self.client: Optional[redis.Redis] = None
+        self.client: Optional["redis.Redis"] = None
+        self.codec: Optional[RedisCodec] = None
 
     async def connect(self):
         """Establish connection to Redis."""
         try:
             logger.info(f"Connecting to Redis at {settings.redis_url}")
-            self.client = redis.from_url(
-                settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True
-            )
+            self.codec = RedisCodec()
+            client = create_redis_client()
             # Test connection
-            await self.client.ping()
+            try:
+                await client.ping()
+            except Exception:
+                await client.close()
+                raise
+            self.client = client
             logger.info("Successfully connected to Redis")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
@@ -58,7 +68,7 @@ class RedisService:
         try:
             value = await self.client.get(key)
             if value:
-                return json.loads(value)
+                return self.codec.decode(value)
             return None
         except Exception as e:
             logger.error(f"Error getting key {key} from Redis: {e}")
@@ -70,7 +80,7 @@ class RedisService:
 
         Args:
             key: Cache key
-            value: Value to cache (will be JSON serialized)
+            value: Value to cache (encoded with the configured codec)
             ttl: Time to live in seconds (default: from settings)
         """
         if not self.client:
@@ -78,7 +88,7 @@ class RedisService:
 
         try:
             ttl = ttl or settings.redis_cache_ttl
-            serialized = json.dumps(value)
+            serialized = self.codec.encode(value)
             await self.client.setex(key, ttl, serialized)
             logger.debug(f"Cached key {key} with TTL {ttl}s")
         except Exception as e:
@@ -120,6 +130,83 @@ class RedisService:
             logger.error(f"Error checking key {key} in Redis: {e}")
             return False
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several values in one round trip (MGET).
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached value per key found
+        """
+        if not self.client:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+        if not keys:
+            return {}
+
+        try:
+            values = await self.client.mget(keys)
+            return {key: self.codec.decode(value) for key, value in zip(keys, values) if value}
+        except Exception as e:
+            logger.error(f"Error getting {len(keys)} keys from Redis: {e}")
+            return {}
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: Optional[int] = None,
+        ttls: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Set several values in one pipelined round trip.
+
+        Args:
+            items: Value per cache key (encoded with the configured codec)
+            ttl: Time to live in seconds (default: from settings)
+            ttls: Per-key TTLs overriding ttl
+        """
+        if not self.client:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+        if not items:
+            return
+
+        ttl = ttl or settings.redis_cache_ttl
+        ttls = ttls or {}
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttls.get(key, ttl), self.codec.encode(value))
+                await pipe.execute()
+            logger.debug(f"Cached {len(items)} keys")
+        except Exception as e:
+            logger.error(f"Error setting {len(items)} keys in Redis: {e}")
+            raise
+
+    async def get_and_set(self, key: str, value: Any, ttl: Optional[int] = None) -> Optional[Any]:
+        """
+        Replace a value and return the previous one in one command (SET ... GET).
+
+        Args:
+            key: Cache key
+            value: New value (encoded with the configured codec)
+            ttl: Time to live in seconds (default: from settings)
+
+        Returns:
+            Previous value or None if not found
+        """
+        if not self.client:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+
+        try:
+            previous = await self.client.set(
+                key, self.codec.encode(value), ex=ttl or settings.redis_cache_ttl, get=True
+            )
+            return self.codec.decode(previous) if previous else None
+        except Exception as e:
+            logger.error(f"Error replacing key {key} in Redis: {e}")
+            raise
+
     async def cache_input(self, user_id: str, input_data: dict):
         """
         Cache user input data.
@@ -144,6 +231,19 @@ class RedisService:
         cache_key = f"input:{user_id}"
         return await self.get(cache_key)
 
+    async def swap_cached_input(self, user_id: str, input_data: dict) -> Optional[dict]:
+        """
+        Cache user input data and return the previously cached input.
+
+        Args:
+            user_id: User identifier
+            input_data: Input data to cache
+
+        Returns:
+            Previously cached input data or None
+        """
+        return await self.get_and_set(f"input:{user_id}", input_data)
+
     async def cache_report(self, report_id: str, report_data: dict):
         """
         Cache generated report.
@@ -153,8 +253,7 @@ class RedisService:
             report_data: Report data to cache
         """
         cache_key = f"report:{report_id}"
-        # Cache reports for longer (24 hours)
-        await self.set(cache_key, report_data, ttl=86400)
+        await self.set(cache_key, report_data, ttl=REPORT_CACHE_TTL)
 
     async def get_cached_report(self, report_id: str) -> Optional[dict]:
         """
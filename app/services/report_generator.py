@@ -1,92 +1,445 @@
 """Report generation service using OpenAI and LangChain."""
 
-import os
-from typing import List, Dict
+import asyncio
+from typing import Awaitable, Callable, List, Dict, Optional
 from datetime import datetime
 import uuid
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.output_parsers import JsonOutputParser
-
-from app.models.schemas import CategoryReport, CategoryReportItem, MedicalReport
+from app.models.schemas import (
+    CategoryReport,
+    CategoryReportItem,
+    MedicalReport,
+    MultiCategoryReport,
+    ReportPersonalization,
+)
 from app.core.config import get_settings
+from app.services.hedging import HedgingPolicy
+from app.services.llm_backends import LLMBackend, get_llm_backend
+from app.services.output_budget import OutputBudgetPolicy, OutputLengthTracker
+from app.services.prompt_compiler import PromptCompiler, prefix_hash
+from app.services.source_links import content_urls, extract_sources, validate_links
+from app.services.token_budget import TokenBudgetPlanner
+from app.services.usage import record_usage
+from app.utils.tokens import count_tokens
 
 settings = get_settings()
 
+# Map-reduce summary passes before over-budget content is truncated
+MAX_SUMMARY_ROUNDS = 3
+
+# Callback receiving (category, output tokens so far) while streaming
+TokenProgressCallback = Callable[[str, int], Awaitable[None]]
+
+# Callback receiving each completed category report
+CategoryCompleteCallback = Callable[[CategoryReportItem], Awaitable[None]]
+
+
+def model_name(llm) -> str:
+    """Get the model name of a chat model or a bound chat model."""
+    llm = getattr(llm, "bound", llm)
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or settings.openai_model
+
+
+def estimated_usage(llm, messages: list, output_tokens: int = 0) -> Dict:
+    """Usage metadata for a call cancelled before the provider reported usage.
+
+    The prompt is billed once the provider has started processing it, so the
+    estimate counts the input tokens plus any output already received.
+    """
+    model = model_name(llm)
+    return {
+        "input_tokens": sum(count_tokens(message.content, model) for message in messages),
+        "output_tokens": output_tokens,
+    }
+
 
 class ReportGeneratorService:
     """Service for generating medical reports using AI."""
 
-    def __init__(self):
-        """Initialize the service."""
-        os.environ["OPENAI_API_KEY"] = settings.openai_api_key
-        self.llm = ChatOpenAI(
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        """Initialize the service.
+
+        Args:
+            backend: LLM backend (default: the one selected by settings.llm_backend)
+        """
+        from langchain_core.output_parsers import JsonOutputParser
+
+        self.backend = backend or get_llm_backend()
+        self.llm = self.backend.chat_model(
             model=settings.openai_model,
             temperature=settings.openai_temperature,
             max_tokens=settings.openai_max_tokens,
         )
+        self.summary_llm = self.backend.chat_model(
+            model=settings.openai_model,
+            temperature=0,
+            max_tokens=settings.summary_max_tokens,
+        )
         self.parser = JsonOutputParser(pydantic_object=CategoryReport)
+        self.multi_parser = JsonOutputParser(pydantic_object=MultiCategoryReport)
+        self.personalize_parser = JsonOutputParser(pydantic_object=ReportPersonalization)
+        self.prompts = PromptCompiler(self.parser, self.multi_parser, self.personalize_parser)
+        self.planner = TokenBudgetPlanner(model=settings.openai_model)
+        self._summary_semaphore = asyncio.Semaphore(settings.max_concurrent_summaries)
+
+        self.output_budget = OutputBudgetPolicy()
+        self.word_budgets: Dict[str, int] = {}
+        self.output_lengths = OutputLengthTracker()
+
+        self.personalize_llm = self.llm
+        if settings.personalization_model:
+            self.personalize_llm = self.backend.chat_model(
+                model=settings.personalization_model,
+                temperature=settings.openai_temperature,
+                max_tokens=settings.openai_max_tokens,
+            )
+
+        self.hedging = HedgingPolicy() if settings.hedging_enabled else None
+        self.hedge_llm = self.llm
+        if settings.hedge_fallback_model:
+            self.hedge_llm = self.backend.chat_model(
+                model=settings.hedge_fallback_model,
+                temperature=settings.openai_temperature,
+                max_tokens=settings.openai_max_tokens,
+            )
+
+    def set_source_words(self, source_words: Dict[str, int]):
+        """Set per-category output budgets from the KB's source lengths.
+
+        Args:
+            source_words: Sum of summary_length_words per category
+        """
+        if settings.output_budget_enabled:
+            self.word_budgets = self.output_budget.category_budgets(source_words)
+
+    def max_tokens_for(self, category: str) -> int:
+        """Output token cap for a category (global default without a budget)."""
+        words = self.word_budgets.get(category)
+        return self.output_budget.max_tokens(words) if words else settings.openai_max_tokens
+
+    def expected_tokens_for(self, category: str) -> int:
+        """Output tokens expected for a category (its cap without a budget)."""
+        words = self.word_budgets.get(category)
+        return self.output_budget.expected_tokens(words) if words else settings.openai_max_tokens
+
+    async def fit_to_budget(self, category_content: str, category: str) -> str:
+        """Shrink category content to the prompt token budget.
+
+        Content within budget is returned unchanged. Oversized content is
+        split into chunks that are summarized concurrently (map), and the
+        joined summaries replace the content (reduce input). This repeats
+        if the summaries themselves are still over budget, up to
+        MAX_SUMMARY_ROUNDS times; content still over budget after that is
+        truncated so the prompt cannot overflow the context window.
+
+        Args:
+            category_content: Aggregated content from knowledge base for the category
+            category: Category name
+
+        Returns:
+            Content that fits the planner's budget
+        """
+        for _ in range(MAX_SUMMARY_ROUNDS):
+            tokens = self.planner.measure(category_content)
+            if tokens <= self.planner.budget:
+                return category_content
+
+            chunks = self.planner.split(category_content)
+            print(
+                f"Category {category}: {tokens} tokens over budget "
+                f"{self.planner.budget}, summarizing {len(chunks)} chunks"
+            )
+            summaries = await asyncio.gather(
+                *[self._summarize_chunk(chunk, category) for chunk in chunks]
+            )
+            category_content = "\n\n---\n\n".join(summaries)
+
+        tokens = self.planner.measure(category_content)
+        if tokens <= self.planner.budget:
+            return category_content
+
+        print(
+            f"Category {category}: still {tokens} tokens after {MAX_SUMMARY_ROUNDS} summary rounds, "
+            f"truncating to budget {self.planner.budget}"
+        )
+        return self.planner.truncate(category_content)
+
+    async def _summarize_chunk(self, chunk: str, category: str) -> str:
+        """Summarize one content chunk, keeping facts and source links."""
+        prompt = self.prompts.compile_summary(category, chunk)
+
+        async with self._summary_semaphore:
+            response = await self.summary_llm.ainvoke(prompt.messages)
+        record_usage(model_name(self.summary_llm), response.usage_metadata)
+        return response.content
 
     async def generate_category_report(
-        self, category_content: str, category: str
+        self,
+        category_content: str,
+        category: str,
+        on_progress: Optional[TokenProgressCallback] = None,
     ) -> Dict:
         """Generate a friendly report for a specific category.
 
         Args:
             category_content: Aggregated content from knowledge base for the category
             category: Category name (e.g., 'weight_management', 'blood_pressure')
+            on_progress: Called with the output token count as the response streams
 
         Returns:
             Dictionary with category, text, and sources
         """
-        system_message = SystemMessage(
-            content="""You are a helpful health information assistant.
-Create a friendly, one-page report summarizing the provided content.
-Keep the tone warm and encouraging.
-Include inline links in the text using markdown format [text](url).
-Also provide a separate list of all source URLs at the end."""
+        prompt_content = await self.fit_to_budget(category_content, category)
+        prompt = self.prompts.compile_report(category, prompt_content, self.word_budgets.get(category))
+
+        llm, hedge_llm = self.llm, self.hedge_llm
+        if category in self.word_budgets:
+            max_tokens = self.max_tokens_for(category)
+            llm, hedge_llm = llm.bind(max_tokens=max_tokens), hedge_llm.bind(max_tokens=max_tokens)
+
+        output = await self._complete(llm, prompt.messages, category, on_progress, hedge_llm)
+        return self.attach_sources(self.parser.parse(output), category_content)
+
+    def attach_sources(self, report_dict: Dict, category_content: str) -> Dict:
+        """Add sources from the KB items used and unlink unknown URLs.
+
+        Args:
+            report_dict: Parsed model output with category and text
+            category_content: KB content the report was generated from
+                (before any summarization, so every item is attributed)
+
+        Returns:
+            Dictionary with category, text, and sources
+        """
+        sources = extract_sources(category_content)
+        text, removed = validate_links(
+            report_dict.get("text", ""),
+            sources + content_urls(category_content),
+        )
+        if removed:
+            print(f"Category {report_dict.get('category')}: unlinked {len(removed)} unknown URLs")
+
+        return {**report_dict, "text": text, "sources": sources}
+
+    def guide_version(self, category: str, kb_version: str) -> str:
+        """Version of a category's generic guide for the guide cache.
+
+        Changes with the category's KB content, the report prompt, the model
+        and the category's word budget.
+
+        Args:
+            category: Category name
+            kb_version: Version of the category's KB items
+
+        Returns:
+            Short hash identifying the guide
+        """
+        return prefix_hash(
+            kb_version,
+            self.prompts.report_static_hash,
+            model_name(self.llm),
+            str(self.word_budgets.get(category, "")),
         )
 
-        human_message = HumanMessage(
-            content=f"""Based on the following content about {category},
-create a one-page friendly summary report.
-Include inline source links in markdown format throughout the text.
-Extract and list all source URLs separately.
+    async def personalize(self, patient_context: str, categories: List[str]) -> Dict[str, str]:
+        """Write short patient-tailored prefaces for generic category guides.
+
+        One call covers all categories, with max_tokens sized for
+        settings.personalization_max_words per preface.
+
+        Args:
+            patient_context: Output of format_patient_context
+            categories: Categories whose guides need a preface
+
+        Returns:
+            Preface text per category
+        """
+        words = settings.personalization_max_words
+        prompt = self.prompts.compile_personalization(patient_context, categories, words)
+        llm = self.personalize_llm.bind(
+            max_tokens=self.output_budget.max_tokens(words * len(categories))
+        )
+
+        output = await self._call(llm, prompt.messages, "personalization")
+        return {
+            preface["category"]: preface["text"]
+            for preface in self.personalize_parser.parse(output).get("prefaces", [])
+            if preface.get("category") in categories and preface.get("text")
+        }
+
+    def use_single_call(self, categories_content: Dict[str, str]) -> bool:
+        """Decide whether all categories can be generated in one call.
 
-Content:
-{category_content}
+        Args:
+            categories_content: Dict mapping category names to their aggregated content
+
+        Returns:
+            True when enabled, there are few categories and their combined
+            content fits the prompt token budget
+        """
+        if not settings.multi_category_enabled:
+            return False
+        if not 1 < len(categories_content) <= settings.multi_category_max_categories:
+            return False
+        return self.planner.fits("".join(categories_content.values()))
+
+    async def generate_multi_category_report(
+        self,
+        categories_content: Dict[str, str],
+        on_progress: Optional[TokenProgressCallback] = None,
+    ) -> List[Dict]:
+        """Generate reports for several categories in a single call.
 
-{self.parser.get_format_instructions()}"""
+        Args:
+            categories_content: Dict mapping category names to their aggregated content
+            on_progress: Called with the output token count as the response streams
+
+        Returns:
+            List of dictionaries with category, text, and sources
+        """
+        prompt = self.prompts.compile_multi_report(categories_content, self.word_budgets)
+        max_tokens = sum(self.max_tokens_for(category) for category in categories_content)
+        llm = self.llm.bind(max_tokens=max_tokens)
+        hedge_llm = self.hedge_llm.bind(max_tokens=max_tokens)
+
+        output = await self._complete(
+            llm, prompt.messages, ",".join(categories_content), on_progress, hedge_llm
         )
+        return [
+            self.attach_sources(report_dict, categories_content[report_dict["category"]])
+            for report_dict in self.multi_parser.parse(output).get("reports", [])
+            if report_dict.get("category") in categories_content
+        ]
+
+    async def _complete(
+        self,
+        llm,
+        messages: list,
+        category: str,
+        on_progress: Optional[TokenProgressCallback] = None,
+        hedge_llm=None,
+    ) -> str:
+        """Run a completion, hedging it when enabled and a hedge model is given.
+
+        The hedge reports no progress, so progress messages keep following
+        the primary call even if the hedge ends up winning.
+        """
+        if self.hedging is None or hedge_llm is None:
+            return await self._call(llm, messages, category, on_progress)
 
-        response = self.llm.invoke([system_message, human_message])
-        return self.parser.parse(response.content)
+        return await self.hedging.run(
+            category,
+            lambda: self._call(llm, messages, category, on_progress),
+            lambda: self._call(hedge_llm, messages, category),
+        )
+
+    async def _call(
+        self,
+        llm,
+        messages: list,
+        category: str,
+        on_progress: Optional[TokenProgressCallback] = None,
+    ) -> str:
+        """Run a single completion, streaming it when enabled, and record its usage."""
+        if settings.openai_streaming:
+            return await self._stream(llm, messages, category, on_progress)
+
+        try:
+            response = await llm.ainvoke(messages)
+        except asyncio.CancelledError:
+            # E.g. the losing side of a hedge
+            record_usage(model_name(llm), estimated_usage(llm, messages))
+            raise
+        record_usage(model_name(llm), response.usage_metadata)
+        return response.content
+
+    async def _stream(
+        self,
+        llm,
+        messages: list,
+        category: str,
+        on_progress: Optional[TokenProgressCallback] = None,
+    ) -> str:
+        """Stream a completion, reporting progress per received chunk."""
+        parts = []
+        usage = None
+        try:
+            async for chunk in llm.astream(messages):
+                if chunk.usage_metadata:
+                    # Usage arrives on the final chunk
+                    usage = chunk.usage_metadata
+                if not chunk.content:
+                    continue
+                parts.append(chunk.content)
+                if on_progress:
+                    # Each streamed chunk carries roughly one token
+                    await on_progress(category, len(parts))
+        except asyncio.CancelledError:
+            record_usage(model_name(llm), estimated_usage(llm, messages, len(parts)))
+            raise
+
+        record_usage(model_name(llm), usage)
+        return "".join(parts)
 
     async def generate_reports_for_categories(
-        self, categories_content: Dict[str, str]
+        self,
+        categories_content: Dict[str, str],
+        on_progress: Optional[TokenProgressCallback] = None,
+        on_category_complete: Optional[CategoryCompleteCallback] = None,
     ) -> List[CategoryReportItem]:
         """Generate reports for multiple categories.
 
+        Small requests whose content fits the token budget are generated in
+        one call; categories missing from that response, or all of them if
+        it fails, fall back to one call per category.
+
         Args:
             categories_content: Dict mapping category names to their aggregated content
+            on_progress: Called with streamed output token counts per category
+            on_category_complete: Called with each report as soon as it is ready
 
         Returns:
             List of CategoryReportItem objects
         """
+        remaining = {category: content for category, content in categories_content.items() if content}
         reports = []
 
-        for category, content in categories_content.items():
-            if not content:
-                continue
-
+        if self.use_single_call(remaining):
+            print(f"Generating reports in one call for categories: {', '.join(remaining)}")
+            try:
+                for report_dict in await self.generate_multi_category_report(remaining, on_progress):
+                    if report_dict.get("category") not in remaining:
+                        continue
+                    report = CategoryReportItem(**report_dict)
+                    del remaining[report.category]
+                    reports.append(report)
+                    self._record_length(report)
+
+                    if on_category_complete:
+                        await on_category_complete(report)
+            except Exception as e:
+                print(f"Single-call generation failed, falling back per category: {e}")
+
+        for category, content in remaining.items():
             print(f"Generating report for category: {category}")
-            report_dict = await self.generate_category_report(content, category)
+            report_dict = await self.generate_category_report(content, category, on_progress)
             report = CategoryReportItem(**report_dict)
             reports.append(report)
+            self._record_length(report)
+
+            if on_category_complete:
+                await on_category_complete(report)
 
         return reports
 
+    def _record_length(self, report: CategoryReportItem):
+        """Track requested vs actual length of a generated report."""
+        self.output_lengths.record(
+            report.category,
+            self.word_budgets.get(report.category),
+            len(report.text.split()),
+        )
+
     def generate_markdown(self, report: MedicalReport) -> str:
         """Generate markdown format of the medical report.
 
@@ -156,6 +509,8 @@ Content:
             md_parts.append("## Detailed Health Information Guides\n\n")
             for cat_report in report.category_reports:
                 md_parts.append(f"### {cat_report.category.replace('_', ' ').title()}\n\n")
+                if cat_report.preface:
+                    md_parts.append(f"*{cat_report.preface}*\n\n")
                 md_parts.append(f"{cat_report.text}\n\n")
 
                 if cat_report.sources:
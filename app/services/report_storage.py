@@ -2,16 +2,39 @@
 
 import uuid
 from datetime import datetime
-from typing import Optional
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple
 
 from app.models.schemas import MedicalReport
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# Keyset cursor: (created_at, report_id) of the last report on a page
+ReportCursor = Tuple[datetime, str]
+
+# Fields needed to render a report listing (no category texts or files)
+REPORT_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "report_id": 1,
+    "user_id": 1,
+    "created_at": 1,
+    "status": 1,
+    "model_used": 1,
+    "generation_time_seconds": 1,
+    "patient.name": 1,
+    "report_data.patient.name": 1,
+    "category_reports.category": 1,
+    "report_data.category_reports.category": 1,
+}
+
+# Newest first, report_id breaks ties between equal timestamps
+REPORT_LISTING_SORT = [("created_at", -1), ("report_id", -1)]
+
 
 class ReportStorageService:
     """Service for storing and retrieving medical reports."""
 
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: "AsyncIOMotorDatabase"):
         """Initialize service."""
         self.db = db
         self.reports_collection = db.medical_reports
@@ -82,30 +105,117 @@ class ReportStorageService:
         return await self.reports_collection.find_one({"report_id": report_id})
 
     async def get_user_reports(
-        self, user_id: str, limit: int = 10, skip: int = 0
+        self,
+        user_id: str,
+        limit: int = 10,
+        skip: int = 0,
+        after: Optional[ReportCursor] = None,
+        summary: bool = False,
     ) -> list:
         """Get reports for a user.
 
+        Prefer ``after`` over ``skip``: a keyset cursor seeks straight to the
+        next page through the ``(user_id, created_at, report_id)`` index,
+        while ``skip`` walks every skipped entry.
+
         Args:
             user_id: User ID
             limit: Max number of reports to return
-            skip: Number of reports to skip
+            skip: Number of reports to skip (offset pagination)
+            after: Cursor of the last report on the previous page
+            summary: Only return listing fields (see REPORT_SUMMARY_PROJECTION)
 
         Returns:
             List of report documents
         """
+        reports, _ = await self.get_user_reports_page(
+            user_id, limit=limit, after=after, summary=summary, skip=skip
+        )
+        return reports
+
+    async def get_user_reports_page(
+        self,
+        user_id: str,
+        limit: int = 10,
+        after: Optional[ReportCursor] = None,
+        summary: bool = False,
+        skip: int = 0,
+    ) -> Tuple[List[dict], Optional[ReportCursor]]:
+        """Get one page of a user's reports using keyset pagination.
+
+        Args:
+            user_id: User ID
+            limit: Page size
+            after: Cursor of the last report on the previous page
+            summary: Only return listing fields
+            skip: Legacy offset, only meaningful without ``after``
+
+        Returns:
+            Tuple of (reports, next_cursor); next_cursor is None on the last page
+        """
+        query = self._keyset_query(user_id, after)
+        projection = REPORT_SUMMARY_PROJECTION if summary else None
+
+        # Fetch one extra document to learn whether another page exists
         cursor = (
-            self.reports_collection.find({"user_id": user_id})
-            .sort("created_at", -1)
-            .limit(limit)
-            .skip(skip)
+            self.reports_collection.find(query, projection)
+            .sort(REPORT_LISTING_SORT)
+            .limit(limit + 1)
         )
+        if skip and after is None:
+            cursor = cursor.skip(skip)
 
         reports = []
         async for report in cursor:
             reports.append(report)
 
-        return reports
+        if len(reports) <= limit:
+            return reports, None
+
+        reports = reports[:limit]
+        last = reports[-1]
+        return reports, (last["created_at"], last["report_id"])
+
+    async def iter_user_reports(
+        self,
+        user_id: str,
+        page_size: int = 50,
+        summary: bool = True,
+        after: Optional[ReportCursor] = None,
+    ) -> AsyncIterator[List[dict]]:
+        """Stream a user's reports page by page, newest first.
+
+        Args:
+            user_id: User ID
+            page_size: Number of reports per page
+            summary: Only return listing fields (default for listings)
+            after: Cursor to resume from
+
+        Yields:
+            Lists of report documents, one list per page
+        """
+        while True:
+            reports, after = await self.get_user_reports_page(
+                user_id, limit=page_size, after=after, summary=summary
+            )
+            if reports:
+                yield reports
+            if after is None:
+                return
+
+    @staticmethod
+    def _keyset_query(user_id: str, after: Optional[ReportCursor]) -> dict:
+        """Build the filter selecting reports strictly after a cursor."""
+        query = {"user_id": user_id}
+        if after is None:
+            return query
+
+        created_at, report_id = after
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "report_id": {"$lt": report_id}},
+        ]
+        return query
 
     async def delete_report(self, report_id: str) -> bool:
         """Delete a report.
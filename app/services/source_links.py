@@ -0,0 +1,74 @@
+"""Deterministic report sources and inline link validation.
+
+The model only writes the narrative text. Sources are the KB items whose
+content went into the prompt (their ``Source:`` lines, plus the sources of
+near-duplicate paragraphs merged into them), and inline links pointing
+anywhere else are unlinked so a hallucinated URL never reaches a patient.
+"""
+
+import re
+from typing import List, Tuple
+
+# "Source: <url>" item lines, or "[also: <url>, ...]" dedup annotations
+_SOURCES = re.compile(r"^Source: (\S+)$|\[also: ([^\]]+)\]", re.MULTILINE)
+_MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\((\S+?)\)")
+_URL = re.compile(r"https?://[^\s<>()\[\]]+")
+
+
+def _normalize(url: str) -> str:
+    """Normalize a URL for comparison."""
+    return url.strip().rstrip("/").lower()
+
+
+def extract_sources(content: str) -> List[str]:
+    """List the source URLs of the KB items in prompt content.
+
+    Args:
+        content: Category content as fed into the prompt
+
+    Returns:
+        Unique URLs in order of first appearance
+    """
+    urls = []
+    for match in _SOURCES.finditer(content):
+        if match.group(1):
+            urls.append(match.group(1))
+        else:
+            urls.extend(url.strip() for url in match.group(2).split(","))
+
+    seen = set()
+    unique = []
+    for url in urls:
+        key = _normalize(url)
+        if url and key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+def content_urls(content: str) -> List[str]:
+    """List every URL mentioned anywhere in prompt content."""
+    return [url.rstrip(".,;:'\"") for url in _URL.findall(content)]
+
+
+def validate_links(text: str, allowed_urls: List[str]) -> Tuple[str, List[str]]:
+    """Unlink inline markdown links that do not point to a known URL.
+
+    Args:
+        text: Generated report text
+        allowed_urls: URLs the text may link to (sources and URLs in the content)
+
+    Returns:
+        Tuple of (text with unknown links replaced by their label, removed URLs)
+    """
+    allowed = {_normalize(url) for url in allowed_urls}
+    removed = []
+
+    def replace(match: re.Match) -> str:
+        label, url = match.groups()
+        if _normalize(url) in allowed:
+            return match.group(0)
+        removed.append(url)
+        return label
+
+    return _MARKDOWN_LINK.sub(replace, text), removed
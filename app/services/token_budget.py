@@ -0,0 +1,102 @@
+"""Token budget planning for LLM prompts."""
+
+from typing import Dict, List, Optional
+
+from app.core.config import get_settings
+from app.utils.tokens import count_tokens, get_encoding
+
+settings = get_settings()
+
+# Separator written between KB items by KnowledgeBaseService.get_content_for_category
+KB_ITEM_SEPARATOR = "---\n\n"
+
+
+class TokenBudgetPlanner:
+    """Measure prompt content and split it into chunks that fit a token budget."""
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        budget: Optional[int] = None,
+        chunk_tokens: Optional[int] = None,
+    ):
+        """Initialize planner.
+
+        Args:
+            model: Model name (default: settings.openai_model)
+            budget: Max content tokens sent in one call (default: per-model setting)
+            chunk_tokens: Max tokens per map chunk (default: settings.summary_chunk_tokens)
+        """
+        self.model = model or settings.openai_model
+        self.budget = budget or self.budget_for_model(self.model)
+        self.chunk_tokens = min(chunk_tokens or settings.summary_chunk_tokens, self.budget)
+
+    @staticmethod
+    def budget_for_model(model: str, budgets: Optional[Dict[str, int]] = None) -> int:
+        """Get the content token budget configured for a model."""
+        budgets = settings.prompt_token_budgets if budgets is None else budgets
+        return budgets.get(model, settings.prompt_token_budget)
+
+    def measure(self, text: str) -> int:
+        """Count tokens in text for the planner's model."""
+        return count_tokens(text, self.model)
+
+    def fits(self, text: str) -> bool:
+        """Check whether text fits the budget of a single call."""
+        return self.measure(text) <= self.budget
+
+    def truncate(self, text: str) -> str:
+        """Cut text to at most budget tokens."""
+        encoding = get_encoding(self.model)
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:self.budget])
+
+    def split(self, text: str) -> List[str]:
+        """Split text into chunks of at most chunk_tokens tokens.
+
+        KB items are kept whole where possible, then paragraphs, and only
+        oversized paragraphs are cut at token boundaries.
+        """
+        pieces = []
+        for item in text.split(KB_ITEM_SEPARATOR):
+            if not item.strip():
+                continue
+            if self.measure(item) <= self.chunk_tokens:
+                pieces.append(item)
+                continue
+            for paragraph in item.split("\n\n"):
+                if not paragraph.strip():
+                    continue
+                if self.measure(paragraph) <= self.chunk_tokens:
+                    pieces.append(paragraph + "\n\n")
+                else:
+                    pieces.extend(self._split_tokens(paragraph))
+
+        return self._pack(pieces)
+
+    def _split_tokens(self, text: str) -> List[str]:
+        """Cut text into slices of exactly chunk_tokens tokens."""
+        encoding = get_encoding(self.model)
+        tokens = encoding.encode(text, disallowed_special=())
+        return [
+            encoding.decode(tokens[i:i + self.chunk_tokens])
+            for i in range(0, len(tokens), self.chunk_tokens)
+        ]
+
+    def _pack(self, pieces: List[str]) -> List[str]:
+        """Greedily pack consecutive pieces into chunks within chunk_tokens."""
+        chunks = []
+        current = []
+        current_tokens = 0
+
+        for piece in pieces:
+            piece_tokens = self.measure(piece)
+            if current and current_tokens + piece_tokens > self.chunk_tokens:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+
+        if current:
+            chunks.append("".join(current))
+
+        return chunks
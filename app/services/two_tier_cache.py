@@ -0,0 +1,322 @@
+"""Two-tier cache: a bounded in-process LRU in front of Redis.
+
+Reads are served from process memory while the entry is fresh, falling back
+to Redis (one MGET for a batch of keys). Misses can be cached locally for a
+short time (negative caching) so a hot missing key does not hit Redis on
+every request. Writes go to Redis and to the local tier, and publish an
+invalidation on a Redis pub/sub channel so other workers drop their stale
+local copies.
+
+The local tier is sized by the encoded size of the values and is only a
+read cache: the local TTL is capped (``local_cache_ttl_seconds``) so a lost
+invalidation message cannot keep a stale entry alive for long.
+
+Cached values are shared between callers and must not be mutated.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.services.redis_service import REPORT_CACHE_TTL, RedisService, redis_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Local marker for a key known to be missing from Redis
+_MISSING = object()
+
+
+class LocalCache:
+    """LRU cache with per-entry expiry, bounded by total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        """Initialize cache.
+
+        Args:
+            max_bytes: Maximum total size of the cached entries
+        """
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Look up a key.
+
+        Returns:
+            (found, value); expired entries are dropped and not found
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self.discard(key)
+            return False, None
+
+        self.entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: str, value: Any, size: int, ttl: float):
+        """Store a value, evicting least recently used entries over max_bytes.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            size: Size of the value in bytes
+            ttl: Seconds until the entry expires
+        """
+        self.discard(key)
+        if size > self.max_bytes or ttl <= 0:
+            return
+
+        self.entries[key] = (value, time.monotonic() + ttl, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def discard(self, key: str):
+        """Remove a key if present."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def clear(self):
+        """Remove all entries."""
+        self.entries.clear()
+        self.bytes = 0
+
+
+class TwoTierCache:
+    """Namespaced cache over a local LRU tier and Redis."""
+
+    def __init__(
+        self,
+        redis: Optional[RedisService] = None,
+        max_bytes: Optional[int] = None,
+        local_ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None,
+        namespace_ttls: Optional[Dict[str, int]] = None,
+        channel: Optional[str] = None,
+    ):
+        """Initialize cache (defaults from settings).
+
+        Args:
+            redis: Redis service (default: the global instance)
+            max_bytes: Size of the local tier
+            local_ttl: Max seconds an entry is served from the local tier
+            negative_ttl: Seconds a Redis miss is remembered locally (0 = off)
+            namespace_ttls: Redis TTL per namespace (others use redis_cache_ttl)
+            channel: Pub/sub channel for cross-process invalidation
+        """
+        self.redis = redis or redis_service
+        self.local = LocalCache(max_bytes or settings.local_cache_max_bytes)
+        self.local_ttl = local_ttl or settings.local_cache_ttl_seconds
+        self.negative_ttl = settings.negative_cache_ttl_seconds if negative_ttl is None else negative_ttl
+        self.namespace_ttls = {
+            "input": settings.redis_cache_ttl,
+            "report": REPORT_CACHE_TTL,
+            "guide": settings.guide_cache_ttl_seconds,
+            **settings.cache_namespace_ttls,
+            **(namespace_ttls or {}),
+        }
+        self.channel = channel or settings.cache_invalidation_channel
+        self.origin = uuid.uuid4().hex
+
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self.counts = {
+            "local_hits": 0,
+            "negative_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "invalidations_received": 0,
+        }
+
+    def ttl(self, namespace: str) -> int:
+        """Redis TTL of a namespace."""
+        return self.namespace_ttls.get(namespace, settings.redis_cache_ttl)
+
+    @staticmethod
+    def key(namespace: str, key: str) -> str:
+        """Redis key of a namespaced key."""
+        return f"{namespace}:{key}"
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Get one value (None if missing)."""
+        return (await self.get_many(namespace, [key])).get(key)
+
+    async def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values, reading local misses from Redis in one round trip.
+
+        Args:
+            namespace: Cache namespace
+            keys: Keys within the namespace
+
+        Returns:
+            Value per key found
+        """
+        found = {}
+        remote = []
+        for key in keys:
+            hit, value = self.local.get(self.key(namespace, key))
+            if not hit:
+                remote.append(key)
+            elif value is _MISSING:
+                self.counts["negative_hits"] += 1
+            else:
+                self.counts["local_hits"] += 1
+                found[key] = value
+
+        if not remote:
+            return found
+        if not self.redis.client:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+
+        local_ttl = min(self.local_ttl, self.ttl(namespace))
+        try:
+            raw_values = await self.redis.client.mget([self.key(namespace, key) for key in remote])
+        except Exception as e:
+            logger.error(f"Error getting {len(remote)} keys from Redis: {e}")
+            return found
+
+        for key, raw in zip(remote, raw_values):
+            cache_key = self.key(namespace, key)
+            if raw is None:
+                self.counts["misses"] += 1
+                if self.negative_ttl:
+                    self.local.put(cache_key, _MISSING, len(cache_key), min(self.negative_ttl, local_ttl))
+                continue
+
+            value = self.redis.codec.decode(raw)
+            self.counts["redis_hits"] += 1
+            self.local.put(cache_key, value, len(raw), local_ttl)
+            found[key] = value
+
+        return found
+
+    async def set(self, namespace: str, key: str, value: Any):
+        """Set one value."""
+        await self.set_many(namespace, {key: value})
+
+    async def set_many(self, namespace: str, items: Dict[str, Any]):
+        """Write values to Redis and the local tier, invalidating other processes.
+
+        The writes and the invalidation message go in one pipeline.
+
+        Args:
+            namespace: Cache namespace
+            items: Value per key within the namespace
+        """
+        if not items:
+            return
+        if not self.redis.client:
+            raise RuntimeError("Redis not connected. Call connect() first.")
+
+        ttl = self.ttl(namespace)
+        encoded = {key: self.redis.codec.encode(value) for key, value in items.items()}
+        async with self.redis.client.pipeline(transaction=False) as pipe:
+            for key, raw in encoded.items():
+                pipe.setex(self.key(namespace, key), ttl, raw)
+            pipe.publish(self.channel, self._invalidation(namespace, list(items)))
+            await pipe.execute()
+
+        local_ttl = min(self.local_ttl, ttl)
+        for key, value in items.items():
+            self.local.put(self.key(namespace, key), value, len(encoded[key]), local_ttl)
+
+    async def invalidate(self, namespace: str, keys: Optional[List[str]] = None):
+        """Delete keys everywhere, or drop a whole namespace from every local tier.
+
+        Args:
+            namespace: Cache namespace
+            keys: Keys to delete from Redis and local tiers; None drops the
+                namespace from the local tiers only (Redis entries expire)
+        """
+        async with self.redis.client.pipeline(transaction=False) as pipe:
+            if keys:
+                pipe.delete(*[self.key(namespace, key) for key in keys])
+            pipe.publish(self.channel, self._invalidation(namespace, keys))
+            await pipe.execute()
+        self._drop(namespace, keys)
+
+    def _invalidation(self, namespace: str, keys: Optional[List[str]]) -> str:
+        """Invalidation message for other processes."""
+        return json.dumps({"origin": self.origin, "namespace": namespace, "keys": keys})
+
+    def _drop(self, namespace: str, keys: Optional[List[str]]):
+        """Drop keys (or a whole namespace) from the local tier."""
+        if keys is None:
+            prefix = self.key(namespace, "")
+            for cache_key in [cache_key for cache_key in self.local.entries if cache_key.startswith(prefix)]:
+                self.local.discard(cache_key)
+            return
+
+        for key in keys:
+            self.local.discard(self.key(namespace, key))
+
+    async def start(self):
+        """Subscribe to invalidations from other processes."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Stop listening for invalidations."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self):
+        """Apply invalidation messages, resubscribing after errors."""
+        while True:
+            pubsub = self.redis.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("origin") == self.origin:
+                        continue
+                    self.counts["invalidations_received"] += 1
+                    self._drop(data["namespace"], data.get("keys"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.warning(f"Cache invalidation listener failed, clearing local cache: {e}")
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    def stats(self) -> Dict:
+        """Hit/miss counts and local tier usage."""
+        lookups = sum(self.counts[key] for key in ("local_hits", "negative_hits", "redis_hits", "misses"))
+        return {
+            **self.counts,
+            "local_hit_ratio": (
+                (self.counts["local_hits"] + self.counts["negative_hits"]) / lookups if lookups else 0.0
+            ),
+            "local_entries": len(self.local.entries),
+            "local_bytes": self.local.bytes,
+            "local_max_bytes": self.local.max_bytes,
+            "evictions": self.local.evictions,
+        }
+
+
+# Global two-tier cache instance
+two_tier_cache = TwoTierCache()
@@ -0,0 +1,190 @@
+"""Token usage and cost accounting for LLM calls.
+
+Every call's usage (prompt, cached prompt and completion tokens) is recorded
+into the worker-wide tracker and, while a request is being processed, into
+that request's tracker as well. The request tracker is held in a context
+variable so concurrent requests sharing one ReportGeneratorService never mix
+their totals.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# USD per 1M tokens: (input, output, cached input)
+DEFAULT_PRICES_PER_MILLION: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+    "gpt-4.1": (2.00, 8.00, 0.50),
+    "gpt-4.1-mini": (0.40, 1.60, 0.10),
+    "gpt-4.1-nano": (0.10, 0.40, 0.025),
+    "gpt-4-turbo": (10.00, 30.00, 10.00),
+    "gpt-3.5-turbo": (0.50, 1.50, 0.50),
+}
+
+_current_usage: ContextVar[Optional["UsageTracker"]] = ContextVar("current_usage", default=None)
+_unpriced_models = set()
+
+
+def get_price(model: str) -> Tuple[float, float, float]:
+    """Look up the per-1M-token prices of a model.
+
+    Settings overrides (``llm_prices_per_million``) win over the defaults.
+    Dated model names (``gpt-4o-2024-08-06``) match their longest known
+    prefix. Unknown models cost 0 and are logged once.
+
+    Args:
+        model: Model name
+
+    Returns:
+        Tuple of (input, output, cached input) USD per 1M tokens
+    """
+    prices = {**DEFAULT_PRICES_PER_MILLION, **settings.llm_prices_per_million}
+    match = max((name for name in prices if model.startswith(name)), key=len, default=None)
+    if match is None:
+        if model not in _unpriced_models:
+            _unpriced_models.add(model)
+            logger.warning(f"No price configured for model {model}, counting its cost as 0")
+        return 0.0, 0.0, 0.0
+
+    price = tuple(prices[match])
+    input_price, output_price = price[0], price[1]
+    cached_price = price[2] if len(price) > 2 else input_price
+    return input_price, output_price, cached_price
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """Estimate the USD cost of one call.
+
+    Args:
+        model: Model name
+        prompt_tokens: Input tokens, including cached ones
+        completion_tokens: Output tokens
+        cached_tokens: Input tokens served from the provider's prompt cache
+
+    Returns:
+        Cost in USD
+    """
+    input_price, output_price, cached_price = get_price(model)
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1e6
+
+
+def usage_from_metadata(usage_metadata: Optional[Dict]) -> Tuple[int, int, int]:
+    """Read (prompt, completion, cached) tokens from LangChain usage metadata."""
+    if not usage_metadata:
+        return 0, 0, 0
+    details = usage_metadata.get("input_token_details") or {}
+    return (
+        usage_metadata.get("input_tokens", 0),
+        usage_metadata.get("output_tokens", 0),
+        details.get("cache_read", 0) or 0,
+    )
+
+
+class UsageTracker:
+    """Running token and cost totals, overall and per model."""
+
+    def __init__(self):
+        """Initialize empty totals."""
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost_usd = 0.0
+        self.by_model: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus completion tokens."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        """Record one call.
+
+        Args:
+            model: Model name
+            prompt_tokens: Input tokens, including cached ones
+            completion_tokens: Output tokens
+            cached_tokens: Input tokens served from the prompt cache
+
+        Returns:
+            Cost of the call in USD
+        """
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_tokens
+        self.cost_usd += cost
+
+        model_totals = self.by_model.setdefault(model, {
+            "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0,
+        })
+        model_totals["calls"] += 1
+        model_totals["prompt_tokens"] += prompt_tokens
+        model_totals["completion_tokens"] += completion_tokens
+        model_totals["cached_tokens"] += cached_tokens
+        model_totals["cost_usd"] += cost
+
+        return cost
+
+    def to_dict(self) -> Dict:
+        """Totals as a plain dict (for storage and metrics)."""
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "by_model": self.by_model,
+        }
+
+
+# Usage of every LLM call made by this process
+worker_usage = UsageTracker()
+
+
+def record_usage(model: str, usage_metadata: Optional[Dict]) -> float:
+    """Record one call's usage in the worker totals and the current request.
+
+    Args:
+        model: Model name
+        usage_metadata: LangChain ``usage_metadata`` of the response
+
+    Returns:
+        Cost of the call in USD
+    """
+    prompt_tokens, completion_tokens, cached_tokens = usage_from_metadata(usage_metadata)
+    cost = worker_usage.record(model, prompt_tokens, completion_tokens, cached_tokens)
+
+    request_usage = _current_usage.get()
+    if request_usage is not None:
+        request_usage.record(model, prompt_tokens, completion_tokens, cached_tokens)
+
+    return cost
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageTracker]:
+    """Collect the usage of LLM calls made inside the block.
+
+    Tasks started inside the block inherit the tracker.
+    """
+    tracker = UsageTracker()
+    token = _current_usage.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_usage.reset(token)
@@ -0,0 +1,65 @@
+"""Knowledge base content normalization.
+
+The KB markdown files are LLM-written summaries pasted from a chat UI. They
+carry citation placeholders, decorative separators, conversational preambles
+and a copy of their own metadata, none of which helps the report model.
+"""
+
+import re
+
+# Bump when the rules change so stored normalized content can be compared
+NORMALIZATION_VERSION = 1
+
+# Object replacement (citation placeholders), zero-width and BOM characters
+_JUNK_CHARS = re.compile("[￼​‌‍⁠﻿]")
+
+# Lines made only of decorative separators (⸻, ———, ***, ___)
+_SEPARATOR_LINE = re.compile(r"^[ \t]*(?:[⸺⸻—―]+|[-*_]{3,})[ \t]*$", re.MULTILINE)
+
+# Conversational opener, e.g. "Here is a 400-word plain-language summary of ...:"
+_PREAMBLE = re.compile(
+    r"\A\s*(?:Here(?: is|’s|'s)|Below is)\b[^\n]*(?:summary|found|overview)[^\n]*\n",
+    re.IGNORECASE,
+)
+
+# Trailing copy of the metadata.json entry, optionally under a "Metadata" heading
+_EMBEDDED_METADATA = re.compile(r"\n(?:#*\s*Metadata\s*\n)?\s*\{\s*\"file_name\"[\s\S]*\}\s*\Z")
+
+# Bullet glyphs with surrounding tabs, e.g. "\t•\tText"
+_BULLET = re.compile(r"^[ \t]*[•◦▪‣][ \t]*", re.MULTILINE)
+
+_CHAR_MAP = str.maketrans({
+    "“": '"',
+    "”": '"',
+    "‘": "'",
+    "’": "'",
+    " ": " ",
+    " ": " ",
+    " ": " ",
+})
+
+_INLINE_SPACES = re.compile(r"[ \t]{2,}")
+_TRAILING_SPACES = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_kb_content(content: str) -> str:
+    """Strip formatting noise from a knowledge base markdown document.
+
+    Args:
+        content: Raw markdown content
+
+    Returns:
+        Normalized content with the same substance
+    """
+    text = content.replace("\r\n", "\n")
+    text = _EMBEDDED_METADATA.sub("\n", text)
+    text = _PREAMBLE.sub("", text, count=1)
+    text = _JUNK_CHARS.sub("", text)
+    text = text.translate(_CHAR_MAP)
+    text = _SEPARATOR_LINE.sub("", text)
+    text = _BULLET.sub("- ", text)
+    text = _INLINE_SPACES.sub(" ", text)
+    text = _TRAILING_SPACES.sub("", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip() + "\n"
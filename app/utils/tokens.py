@@ -0,0 +1,69 @@
+"""Token counting helpers built on tiktoken.
+
+tiktoken downloads its BPE files on first use. When that fails (offline
+tests, the local backend, air-gapped hosts) counts fall back to a
+deterministic estimate of one token per four characters.
+"""
+
+import logging
+from functools import lru_cache
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Used when tiktoken does not know the configured model name
+DEFAULT_ENCODING = "o200k_base"
+
+# Characters per token in the fallback estimate
+APPROX_CHARS_PER_TOKEN = 4
+
+
+class ApproximateEncoding:
+    """Offline stand-in for a tiktoken encoding.
+
+    "Tokens" are fixed-size slices of the text, so counts are deterministic
+    and decode(encode(text)) round-trips.
+    """
+
+    name = "approximate"
+
+    def encode(self, text: str, disallowed_special=()) -> List[str]:
+        """Split text into APPROX_CHARS_PER_TOKEN-character slices."""
+        return [text[i:i + APPROX_CHARS_PER_TOKEN] for i in range(0, len(text), APPROX_CHARS_PER_TOKEN)]
+
+    def decode(self, tokens: List[str]) -> str:
+        """Join slices back into text."""
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """Get (and cache) the tiktoken encoding for a model.
+
+    Falls back to ApproximateEncoding if tiktoken or its BPE file is unavailable.
+    """
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding for {model} unavailable ({e}); estimating token counts")
+        return ApproximateEncoding()
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens a model would see for a piece of text.
+
+    Args:
+        text: Text to measure
+        model: Model name used to select the encoding
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+    return len(get_encoding(model).encode(text, disallowed_special=()))
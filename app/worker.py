@@ -5,15 +5,26 @@ import logging
 import uuid
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 from app.core.config import get_settings
+from app.core.connections import connection_manager
 from app.core.database import mongodb
 from app.services.rabbitmq_service import rabbitmq_service
-from app.services.redis_service import redis_service
+from app.services.redis_service import REPORT_CACHE_TTL, redis_service
+from app.services.guide_cache import GuideCache
+from app.services.two_tier_cache import two_tier_cache
 from app.services.knowledge_base import KnowledgeBaseService
+from app.services.llm_client import llm_http_client
+from app.services.loop_monitor import loop_monitor
+from app.services.kb_retrieval import KnowledgeBaseRetriever, build_patient_query
 from app.services.report_generator import ReportGeneratorService
+from app.services.progress_reporter import ProgressReporter
+from app.services.prompt_compiler import format_patient_context
+from app.services.metrics import METRICS_KEY_PREFIX, metrics
+from app.services.usage import UsageTracker, track_usage, worker_usage
 from app.models.schemas import (
+    CategoryReportItem,
     ReportGenerationRequest,
     ReportGenerationResponse,
     MedicalReport,
@@ -38,27 +49,53 @@ class ReportWorker:
         """Initialize worker."""
         self.kb_service: Optional[KnowledgeBaseService] = None
         self.report_generator: Optional[ReportGeneratorService] = None
+        self.kb_retriever: Optional[KnowledgeBaseRetriever] = None
+        self.guide_cache = GuideCache()
 
     async def startup(self):
         """Initialize all services."""
         try:
             logger.info("Starting up worker services...")
-
-            # Connect to MongoDB
-            await mongodb.connect()
+            if settings.loop_monitor_enabled:
+                loop_monitor.start()
+
+            # Connect to MongoDB, RabbitMQ and Redis concurrently, with retry
+            await connection_manager.connect_all(
+                {
+                    "mongodb": mongodb.connect,
+                    "rabbitmq": rabbitmq_service.connect,
+                    "redis": redis_service.connect,
+                },
+                disconnects={
+                    "mongodb": mongodb.disconnect,
+                    "rabbitmq": rabbitmq_service.disconnect,
+                    "redis": redis_service.disconnect,
+                },
+            )
             await mongodb.create_indexes()
-
-            # Connect to RabbitMQ
-            await rabbitmq_service.connect()
-
-            # Connect to Redis
-            await redis_service.connect()
+            await two_tier_cache.start()
 
             # Initialize knowledge base service
             self.kb_service = KnowledgeBaseService(mongodb.db)
+            if settings.kb_retrieval_enabled:
+                self.kb_retriever = await self.kb_service.load_retriever()
 
             # Initialize report generator
             self.report_generator = ReportGeneratorService()
+            if settings.output_budget_enabled:
+                self.report_generator.set_source_words(await self.kb_service.get_category_source_words())
+
+            metrics.register("connections", connection_manager.stats)
+            metrics.register("llm_usage", worker_usage.to_dict)
+            metrics.register("prompt_prefixes", self.report_generator.prompts.reuse_stats)
+            metrics.register("output_lengths", self.report_generator.output_lengths.stats)
+            metrics.register("cache", two_tier_cache.stats)
+            if settings.loop_monitor_enabled:
+                metrics.register("event_loop", loop_monitor.stats)
+            if settings.llm_backend != "local":
+                metrics.register("llm_http_pool", llm_http_client.pool_stats)
+            if self.report_generator.hedging:
+                metrics.register("hedging", self.report_generator.hedging.stats)
 
             logger.info("All worker services started successfully")
         except Exception as e:
@@ -71,8 +108,11 @@ class ReportWorker:
             logger.info("Shutting down worker services...")
 
             await rabbitmq_service.disconnect()
+            await two_tier_cache.stop()
             await redis_service.disconnect()
             await mongodb.disconnect()
+            await llm_http_client.aclose()
+            await loop_monitor.stop()
 
             logger.info("All worker services shut down successfully")
         except Exception as e:
@@ -96,20 +136,18 @@ class ReportWorker:
             # Parse request
             request = ReportGenerationRequest(**message_body)
 
-            # Check Redis cache for previous input
-            cached_input = await redis_service.get_cached_input(user_id)
+            # Cache current input, getting the previous one in the same round trip
+            cached_input = await redis_service.swap_cached_input(user_id, message_body)
             if cached_input:
                 logger.info(f"Found cached input for user {user_id}")
 
-            # Cache current input
-            await redis_service.cache_input(user_id, message_body)
-
             # Ensure user exists in database
             await self._ensure_user_exists(user_id)
 
             # Generate report
             report_id = str(uuid.uuid4())
-            report = await self._generate_report(request, report_id)
+            with track_usage() as usage:
+                report = await self._generate_report(request, report_id)
 
             # Calculate generation metrics
             generation_time = time.time() - start_time
@@ -119,11 +157,14 @@ class ReportWorker:
                 report_id=report_id,
                 user_id=user_id,
                 report=report,
-                generation_time=generation_time
+                generation_time=generation_time,
+                usage=usage,
             )
 
-            # Cache report in Redis
-            await redis_service.cache_report(report_id, report.model_dump())
+            # Cache report in Redis together with the metrics snapshot
+            metrics.incr("requests_succeeded")
+            metrics.incr("generation_seconds", generation_time)
+            await self._publish_metrics(report_id=report_id, report=report)
 
             # Send success response
             response = ReportGenerationResponse(
@@ -136,10 +177,12 @@ class ReportWorker:
             await rabbitmq_service.publish_response(response.model_dump(mode='json'))
 
             logger.info(
-                f"Successfully processed request {request_id} in {generation_time:.2f}s"
+                f"Successfully processed request {request_id} in {generation_time:.2f}s "
+                f"({usage.total_tokens} tokens, ${usage.cost_usd:.4f})"
             )
 
         except Exception as e:
+            metrics.incr("requests_failed")
             logger.error(f"Error processing request {request_id}: {e}", exc_info=True)
 
             # Send failure response
@@ -152,6 +195,37 @@ class ReportWorker:
             )
 
             await rabbitmq_service.publish_response(response.model_dump(mode='json'))
+            await self._publish_metrics()
+
+    async def _publish_metrics(
+        self,
+        report_id: Optional[str] = None,
+        report: Optional[MedicalReport] = None,
+    ):
+        """
+        Publish the worker's metrics snapshot to Redis, with the report if given.
+
+        Both are written in one pipelined round trip. Failing to cache the
+        report fails the request; metrics alone are best effort.
+
+        Args:
+            report_id: Report identifier
+            report: Generated report to cache
+        """
+        metrics_key = f"{METRICS_KEY_PREFIX}{settings.worker_name}"
+        items = {metrics_key: metrics.snapshot()}
+        ttls = {metrics_key: settings.metrics_ttl_seconds}
+        if report is not None:
+            report_key = f"report:{report_id}"
+            items[report_key] = report.model_dump()
+            ttls[report_key] = REPORT_CACHE_TTL
+
+        try:
+            await redis_service.set_many(items, ttls=ttls)
+        except Exception as e:
+            if report is not None:
+                raise
+            logger.warning(f"Failed to publish metrics: {e}")
 
     async def _ensure_user_exists(self, user_id: str):
         """
@@ -206,15 +280,41 @@ class ReportWorker:
             "disclaimer": request.disclaimer,
         }
 
+        if settings.two_stage_enabled:
+            category_reports = await self._generate_two_stage(request, categories)
+            report_data["category_reports"] = [report.model_dump() for report in category_reports]
+            return MedicalReport(**report_data)
+
         # Get knowledge base content for each category
+        if self.kb_retriever:
+            query, tags = build_patient_query(request)
+            logger.info(f"Retrieving KB chunks for patient tags: {sorted(tags)}")
+
         categories_content = {}
         for category in categories:
-            content = await self.kb_service.get_content_for_category(category)
+            if self.kb_retriever:
+                content = self.kb_retriever.get_content_for_category(category, query, tags)
+            else:
+                content = await self.kb_service.get_content_for_category(category)
             if content:
                 categories_content[category] = content
 
-        # Generate category reports using AI
-        category_reports = await self.report_generator.generate_reports_for_categories(categories_content)
+        # Generate category reports using AI, streaming progress to the backend
+        progress = ProgressReporter(
+            request_id=request.request_id,
+            user_id=request.user_id,
+            total_categories=len(categories_content),
+            publish=rabbitmq_service.publish_progress,
+            expected_tokens={
+                category: self.report_generator.expected_tokens_for(category)
+                for category in categories_content
+            },
+        )
+        category_reports = await self.report_generator.generate_reports_for_categories(
+            categories_content,
+            on_progress=progress.on_tokens,
+            on_category_complete=progress.on_category_complete,
+        )
 
         report_data["category_reports"] = [
             report.model_dump() for report in category_reports
@@ -222,12 +322,97 @@ class ReportWorker:
 
         return MedicalReport(**report_data)
 
+    async def _generate_two_stage(
+        self,
+        request: ReportGenerationRequest,
+        categories: List[str],
+    ) -> List[CategoryReportItem]:
+        """
+        Generate category reports as cached generic guides plus prefaces.
+
+        Stage one: each category's guide is generated from its full KB
+        content without patient data, so it is cached per KB version and
+        shared across requests. Stage two: one small call writes a preface
+        per category tailored to the assessment, CVD summary and plan. The
+        two stages run concurrently.
+
+        Args:
+            request: Report generation request
+            categories: Requested categories
+
+        Returns:
+            Category reports with guide text, sources and preface
+        """
+        kb_versions = await self.kb_service.get_category_versions()
+        versions = {
+            category: self.report_generator.guide_version(category, kb_versions[category])
+            for category in categories
+            if category in kb_versions
+        }
+
+        guides = await self.guide_cache.get_many(versions)
+        missing = [category for category in versions if category not in guides]
+        metrics.incr("guide_cache_hits", len(guides))
+        metrics.incr("guide_cache_misses", len(missing))
+        logger.info(f"Guide cache: {len(guides)} hits, {len(missing)} misses")
+
+        progress = ProgressReporter(
+            request_id=request.request_id,
+            user_id=request.user_id,
+            total_categories=len(versions),
+            publish=rabbitmq_service.publish_progress,
+            expected_tokens={
+                category: self.report_generator.expected_tokens_for(category)
+                for category in missing
+            },
+        )
+
+        async def generate_guides() -> List[CategoryReportItem]:
+            if not missing:
+                return []
+            categories_content = {
+                category: await self.kb_service.get_content_for_category(category)
+                for category in missing
+            }
+            generated = await self.report_generator.generate_reports_for_categories(
+                categories_content, on_progress=progress.on_tokens
+            )
+            await self.guide_cache.set_many(
+                versions, {guide.category: guide.model_dump() for guide in generated}
+            )
+            return generated
+
+        async def personalize() -> Dict[str, str]:
+            try:
+                return await self.report_generator.personalize(
+                    format_patient_context(request), list(versions)
+                )
+            except Exception as e:
+                # Guides are complete on their own; ship them without prefaces
+                logger.warning(f"Personalization failed, sending generic guides: {e}")
+                return {}
+
+        generated, prefaces = await asyncio.gather(generate_guides(), personalize())
+        for guide in generated:
+            guides[guide.category] = guide.model_dump()
+
+        category_reports = []
+        for category in versions:
+            if category not in guides:
+                continue
+            report = CategoryReportItem(**{**guides[category], "preface": prefaces.get(category)})
+            category_reports.append(report)
+            await progress.on_category_complete(report)
+
+        return category_reports
+
     async def _store_report(
         self,
         report_id: str,
         user_id: str,
         report: MedicalReport,
-        generation_time: float
+        generation_time: float,
+        usage: Optional[UsageTracker] = None,
     ):
         """
         Store report in MongoDB.
@@ -237,6 +422,7 @@ class ReportWorker:
             user_id: User identifier
             report: Medical report
             generation_time: Time taken to generate report
+            usage: Token usage of the LLM calls made for the report
         """
         reports_collection = mongodb.db.medical_reports
 
@@ -245,7 +431,17 @@ class ReportWorker:
             user_id=user_id,
             report_data=report,
             json_content=report.model_dump(),
-            generation_time_seconds=generation_time
+            generation_time_seconds=generation_time,
+            tokens_used=usage.total_tokens if usage else None,
+            estimated_cost=usage.cost_usd if usage else None,
+            token_usage=usage.to_dict() if usage else None,
+            output_lengths={
+                category_report.category: {
+                    "requested_words": self.report_generator.word_budgets.get(category_report.category),
+                    "actual_words": len(category_report.text.split()),
+                }
+                for category_report in report.category_reports or []
+            },
         )
 
         await reports_collection.insert_one(stored_report.model_dump())
@@ -0,0 +1,132 @@
+"""
+Benchmark single-call vs per-category report generation with the local backend.
+
+The local LLM backend replaces the model with a latency model (time to first
+token, prefill and decode rates) and synthesizes schema-valid output from the
+prompt, so the two generation modes can be compared on latency, tokens and
+cost without any network calls.
+
+Usage:
+    python scripts/benchmark_generation_modes.py
+    python scripts/benchmark_generation_modes.py --categories alcohol,blood_pressure,healthy_eating
+    python scripts/benchmark_generation_modes.py --runs 5 --time-scale 0.05
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.services.knowledge_base import KnowledgeBaseService
+from app.services.llm_backends import LocalBackend
+from app.services.output_budget import OutputBudgetPolicy
+from app.services.report_generator import ReportGeneratorService
+from app.services.usage import estimate_cost
+
+settings = get_settings()
+
+
+async def load_categories_content(categories: list) -> dict:
+    """Build category prompt content from the KB files (no database)."""
+    docs = await KnowledgeBaseService().build_documents()
+    return {
+        category: KnowledgeBaseService.format_category_content(
+            [doc for doc in docs if doc["category"] == category]
+        )
+        for category in categories
+    }
+
+
+async def run_mode(service: ReportGeneratorService, backend: LocalBackend, categories_content: dict,
+                   single_call: bool, time_scale: float) -> dict:
+    """Generate all categories once and return latency and usage."""
+    settings.multi_category_enabled = single_call
+    backend.usage.clear()
+
+    start = time.perf_counter()
+    reports = await service.generate_reports_for_categories(categories_content)
+    elapsed = (time.perf_counter() - start) / time_scale
+
+    cost = estimate_cost(settings.openai_model, backend.usage["input_tokens"], backend.usage["output_tokens"])
+
+    return {
+        "reports": len(reports),
+        "calls": backend.usage["calls"],
+        "latency": elapsed,
+        "input_tokens": backend.usage["input_tokens"],
+        "output_tokens": backend.usage["output_tokens"],
+        "cost": cost,
+    }
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Compare single-call and per-category generation with the local LLM backend'
+    )
+    parser.add_argument(
+        '--categories',
+        default='healthy_eating,weight_management',
+        help='Comma-separated KB categories (default: healthy_eating,weight_management)'
+    )
+    parser.add_argument('--runs', type=int, default=3, help='Runs per mode (default: 3)')
+    parser.add_argument('--ttft', type=float, default=0.5, help='Simulated time to first token (s)')
+    parser.add_argument('--prefill-tps', type=float, default=20000, help='Simulated input tokens/s')
+    parser.add_argument('--decode-tps', type=float, default=60, help='Simulated output tokens/s')
+    parser.add_argument(
+        '--time-scale',
+        type=float,
+        default=0.02,
+        help='Fraction of simulated time actually slept (default: 0.02)'
+    )
+
+    args = parser.parse_args()
+    categories = [c.strip() for c in args.categories.split(",") if c.strip()]
+
+    settings.multi_category_max_categories = max(settings.multi_category_max_categories, len(categories))
+    settings.openai_streaming = False
+
+    # Simulated time is scaled down by running a proportionally faster model
+    backend = LocalBackend(
+        ttft=args.ttft * args.time_scale,
+        prefill_tps=args.prefill_tps / args.time_scale,
+        decode_tps=args.decode_tps / args.time_scale,
+    )
+    service = ReportGeneratorService(backend=backend)
+    service.set_source_words(OutputBudgetPolicy.source_words(await KnowledgeBaseService().load_metadata()))
+
+    categories_content = await load_categories_content(categories)
+    if not service.planner.fits("".join(categories_content.values())):
+        print("Note: combined content exceeds the prompt budget; single-call mode will fall back.")
+
+    print(f"Model: {settings.openai_model}  Categories: {', '.join(categories)}  Runs: {args.runs}")
+
+    results = {}
+    for label, single_call in (("per-category", False), ("single-call", True)):
+        runs = [
+            await run_mode(service, backend, categories_content, single_call, args.time_scale)
+            for _ in range(args.runs)
+        ]
+        results[label] = {key: sum(run[key] for run in runs) / len(runs) for key in runs[0]}
+
+    print("\n" + "="*78)
+    print(f"{'mode':<14} {'calls':>6} {'latency s':>10} {'input tok':>10} {'output tok':>11} {'cost $':>10}")
+    print("="*78)
+    for label, r in results.items():
+        print(f"{label:<14} {r['calls']:>6.0f} {r['latency']:>10.2f} {r['input_tokens']:>10.0f} "
+              f"{r['output_tokens']:>11.0f} {r['cost']:>10.5f}")
+
+    base, single = results["per-category"], results["single-call"]
+    if base["latency"]:
+        print(f"\nSingle-call latency: {single['latency'] / base['latency'] * 100:.0f}% of per-category")
+    if base["input_tokens"]:
+        print(f"Single-call input tokens: {single['input_tokens'] / base['input_tokens'] * 100:.0f}% of per-category")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
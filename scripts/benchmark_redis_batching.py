@@ -0,0 +1,138 @@
+"""
+Benchmark per-request Redis round trips: separate calls vs batched.
+
+Simulates the worker's cache operations for many concurrent requests against
+the configured Redis:
+
+- separate: get cached input, cache input, cache report, publish metrics
+  (four round trips, as the worker used to do)
+- batched: swap cached input (SET ... GET), then report and metrics in one
+  pipeline (two round trips, one per worker stage)
+
+Keys are written under a benchmark prefix and deleted afterwards.
+
+Usage:
+    python scripts/benchmark_redis_batching.py
+    python scripts/benchmark_redis_batching.py --requests 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.services.redis_service import REPORT_CACHE_TTL, redis_service
+
+settings = get_settings()
+
+KEY_PREFIX = "bench:"
+
+
+def sample_payloads(report_words: int) -> tuple:
+    """Build an input message and a report of realistic size."""
+    message = {
+        "request_id": "bench",
+        "patient": {"name": "Bench Patient", "age": 50, "sex": "female"},
+        "assessment": {"summary": "word " * 60},
+        "resources_table": [{"category": f"category_{i}", "title": "Resource", "url": "https://example.org"}
+                            for i in range(4)],
+    }
+    report = {
+        **message,
+        "category_reports": [
+            {"category": f"category_{i}", "text": "word " * report_words, "sources": ["https://example.org"]}
+            for i in range(4)
+        ],
+    }
+    return message, report
+
+
+async def separate(i: int, message: dict, report: dict):
+    """One request's cache operations as individual calls."""
+    await redis_service.get(f"{KEY_PREFIX}input:{i % 100}")
+    await redis_service.set(f"{KEY_PREFIX}input:{i % 100}", message)
+    await redis_service.set(f"{KEY_PREFIX}report:{i}", report, ttl=REPORT_CACHE_TTL)
+    await redis_service.set(f"{KEY_PREFIX}metrics", {"requests": i}, ttl=settings.metrics_ttl_seconds)
+
+
+async def batched(i: int, message: dict, report: dict):
+    """One request's cache operations, one round trip per stage."""
+    await redis_service.get_and_set(f"{KEY_PREFIX}input:{i % 100}", message)
+    await redis_service.set_many(
+        {f"{KEY_PREFIX}report:{i}": report, f"{KEY_PREFIX}metrics": {"requests": i}},
+        ttls={f"{KEY_PREFIX}report:{i}": REPORT_CACHE_TTL, f"{KEY_PREFIX}metrics": settings.metrics_ttl_seconds},
+    )
+
+
+async def run_mode(operation, requests: int, concurrency: int, message: dict, report: dict) -> dict:
+    """Run requests with bounded concurrency and collect per-request latency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await operation(i, message, report)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "wall": elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "throughput": requests / elapsed,
+    }
+
+
+async def cleanup():
+    """Delete benchmark keys."""
+    keys = [key async for key in redis_service.client.scan_iter(f"{KEY_PREFIX}*")]
+    if keys:
+        await redis_service.client.delete(*keys)
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Compare separate and batched Redis cache operations')
+    parser.add_argument('--requests', type=int, default=200, help='Simulated requests per mode (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent requests (default: 20)')
+    parser.add_argument('--report-words', type=int, default=350, help='Words per category report (default: 350)')
+    args = parser.parse_args()
+
+    message, report = sample_payloads(args.report_words)
+
+    await redis_service.connect()
+    try:
+        results = {}
+        for label, operation in (("separate", separate), ("batched", batched)):
+            results[label] = await run_mode(operation, args.requests, args.concurrency, message, report)
+        await cleanup()
+    finally:
+        await redis_service.disconnect()
+
+    print(f"Redis: {settings.redis_url}  Requests: {args.requests}  Concurrency: {args.concurrency}")
+    print("\n" + "="*66)
+    print(f"{'mode':<10} {'wall s':>8} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>9}")
+    print("="*66)
+    for label, r in results.items():
+        print(f"{label:<10} {r['wall']:>8.2f} {r['mean_ms']:>9.2f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['throughput']:>9.0f}")
+
+    base, batch = results["separate"], results["batched"]
+    print(f"\nBatched mean latency: {batch['mean_ms'] / base['mean_ms'] * 100:.0f}% of separate "
+          f"({base['mean_ms'] - batch['mean_ms']:.2f} ms saved per request)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
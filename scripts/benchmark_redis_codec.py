@@ -0,0 +1,136 @@
+"""
+Benchmark Redis value codecs on a realistic cached report.
+
+Builds a full report from a sample request and local-backend category reports
+for every category in the KB, then compares serializer/compression
+combinations on encoded size and encode/decode time. Combinations whose
+optional package is not installed are skipped. With --redis, each encoded
+value is also written to the configured Redis to read its MEMORY USAGE.
+
+Usage:
+    python scripts/benchmark_redis_codec.py
+    python scripts/benchmark_redis_codec.py --redis --iterations 500
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.core.connections import create_redis_client
+from app.services.knowledge_base import KnowledgeBaseService
+from app.services.llm_backends import LocalChatModel
+from app.services.redis_codec import RedisCodec
+from app.services.source_links import extract_sources
+
+settings = get_settings()
+
+CODECS = [
+    ("json", "none"),
+    ("json", "zlib"),
+    ("json", "zstd"),
+    ("orjson", "none"),
+    ("orjson", "zstd"),
+    ("msgpack", "zlib"),
+    ("msgpack", "zstd"),
+]
+
+BENCH_KEY = "bench:codec"
+
+
+async def build_report(sample_file: Path) -> dict:
+    """Sample request plus a category report per KB category."""
+    report = json.loads(sample_file.read_text(encoding="utf-8"))
+    docs = await KnowledgeBaseService().build_documents()
+
+    categories = sorted({doc["category"] for doc in docs})
+    report["category_reports"] = []
+    for category in categories:
+        content = KnowledgeBaseService.format_category_content(
+            [doc for doc in docs if doc["category"] == category]
+        )
+        report["category_reports"].append(
+            {**LocalChatModel.report(category, content), "sources": extract_sources(content)}
+        )
+    return report
+
+
+def measure(codec: RedisCodec, value: dict, iterations: int) -> dict:
+    """Encoded size and mean encode/decode time in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded = codec.encode(value)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(encoded)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return {"encoded": encoded, "bytes": len(encoded), "encode_us": encode_us, "decode_us": decode_us}
+
+
+async def redis_memory(values: dict) -> dict:
+    """MEMORY USAGE of each encoded value stored under a benchmark key."""
+    client = create_redis_client()
+    try:
+        usage = {}
+        for label, encoded in values.items():
+            await client.set(BENCH_KEY, encoded, ex=60)
+            usage[label] = await client.memory_usage(BENCH_KEY)
+        await client.delete(BENCH_KEY)
+        return usage
+    finally:
+        await client.close()
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Compare Redis codecs on a cached report')
+    parser.add_argument(
+        '--sample-file',
+        default='data/sample_reports/Kushagra mandwal.json',
+        help='Request JSON to build the report from'
+    )
+    parser.add_argument('--iterations', type=int, default=200, help='Encode/decode iterations (default: 200)')
+    parser.add_argument('--redis', action='store_true', help='Also measure MEMORY USAGE in Redis')
+    args = parser.parse_args()
+
+    report = await build_report(Path(args.sample_file))
+    baseline = len(json.dumps(report).encode("utf-8"))
+
+    results = {}
+    for serializer, compression in CODECS:
+        label = f"{serializer}+{compression}"
+        try:
+            codec = RedisCodec(serializer, compression, threshold=0)
+        except RuntimeError as e:
+            print(f"Skipping {label}: {e}")
+            continue
+        results[label] = measure(codec, report, args.iterations)
+
+    memory = await redis_memory({label: r["encoded"] for label, r in results.items()}) if args.redis else {}
+
+    print(f"\nReport: {len(report['category_reports'])} categories, {baseline} bytes as plain JSON (previous format)")
+    print("="*72)
+    print(f"{'codec':<16} {'bytes':>9} {'ratio':>7} {'encode us':>10} {'decode us':>10} {'redis mem':>10}")
+    print("="*72)
+    for label, r in results.items():
+        mem = memory.get(label, "-")
+        print(f"{label:<16} {r['bytes']:>9} {r['bytes'] / baseline * 100:>6.0f}% {r['encode_us']:>10.0f} "
+              f"{r['decode_us']:>10.0f} {mem:>10}")
+
+    current = f"{settings.redis_serializer}+{settings.redis_compression}"
+    if current in results:
+        print(f"\nConfigured codec ({current}) stores "
+              f"{baseline / results[current]['bytes']:.1f}x more reports in the same memory")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,13 +8,13 @@ Usage:
     python scripts/check_database.py --list-reports
     python scripts/check_database.py --report-id <id>
     python scripts/check_database.py --user-id <id>
+    python scripts/check_database.py --list-reports --batch-size 500 --limit 0
 """
 
 import asyncio
 import argparse
 import json
-from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 
@@ -22,39 +22,67 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.core.config import get_settings
+from app.core.connections import create_mongo_client
 
 settings = get_settings()
 
+# Documents fetched per cursor round trip when streaming listings
+DEFAULT_BATCH_SIZE = 100
+
+# Max documents printed by listings (0 = no limit)
+DEFAULT_LIST_LIMIT = 100
+
+# Generation-time percentiles reported by --stats
+GENERATION_PERCENTILES = [0.5, 0.9, 0.95, 0.99]
+
+# Listing projections: never pull category texts or generated files
+USER_LIST_PROJECTION = {"_id": 0, "user_id": 1, "created_at": 1, "updated_at": 1}
+LATEST_REPORT_PROJECTION = {"_id": 0, "report_id": 1, "user_id": 1, "created_at": 1}
+REPORT_LIST_PROJECTION = {
+    "_id": 0,
+    "report_id": 1,
+    "user_id": 1,
+    "created_at": 1,
+    "generation_time_seconds": 1,
+    "report_data.patient": 1,
+    "report_data.category_reports.category": 1,
+}
+
 
 async def connect_db():
     """Connect to MongoDB."""
-    client = AsyncIOMotorClient(settings.mongodb_url)
+    client = create_mongo_client()
     db = client[settings.mongodb_db_name]
     return client, db
 
 
-async def list_users(db):
-    """List all users in database."""
+async def list_users(db, batch_size=DEFAULT_BATCH_SIZE, limit=DEFAULT_LIST_LIMIT):
+    """List users in database, streamed from a projected cursor."""
     print("\n" + "="*60)
     print("USERS IN DATABASE")
     print("="*60)
 
-    users = await db.users.find().to_list(length=100)
-
-    if not users:
-        print("No users found.")
-        return
+    cursor = db.users.find({}, USER_LIST_PROJECTION).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
 
-    for user in users:
+    shown = 0
+    async for user in cursor:
         print(f"\nUser ID: {user['user_id']}")
         print(f"Created: {user['created_at']}")
         print(f"Updated: {user['updated_at']}")
+        shown += 1
+
+    if not shown:
+        print("No users found.")
+        return
 
-    print(f"\nTotal users: {len(users)}")
+    total = await db.users.estimated_document_count()
+    print(f"\nShown users: {shown} (total: {total})")
 
 
-async def list_reports(db, user_id=None):
-    """List all reports in database."""
+async def list_reports(db, user_id=None, batch_size=DEFAULT_BATCH_SIZE, limit=DEFAULT_LIST_LIMIT):
+    """List reports in database, streamed from a projected cursor."""
     print("\n" + "="*60)
     print("REPORTS IN DATABASE")
     print("="*60)
@@ -64,31 +92,42 @@ async def list_reports(db, user_id=None):
         query['user_id'] = user_id
         print(f"Filtering by user_id: {user_id}")
 
-    reports = await db.medical_reports.find(query).sort("created_at", -1).to_list(length=100)
+    cursor = (
+        db.medical_reports.find(query, REPORT_LIST_PROJECTION)
+        .sort("created_at", -1)
+        .batch_size(batch_size)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
 
-    if not reports:
-        print("No reports found.")
-        return
+    shown = 0
+    async for report in cursor:
+        report_data = report.get('report_data', {})
+        patient = report_data.get('patient', {})
 
-    for report in reports:
         print(f"\n{'─'*60}")
         print(f"Report ID: {report['report_id']}")
         print(f"User ID: {report['user_id']}")
-        print(f"Patient: {report['report_data']['patient']['name']}")
-        print(f"Age: {report['report_data']['patient']['age']}")
-        print(f"Sex: {report['report_data']['patient']['sex']}")
+        print(f"Patient: {patient.get('name')}")
+        print(f"Age: {patient.get('age')}")
+        print(f"Sex: {patient.get('sex')}")
         print(f"Created: {report['created_at']}")
 
-        if 'generation_time_seconds' in report:
+        if report.get('generation_time_seconds') is not None:
             print(f"Generation Time: {report['generation_time_seconds']:.2f}s")
 
         # Show categories
-        if 'category_reports' in report['report_data']:
-            categories = [cr['category'] for cr in report['report_data']['category_reports']]
+        if 'category_reports' in report_data:
+            categories = [cr['category'] for cr in report_data['category_reports']]
             print(f"Categories: {', '.join(categories)}")
+        shown += 1
+
+    if not shown:
+        print("No reports found.")
+        return
 
     print(f"\n{'='*60}")
-    print(f"Total reports: {len(reports)}")
+    print(f"Shown reports: {shown}")
 
 
 async def get_report_by_id(db, report_id):
@@ -110,6 +149,9 @@ async def get_report_by_id(db, report_id):
     if 'generation_time_seconds' in report:
         print(f"Generation Time: {report['generation_time_seconds']:.2f}s")
 
+    if report.get('tokens_used') is not None:
+        print(f"Tokens: {report['tokens_used']:,}  Cost: ${report.get('estimated_cost') or 0:.4f}")
+
     # Patient info
     patient = report['report_data']['patient']
     print(f"\nPatient:")
@@ -183,30 +225,149 @@ async def export_report_json(db, report_id, output_file=None):
     print(f"\n✓ Report exported to: {output_file}")
 
 
-async def get_stats(db):
-    """Get database statistics."""
+def report_stats_pipeline(days=14, top_users=10):
+    """Build a single-pass aggregation computing report statistics server-side.
+
+    Args:
+        days: Number of recent days to bucket in reports-per-day
+        top_users: Number of most active users to return
+
+    Returns:
+        Aggregation pipeline for the medical_reports collection
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+
+    return [
+        {"$project": {
+            "_id": 0,
+            "user_id": 1,
+            "created_at": 1,
+            "generation_time_seconds": 1,
+            "tokens_used": 1,
+            "estimated_cost": 1,
+        }},
+        {"$facet": {
+            "generation": [
+                {"$match": {"generation_time_seconds": {"$type": "number"}}},
+                {"$group": {
+                    "_id": None,
+                    "count": {"$sum": 1},
+                    "avg": {"$avg": "$generation_time_seconds"},
+                    "max": {"$max": "$generation_time_seconds"},
+                    "percentiles": {"$percentile": {
+                        "input": "$generation_time_seconds",
+                        "p": GENERATION_PERCENTILES,
+                        "method": "approximate",
+                    }},
+                }},
+            ],
+            "usage": [
+                {"$match": {"tokens_used": {"$type": "number"}}},
+                {"$group": {
+                    "_id": None,
+                    "count": {"$sum": 1},
+                    "tokens": {"$sum": "$tokens_used"},
+                    "avg_tokens": {"$avg": "$tokens_used"},
+                    "cost": {"$sum": "$estimated_cost"},
+                    "avg_cost": {"$avg": "$estimated_cost"},
+                }},
+            ],
+            "per_user": [
+                {"$group": {"_id": "$user_id", "reports": {"$sum": 1}}},
+                # $facet cannot nest, so the summary and top users come from one $group;
+                # $topN keeps only top_users rows in memory
+                {"$group": {
+                    "_id": None,
+                    "users": {"$sum": 1},
+                    "avg_reports": {"$avg": "$reports"},
+                    "max_reports": {"$max": "$reports"},
+                    "top": {"$topN": {
+                        "n": top_users,
+                        "sortBy": {"reports": -1},
+                        "output": {"_id": "$_id", "reports": "$reports"},
+                    }},
+                }},
+            ],
+            "per_day": [
+                {"$match": {"created_at": {"$gte": since}}},
+                {"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                    "reports": {"$sum": 1},
+                }},
+                {"$sort": {"_id": 1}},
+            ],
+        }},
+    ]
+
+
+async def get_collection_size_stats(db, collection_name):
+    """Get document count and average document size from storage stats."""
+    pipeline = [{"$collStats": {"storageStats": {}}}]
+    async for stats in db[collection_name].aggregate(pipeline):
+        storage = stats.get("storageStats", {})
+        return storage.get("count", 0), storage.get("avgObjSize", 0)
+    return 0, 0
+
+
+async def get_stats(db, days=14, top_users=10):
+    """Get database statistics computed with server-side aggregation."""
     print("\n" + "="*60)
     print("DATABASE STATISTICS")
     print("="*60)
 
-    # Count documents
-    users_count = await db.users.count_documents({})
-    reports_count = await db.medical_reports.count_documents({})
-    kb_count = await db.knowledge_base.count_documents({})
+    # Count documents from collection metadata (no scan)
+    users_count = await db.users.estimated_document_count()
+    reports_count, avg_report_size = await get_collection_size_stats(db, "medical_reports")
+    kb_count = await db.knowledge_base.estimated_document_count()
 
     print(f"\nTotal Users: {users_count}")
     print(f"Total Reports: {reports_count}")
+    print(f"Average Report Size: {avg_report_size / 1024:.1f} KB")
     print(f"Knowledge Base Items: {kb_count}")
 
-    # Recent activity
-    recent_reports = await db.medical_reports.find().sort("created_at", -1).limit(1).to_list(length=1)
-
-    if recent_reports:
-        last_report = recent_reports[0]
-        print(f"\nLast Report Generated:")
-        print(f"  Date: {last_report['created_at']}")
-        print(f"  User: {last_report['user_id']}")
-        print(f"  Report ID: {last_report['report_id']}")
+    if reports_count > 0:
+        pipeline = report_stats_pipeline(days=days, top_users=top_users)
+        results = await db.medical_reports.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+        stats = results[0] if results else {}
+
+        # A $sort inside $facet cannot use an index; this find walks the created_at index
+        last_report = await db.medical_reports.find_one(
+            {}, LATEST_REPORT_PROJECTION, sort=[("created_at", -1)]
+        )
+        if last_report:
+            print(f"\nLast Report Generated:")
+            print(f"  Report ID: {last_report['report_id']}")
+            print(f"  Date: {last_report['created_at']}")
+            print(f"  User: {last_report['user_id']}")
+
+        generation = stats.get("generation", [])
+        if generation:
+            gen = generation[0]
+            print(f"\nGeneration Time ({gen['count']} reports):")
+            print(f"  Avg: {gen['avg']:.2f}s  Max: {gen['max']:.2f}s")
+            for p, value in zip(GENERATION_PERCENTILES, gen["percentiles"]):
+                print(f"  p{int(p * 100)}: {value:.2f}s")
+
+        usage = stats.get("usage", [])
+        if usage:
+            use = usage[0]
+            print(f"\nToken Usage ({use['count']} reports):")
+            print(f"  Total: {use['tokens']:,} tokens  ${use['cost']:.4f}")
+            print(f"  Avg per report: {use['avg_tokens']:,.0f} tokens  ${use['avg_cost']:.4f}")
+
+        per_user = stats.get("per_user", [])
+        if per_user:
+            users = per_user[0]
+            print(f"\nReports per User ({users['users']} users):")
+            print(f"  Avg: {users['avg_reports']:.2f}  Max: {users['max_reports']}")
+            for row in users["top"]:
+                print(f"  {row['_id']}: {row['reports']}")
+
+        per_day = stats.get("per_day", [])
+        if per_day:
+            print(f"\nReports per Day (last {days} days):")
+            for row in per_day:
+                print(f"  {row['_id']}: {row['reports']}")
 
     # Categories statistics
     if kb_count > 0:
@@ -254,6 +415,24 @@ async def main():
         action='store_true',
         help='Show database statistics'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Cursor batch size for listings (default: {DEFAULT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=DEFAULT_LIST_LIMIT,
+        help=f'Max documents to list, 0 for all (default: {DEFAULT_LIST_LIMIT})'
+    )
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=14,
+        help='Days covered by reports-per-day statistics (default: 14)'
+    )
 
     args = parser.parse_args()
 
@@ -271,11 +450,11 @@ async def main():
     try:
         # Execute command
         if args.stats:
-            await get_stats(db)
+            await get_stats(db, days=args.days)
         elif args.list_users:
-            await list_users(db)
+            await list_users(db, args.batch_size, args.limit)
         elif args.list_reports:
-            await list_reports(db, args.user_id)
+            await list_reports(db, args.user_id, args.batch_size, args.limit)
         elif args.report_id:
             if args.markdown:
                 await get_report_markdown(db, args.report_id)
@@ -285,8 +464,8 @@ async def main():
                 await get_report_by_id(db, args.report_id)
         else:
             # Default: show stats and recent reports
-            await get_stats(db)
-            await list_reports(db)
+            await get_stats(db, days=args.days)
+            await list_reports(db, batch_size=args.batch_size, limit=args.limit)
 
     except Exception as e:
         print(f"\n✗ Error: {e}")
@@ -0,0 +1,413 @@
+"""
+Stream medical reports from MongoDB to compressed JSONL.
+
+Reports are read in _id order from a batched cursor and written one JSON
+document per line, so memory use stays bounded regardless of collection size.
+A small state file next to the output records the last exported _id, which
+lets an interrupted export resume where it stopped; resumed data is written
+to a new ``.resumeN`` part file alongside the original.
+
+Usage:
+    python scripts/export_reports.py --output reports.jsonl.gz
+    python scripts/export_reports.py --output reports.jsonl.zst --compression zstd
+    python scripts/export_reports.py --output reports.jsonl.gz --since 2025-01-01 --user-id user-123
+    python scripts/export_reports.py --output reports.jsonl.gz --resume
+    python scripts/export_reports.py --output reports.jsonl.gz --workers 4
+"""
+
+import asyncio
+import argparse
+import gzip
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.core.connections import create_mongo_client
+
+settings = get_settings()
+
+# Documents fetched per cursor round trip
+DEFAULT_BATCH_SIZE = 500
+
+# Documents written between state-file checkpoints
+CHECKPOINT_EVERY = 1000
+
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def json_default(value):
+    """Serialize BSON types that json cannot handle natively."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class CompressedWriter:
+    """Line writer over a gzip or zstd compressed file."""
+
+    def __init__(self, path: Path, compression: str, level: int = None):
+        """Open the compressed output file."""
+        self.compression = compression
+
+        if compression == "gzip":
+            self._stream = gzip.open(path, "wb", compresslevel=level or 6)
+            self._raw = None
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError(
+                    "zstd compression requires the 'zstandard' package: pip install zstandard"
+                )
+            self._raw = open(path, "wb")
+            compressor = zstandard.ZstdCompressor(level=level or 3)
+            self._stream = compressor.stream_writer(self._raw)
+            self._zstd_flush = zstandard.FLUSH_FRAME
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+    def write_line(self, line: str):
+        """Write a single JSONL line."""
+        self._stream.write(line.encode("utf-8"))
+        self._stream.write(b"\n")
+
+    def flush(self):
+        """Flush compressed data to disk so a checkpoint is durable."""
+        if self.compression == "zstd":
+            # End the current frame so everything up to the checkpoint decodes
+            self._stream.flush(self._zstd_flush)
+            self._raw.flush()
+        else:
+            self._stream.flush()
+
+    def close(self):
+        """Finish the compressed stream and close the file."""
+        self.flush()
+        self._stream.close()
+        if self._raw is not None and not self._raw.closed:
+            self._raw.close()
+
+
+def state_path_for(output: Path) -> Path:
+    """Return the resume state file path for an output file."""
+    return output.with_name(output.name + ".state")
+
+
+def load_state(output: Path) -> dict:
+    """Load resume state for an output file, if any."""
+    path = state_path_for(output)
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_state(output: Path, last_id: ObjectId, exported: int):
+    """Atomically record the last exported _id."""
+    path = state_path_for(output)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"last_id": str(last_id), "exported": exported}, f)
+    tmp_path.replace(path)
+
+
+def resume_output_path(output: Path) -> Path:
+    """Return a fresh part file for a resumed export.
+
+    Resumed data never goes into the interrupted file, whose compressed
+    stream may end in a truncated frame.
+    """
+    stem, dot, suffix = output.name.partition(".")
+    part = 1
+    while True:
+        candidate = output.with_name(f"{stem}.resume{part}{dot}{suffix}")
+        if not candidate.exists():
+            return candidate
+        part += 1
+
+
+def range_output_path(output: Path, index: int) -> Path:
+    """Return the part file used by one parallel range."""
+    name = output.name
+    stem, dot, suffix = name.partition(".")
+    return output.with_name(f"{stem}.range{index:02d}{dot}{suffix}")
+
+
+def build_query(user_id=None, since=None, until=None, after_id=None, before_id=None) -> dict:
+    """Build the export filter.
+
+    Args:
+        user_id: Only export reports for this user
+        since: Only export reports created at or after this time
+        until: Only export reports created before this time
+        after_id: Only export reports with _id greater than this (resume point)
+        before_id: Only export reports with _id at or below this (range end)
+
+    Returns:
+        MongoDB query
+    """
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+
+    created_at = {}
+    if since:
+        created_at["$gte"] = since
+    if until:
+        created_at["$lt"] = until
+    if created_at:
+        query["created_at"] = created_at
+
+    id_range = {}
+    if after_id is not None:
+        id_range["$gt"] = after_id
+    if before_id is not None:
+        id_range["$lte"] = before_id
+    if id_range:
+        query["_id"] = id_range
+
+    return query
+
+
+async def export_range(
+    output: Path,
+    compression: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    user_id=None,
+    since=None,
+    until=None,
+    start_id=None,
+    end_id=None,
+    resume: bool = False,
+) -> int:
+    """Export one _id range of medical_reports to a compressed JSONL file.
+
+    Args:
+        output: Output file path
+        compression: 'gzip' or 'zstd'
+        batch_size: Cursor batch size
+        user_id: Optional user filter
+        since: Optional lower bound on created_at
+        until: Optional upper bound on created_at
+        start_id: Exclusive lower _id bound
+        end_id: Inclusive upper _id bound
+        resume: Continue after the _id recorded in the state file
+
+    Returns:
+        Number of reports exported by this call
+
+    Raises:
+        FileExistsError: resume is set, there is no state file and the output
+            already holds data
+    """
+    exported_before = 0
+    data_path = output
+    if resume:
+        state = load_state(output)
+        if state.get("last_id"):
+            start_id = ObjectId(state["last_id"])
+            exported_before = state.get("exported", 0)
+            data_path = resume_output_path(output)
+            print(f"Resuming {output} after _id {start_id} into {data_path}")
+        elif output.exists() and output.stat().st_size > 0:
+            # Without a resume point a fresh export would truncate this file
+            raise FileExistsError(
+                f"No resume state for {output} ({state_path_for(output)} is missing); "
+                f"refusing to overwrite the existing export. Remove it or export without --resume."
+            )
+    elif state_path_for(output).exists():
+        # Fresh export: forget any previous resume point
+        state_path_for(output).unlink()
+
+    client = create_mongo_client()
+    db = client[settings.mongodb_db_name]
+
+    query = build_query(user_id, since, until, after_id=start_id, before_id=end_id)
+    cursor = (
+        db.medical_reports.find(query)
+        .sort("_id", 1)
+        .batch_size(batch_size)
+    )
+
+    writer = CompressedWriter(data_path, compression)
+    exported = 0
+    last_id = start_id
+
+    try:
+        async for report in cursor:
+            writer.write_line(json.dumps(report, default=json_default))
+            last_id = report["_id"]
+            exported += 1
+
+            if exported % CHECKPOINT_EVERY == 0:
+                writer.flush()
+                save_state(output, last_id, exported_before + exported)
+    finally:
+        writer.close()
+        if last_id is not None:
+            save_state(output, last_id, exported_before + exported)
+        client.close()
+
+    return exported
+
+
+async def split_id_ranges(db, query: dict, parts: int) -> list:
+    """Split the matching _id space into roughly equal time-based ranges.
+
+    ObjectIds start with their creation timestamp, so boundaries are
+    interpolated between the first and last matching _id without scanning.
+
+    Returns:
+        List of (start_id_exclusive, end_id_inclusive) tuples
+    """
+    first = await db.medical_reports.find_one(query, {"_id": 1}, sort=[("_id", 1)])
+    last = await db.medical_reports.find_one(query, {"_id": 1}, sort=[("_id", -1)])
+    if not first or not last:
+        return []
+
+    start_ts = first["_id"].generation_time.timestamp()
+    end_ts = last["_id"].generation_time.timestamp() + 1
+    step = (end_ts - start_ts) / parts
+
+    ranges = []
+    lower = None
+    for i in range(1, parts):
+        boundary_time = datetime.utcfromtimestamp(start_ts + step * i)
+        upper = ObjectId.from_datetime(boundary_time)
+        ranges.append((lower, upper))
+        lower = upper
+    ranges.append((lower, None))
+    return ranges
+
+
+def _export_range_process(kwargs: dict) -> int:
+    """Run export_range in a worker process with its own event loop."""
+    return asyncio.run(export_range(**kwargs))
+
+
+async def export_parallel(output: Path, workers: int, **kwargs) -> int:
+    """Export _id ranges concurrently, one process and part file per range."""
+    client = create_mongo_client()
+    db = client[settings.mongodb_db_name]
+    try:
+        query = build_query(kwargs.get("user_id"), kwargs.get("since"), kwargs.get("until"))
+        ranges = await split_id_ranges(db, query, workers)
+    finally:
+        client.close()
+
+    jobs = [
+        dict(
+            output=range_output_path(output, i),
+            start_id=start_id,
+            end_id=end_id,
+            **kwargs,
+        )
+        for i, (start_id, end_id) in enumerate(ranges)
+    ]
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = await asyncio.gather(
+            *[loop.run_in_executor(pool, _export_range_process, job) for job in jobs]
+        )
+
+    for job, count in zip(jobs, counts):
+        print(f"  {job['output']}: {count} reports")
+
+    return sum(counts)
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parse an ISO date or datetime from the command line."""
+    return datetime.fromisoformat(value)
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Stream medical reports to compressed JSONL'
+    )
+    parser.add_argument(
+        '--output',
+        required=True,
+        help='Output file path (e.g. reports.jsonl.gz)'
+    )
+    parser.add_argument(
+        '--compression',
+        choices=COMPRESSIONS,
+        help='Compression format (default: inferred from extension, else gzip)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Cursor batch size (default: {DEFAULT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--user-id',
+        help='Only export reports for this user'
+    )
+    parser.add_argument(
+        '--since',
+        type=parse_datetime,
+        help='Only export reports created at or after this ISO date'
+    )
+    parser.add_argument(
+        '--until',
+        type=parse_datetime,
+        help='Only export reports created before this ISO date'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume from the last _id recorded in the state file'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Export _id ranges in parallel processes (default: 1)'
+    )
+
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    compression = args.compression or ("zstd" if output.suffix == ".zst" else "gzip")
+
+    kwargs = dict(
+        compression=compression,
+        batch_size=args.batch_size,
+        user_id=args.user_id,
+        since=args.since,
+        until=args.until,
+        resume=args.resume,
+    )
+
+    print(f"Exporting reports from {settings.mongodb_db_name} to {output} ({compression})")
+    start = time.time()
+
+    try:
+        if args.workers > 1:
+            total = await export_parallel(output, args.workers, **kwargs)
+        else:
+            total = await export_range(output, **kwargs)
+    except FileExistsError as e:
+        sys.exit(f"Error: {e}")
+
+    elapsed = time.time() - start
+    print(f"\n✓ Exported {total} reports in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
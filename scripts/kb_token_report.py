@@ -0,0 +1,103 @@
+"""
+Report prompt-token savings from knowledge base normalization and deduplication.
+
+Reads the markdown files listed in metadata.json, processes them the same
+way the import does and prints original, normalized and deduplicated token
+counts per file and per category. No database connection is needed.
+
+Usage:
+    python scripts/kb_token_report.py
+    python scripts/kb_token_report.py --show-duplicates
+"""
+
+import argparse
+import asyncio
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.services.knowledge_base import KnowledgeBaseService
+
+settings = get_settings()
+
+
+def reduction(original: int, normalized: int) -> str:
+    """Format a token reduction as a percentage."""
+    if not original:
+        return "0.0%"
+    return f"{(original - normalized) / original * 100:.1f}%"
+
+
+def print_table(title: str, rows: list):
+    """Print (name, original, normalized, deduplicated) rows with a total line."""
+    print("\n" + "="*87)
+    print(title)
+    print("="*87)
+    print(f"{'':<50} {'original':>8} {'cleaned':>8} {'deduped':>8} {'saved':>8}")
+
+    for name, original, normalized, deduplicated in rows:
+        print(f"{name:<50} {original:>8} {normalized:>8} {deduplicated:>8} "
+              f"{reduction(original, deduplicated):>8}")
+
+    totals = [sum(row[i] for row in rows) for i in (1, 2, 3)]
+    print("-"*87)
+    print(f"{'TOTAL':<50} {totals[0]:>8} {totals[1]:>8} {totals[2]:>8} "
+          f"{reduction(totals[0], totals[2]):>8}")
+
+
+def print_duplicates(docs: list):
+    """Print the paragraphs dropped as near-duplicates."""
+    print("\n" + "="*87)
+    print("NEAR-DUPLICATE PARAGRAPHS")
+    print("="*87)
+
+    for doc in docs:
+        lines = doc["normalized_content"].split("\n")
+        for record in doc.get("duplicate_paragraphs", []):
+            print(f"\n{doc['id']} (duplicate of {record['duplicate_of']}):")
+            print(f"  {lines[record['line']].strip()[:120]}")
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Report KB token savings from normalization and deduplication'
+    )
+    parser.add_argument(
+        '--show-duplicates',
+        action='store_true',
+        help='List the paragraphs collapsed as near-duplicates'
+    )
+    args = parser.parse_args()
+
+    kb_service = KnowledgeBaseService()
+    docs = await kb_service.build_documents()
+
+    print(f"Token counts for model: {settings.openai_model}")
+
+    file_rows = []
+    category_totals = defaultdict(lambda: [0, 0, 0])
+
+    for doc in sorted(docs, key=lambda d: (d["category"], d["file_name"])):
+        counts = doc["token_counts"]
+        row = (counts["original"], counts["normalized"], counts["deduplicated"])
+        file_rows.append((doc["file_name"], *row))
+        for i, value in enumerate(row):
+            category_totals[doc["category"]][i] += value
+
+    print_table("TOKENS PER FILE", file_rows)
+    print_table(
+        "TOKENS PER CATEGORY",
+        [(category, *totals) for category, totals in sorted(category_totals.items())],
+    )
+
+    if args.show_duplicates:
+        print_duplicates(docs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,328 @@
+"""
+Local OpenAI-compatible chat-completions server for load and failure testing.
+
+Responses are synthesized by the local LLM backend, so report prompts get
+schema-valid CategoryReport JSON built from their KB content. Latency, error
+rates and concurrency are configurable; streaming (SSE) and token usage
+fields follow the OpenAI protocol, so the worker's real HTTP client path
+(pooling, retries, timeouts) is exercised end to end.
+
+Point the worker at it with:
+    LLM_BACKEND=openai_compatible
+    LLM_BASE_URL=http://localhost:8089/v1
+
+Usage:
+    python scripts/mock_llm_server.py
+    python scripts/mock_llm_server.py --latency lognormal --ttft 0.8 --ttft-sigma 0.6 --decode-tps 80
+    python scripts/mock_llm_server.py --error-429-rate 0.05 --error-500-rate 0.01 --max-concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.llm_backends import LOCAL_STREAM_PIECES, LocalChatModel
+from app.utils.tokens import count_tokens
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+class LatencyModel:
+    """Sample time to first token from a distribution, decode at a fixed rate."""
+
+    def __init__(self, distribution: str, ttft: float, sigma: float, decode_tps: float, rng: random.Random):
+        """Initialize the model.
+
+        Args:
+            distribution: fixed, uniform, exponential or lognormal
+            ttft: Mean time to first token in seconds
+            sigma: Spread (uniform half-width, or lognormal sigma)
+            decode_tps: Output tokens per second (0 = instant)
+            rng: Random source
+        """
+        self.distribution = distribution
+        self.ttft = ttft
+        self.sigma = sigma
+        self.decode_tps = decode_tps
+        self.rng = rng
+
+    def first_token(self) -> float:
+        """Sample the time to first token."""
+        if self.distribution == "uniform":
+            return max(self.rng.uniform(self.ttft - self.sigma, self.ttft + self.sigma), 0.0)
+        if self.distribution == "exponential":
+            return self.rng.expovariate(1 / self.ttft) if self.ttft else 0.0
+        if self.distribution == "lognormal":
+            # Median at ttft, long right tail controlled by sigma
+            return self.ttft * self.rng.lognormvariate(0, self.sigma) if self.ttft else 0.0
+        return self.ttft
+
+    def decode(self, output_tokens: int) -> float:
+        """Time to generate output tokens."""
+        return output_tokens / self.decode_tps if self.decode_tps else 0.0
+
+
+class MockLLMServer:
+    """Minimal HTTP/1.1 server speaking the chat-completions protocol."""
+
+    def __init__(self, args: argparse.Namespace):
+        """Initialize server state from CLI arguments."""
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.latency = LatencyModel(args.latency, args.ttft, args.ttft_sigma, args.decode_tps, self.rng)
+        self.semaphore = asyncio.Semaphore(args.max_concurrency) if args.max_concurrency else None
+        self.in_flight = 0
+        self.stats = Counter()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve keep-alive requests on one connection."""
+        self.stats["connections"] += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                body = b""
+                if int(headers.get("content-length", 0)):
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                await self.dispatch(method, path.split("?", 1)[0], body, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        """Route a request."""
+        if method == "GET" and path == "/stats":
+            await self.send_json(writer, 200, {**self.stats, "in_flight": self.in_flight})
+        elif method == "GET" and path.rstrip("/").endswith("/models"):
+            await self.send_json(writer, 200, {
+                "object": "list",
+                "data": [{"id": self.args.model, "object": "model", "owned_by": "mock"}],
+            })
+        elif method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+            await self.chat_completions(body, writer)
+        else:
+            await self.send_error(writer, 404, "not_found", f"No route for {method} {path}")
+
+    async def chat_completions(self, body: bytes, writer: asyncio.StreamWriter):
+        """Serve one chat completion, possibly failing or rate limiting it."""
+        self.stats["requests"] += 1
+        try:
+            request = json.loads(body)
+            messages = [SimpleNamespace(content=m.get("content") or "") for m in request["messages"]]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            await self.send_error(writer, 400, "invalid_request_error", "Malformed chat completion request")
+            return
+
+        roll = self.rng.random()
+        if roll < self.args.error_429_rate:
+            await self.send_rate_limited(writer, "Injected rate limit")
+            return
+        if roll < self.args.error_429_rate + self.args.error_500_rate:
+            self.stats["injected_500"] += 1
+            await self.send_error(writer, 500, "server_error", "Injected server error")
+            return
+
+        if self.semaphore is not None and self.semaphore.locked() and self.args.reject_over_limit:
+            await self.send_rate_limited(writer, "Concurrency limit reached")
+            return
+
+        if self.semaphore is not None:
+            await self.semaphore.acquire()
+        self.in_flight += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+        try:
+            await self.complete(request, messages, writer)
+        finally:
+            self.in_flight -= 1
+            if self.semaphore is not None:
+                self.semaphore.release()
+
+    async def complete(self, request: dict, messages: list, writer: asyncio.StreamWriter):
+        """Generate and send the completion, streamed or whole."""
+        model = request.get("model") or self.args.model
+        output = LocalChatModel.respond(messages)
+        prompt_tokens = sum(count_tokens(m.content, model) for m in messages)
+        completion_tokens = count_tokens(output, model)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        await asyncio.sleep(self.latency.first_token())
+
+        if not request.get("stream"):
+            await asyncio.sleep(self.latency.decode(completion_tokens))
+            self.stats["completions"] += 1
+            await self.send_json(writer, 200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": output},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+            return
+
+        def chunk(delta: dict, finish_reason=None, chunk_usage=None) -> dict:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if chunk_usage is not None:
+                payload["choices"] = []
+                payload["usage"] = chunk_usage
+            return payload
+
+        await self.start_stream(writer)
+        await self.send_event(writer, chunk({"role": "assistant", "content": ""}))
+
+        step = max(len(output) // LOCAL_STREAM_PIECES, 1)
+        piece_delay = self.latency.decode(completion_tokens) / LOCAL_STREAM_PIECES
+        for i in range(0, len(output), step):
+            await asyncio.sleep(piece_delay)
+            await self.send_event(writer, chunk({"content": output[i:i + step]}))
+
+        await self.send_event(writer, chunk({}, finish_reason="stop"))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            await self.send_event(writer, chunk({}, chunk_usage=usage))
+        await self.send_chunk(writer, b"data: [DONE]\n\n")
+        await self.send_chunk(writer, b"")
+        self.stats["completions"] += 1
+
+    @staticmethod
+    async def send_json(writer: asyncio.StreamWriter, status: int, payload: dict, headers: dict = None):
+        """Send a complete JSON response."""
+        body = json.dumps(payload).encode()
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def send_error(self, writer: asyncio.StreamWriter, status: int, error_type: str,
+                         message: str, headers: dict = None):
+        """Send an OpenAI-style error body."""
+        self.stats[f"status_{status}"] += 1
+        await self.send_json(
+            writer,
+            status,
+            {"error": {"message": message, "type": error_type, "param": None, "code": None}},
+            headers,
+        )
+
+    async def send_rate_limited(self, writer: asyncio.StreamWriter, message: str):
+        """Send a 429 with a Retry-After hint."""
+        await self.send_error(
+            writer, 429, "rate_limit_exceeded", message,
+            {"Retry-After": f"{self.args.retry_after:g}"},
+        )
+
+    @staticmethod
+    async def start_stream(writer: asyncio.StreamWriter):
+        """Send headers for a chunked server-sent events response."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def send_chunk(writer: asyncio.StreamWriter, data: bytes):
+        """Send one HTTP chunk (empty data ends the body)."""
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    async def send_event(self, writer: asyncio.StreamWriter, payload: dict):
+        """Send one server-sent event."""
+        await self.send_chunk(writer, f"data: {json.dumps(payload)}\n\n".encode())
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run a local OpenAI-compatible mock LLM server')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8089, help='Port (default: 8089)')
+    parser.add_argument('--model', default='mock-gpt', help='Model id reported by /v1/models')
+    parser.add_argument(
+        '--latency',
+        choices=['fixed', 'uniform', 'exponential', 'lognormal'],
+        default='fixed',
+        help='Time-to-first-token distribution (default: fixed)'
+    )
+    parser.add_argument('--ttft', type=float, default=0.5, help='Mean/median time to first token (s)')
+    parser.add_argument('--ttft-sigma', type=float, default=0.5, help='Spread for uniform/lognormal')
+    parser.add_argument('--decode-tps', type=float, default=100, help='Output tokens/s (0 = instant)')
+    parser.add_argument('--error-429-rate', type=float, default=0.0, help='Share of requests rate limited')
+    parser.add_argument('--error-500-rate', type=float, default=0.0, help='Share of requests failing with 500')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds on 429')
+    parser.add_argument('--max-concurrency', type=int, default=0, help='Concurrent completions (0 = unlimited)')
+    parser.add_argument(
+        '--reject-over-limit',
+        action='store_true',
+        help='Answer 429 instead of queueing when the concurrency limit is reached'
+    )
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for latency and errors')
+
+    args = parser.parse_args()
+    server = MockLLMServer(args)
+    listener = await asyncio.start_server(server.handle_connection, args.host, args.port)
+
+    print(f"Mock LLM server on http://{args.host}:{args.port}/v1 "
+          f"(latency={args.latency}, ttft={args.ttft}s, decode={args.decode_tps} tok/s)")
+    print(f"Stats: http://{args.host}:{args.port}/stats")
+
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nStopped")
@@ -0,0 +1,120 @@
+"""
+Compare requested and actual report lengths per category.
+
+Prints the output budget the current policy derives for each category from
+the KB metadata (summary_length_words), then the requested vs actual words
+of stored reports.
+
+Usage:
+    python scripts/output_length_report.py
+    python scripts/output_length_report.py --budgets-only
+    python scripts/output_length_report.py --days 7
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.core.connections import create_mongo_client
+from app.services.knowledge_base import KnowledgeBaseService
+from app.services.output_budget import OutputBudgetPolicy
+
+settings = get_settings()
+
+
+def output_lengths_pipeline(days=None):
+    """Aggregate stored requested/actual words per category.
+
+    Args:
+        days: Only include reports from the last N days (None = all)
+
+    Returns:
+        Aggregation pipeline for the medical_reports collection
+    """
+    match = {"output_lengths": {"$type": "object"}}
+    if days:
+        match["created_at"] = {"$gte": datetime.utcnow() - timedelta(days=days)}
+
+    return [
+        {"$match": match},
+        {"$project": {"_id": 0, "lengths": {"$objectToArray": "$output_lengths"}}},
+        {"$unwind": "$lengths"},
+        {"$group": {
+            "_id": "$lengths.k",
+            "reports": {"$sum": 1},
+            "requested": {"$avg": "$lengths.v.requested_words"},
+            "actual": {"$avg": "$lengths.v.actual_words"},
+            "max_actual": {"$max": "$lengths.v.actual_words"},
+            "over": {"$sum": {"$cond": [
+                {"$and": [
+                    {"$gt": ["$lengths.v.requested_words", 0]},
+                    {"$gt": ["$lengths.v.actual_words", "$lengths.v.requested_words"]},
+                ]},
+                1,
+                0,
+            ]}},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+async def print_budgets(policy: OutputBudgetPolicy):
+    """Print the budget per category derived from the KB metadata."""
+    items = await KnowledgeBaseService().load_metadata()
+    source_words = OutputBudgetPolicy.source_words(items)
+
+    print("\n" + "="*72)
+    print("OUTPUT BUDGETS (from KB metadata)")
+    print("="*72)
+    print(f"{'category':<24} {'source words':>12} {'target words':>13} {'max_tokens':>11} {'was':>6}")
+    for category, words in sorted(source_words.items()):
+        target = policy.target_words(category, words)
+        print(f"{category:<24} {words:>12} {target:>13} {policy.max_tokens(target):>11} "
+              f"{settings.openai_max_tokens:>6}")
+
+
+async def print_actuals(days=None):
+    """Print requested vs actual words of stored reports."""
+    client = create_mongo_client()
+    try:
+        db = client[settings.mongodb_db_name]
+        rows = await db.medical_reports.aggregate(output_lengths_pipeline(days)).to_list(length=None)
+    finally:
+        client.close()
+
+    print("\n" + "="*72)
+    print("REQUESTED VS ACTUAL WORDS (stored reports)")
+    print("="*72)
+    if not rows:
+        print("No reports with output lengths found.")
+        return
+
+    print(f"{'category':<24} {'reports':>8} {'requested':>10} {'actual':>8} {'ratio':>7} {'max':>6} {'over':>6}")
+    for row in rows:
+        requested = row["requested"] or 0
+        ratio = f"{row['actual'] / requested * 100:.0f}%" if requested else "-"
+        over = f"{row['over'] / row['reports'] * 100:.0f}%" if requested else "-"
+        print(f"{row['_id']:<24} {row['reports']:>8} {requested:>10.0f} {row['actual']:>8.0f} "
+              f"{ratio:>7} {row['max_actual']:>6} {over:>6}")
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Compare requested and actual report lengths')
+    parser.add_argument('--budgets-only', action='store_true', help='Only print budgets (no database)')
+    parser.add_argument('--days', type=int, default=None, help='Only include reports from the last N days')
+    args = parser.parse_args()
+
+    await print_budgets(OutputBudgetPolicy())
+    if not args.budgets_only:
+        await print_actuals(args.days)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
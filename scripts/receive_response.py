@@ -28,6 +28,13 @@ def callback(ch, method, properties, body):
     try:
         response = json.loads(body)
 
+        if response.get('status') == 'processing':
+            # Progress update (only on this queue when RABBITMQ_PROGRESS_EXCHANGE is empty)
+            category = response.get('category') or '-'
+            done = " (category complete)" if response.get('category_report') else ""
+            print(f"… {response.get('request_id', 'N/A')}: {response.get('progress', 0)}% [{category}]{done}")
+            return
+
         print(f"\n{'='*60}")
         print("RESPONSE RECEIVED")
         print(f"{'='*60}")
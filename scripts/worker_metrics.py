@@ -0,0 +1,89 @@
+"""
+Show the metrics snapshots published by running workers.
+
+Each worker writes its counters, LLM token usage and cost, and other
+registered metrics to Redis after every request.
+
+Usage:
+    python scripts/worker_metrics.py
+    python scripts/worker_metrics.py --json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings
+from app.core.connections import create_redis_client
+from app.services.metrics import METRICS_KEY_PREFIX
+from app.services.redis_codec import RedisCodec
+
+settings = get_settings()
+
+
+def print_snapshot(snapshot: dict):
+    """Print one worker's snapshot in a readable form."""
+    print(f"\n{'='*60}")
+    print(f"Worker: {snapshot.get('worker')}  (up {snapshot.get('uptime_seconds', 0) / 60:.1f} min)")
+    print(f"{'='*60}")
+
+    counters = snapshot.get("counters", {})
+    succeeded = counters.get("requests_succeeded", 0)
+    print(f"Requests: {succeeded} succeeded, {counters.get('requests_failed', 0)} failed")
+    if succeeded:
+        print(f"Avg generation time: {counters.get('generation_seconds', 0) / succeeded:.2f}s")
+
+    usage = snapshot.get("llm_usage")
+    if usage:
+        print(f"\nLLM calls: {usage['calls']}")
+        print(f"  Prompt tokens: {usage['prompt_tokens']:,} ({usage['cached_tokens']:,} cached)")
+        print(f"  Completion tokens: {usage['completion_tokens']:,}")
+        print(f"  Cost: ${usage['cost_usd']:.4f}")
+        if succeeded:
+            print(f"  Per report: {usage['total_tokens'] / succeeded:,.0f} tokens, "
+                  f"${usage['cost_usd'] / succeeded:.4f}")
+        for model, totals in usage.get("by_model", {}).items():
+            print(f"  {model}: {totals['calls']} calls, ${totals['cost_usd']:.4f}")
+
+    for section, values in snapshot.items():
+        if section in ("worker", "timestamp", "uptime_seconds", "counters", "llm_usage"):
+            continue
+        print(f"\n{section}:")
+        for key, value in values.items():
+            print(f"  {key}: {value}")
+
+
+async def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Show metrics published by workers')
+    parser.add_argument('--json', action='store_true', help='Print raw JSON snapshots')
+    args = parser.parse_args()
+
+    codec = RedisCodec()
+    client = create_redis_client()
+    try:
+        keys = sorted([key async for key in client.scan_iter(match=f"{METRICS_KEY_PREFIX}*")])
+        if not keys:
+            print("No worker metrics found (workers publish after each request).")
+            return
+
+        for key in keys:
+            value = await client.get(key)
+            if not value:
+                continue
+            snapshot = codec.decode(value)
+            if args.json:
+                print(json.dumps(snapshot, indent=2))
+            else:
+                print_snapshot(snapshot)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
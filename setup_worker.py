@@ -16,25 +16,11 @@ async def import_knowledge_base():
         await mongodb.connect()
         kb_service = KnowledgeBaseService(mongodb.db)
 
-        # Check if already imported
-        existing_count = await mongodb.db.knowledge_base.count_documents({})
-
-        if existing_count > 0:
-            print(f"Knowledge base already exists with {existing_count} items.")
-            response = input("Do you want to re-import? (y/N): ").lower()
-
-            if response == 'y':
-                # Clear existing
-                await mongodb.db.knowledge_base.delete_many({})
-                print("Cleared existing knowledge base.")
-            else:
-                print("Skipping import.")
-                await mongodb.disconnect()
-                return
-
-        # Import
-        count = await kb_service.import_from_files()
-        print(f"✓ Successfully imported {count} knowledge base items")
+        # Sync files to the database; unchanged items are skipped
+        result = await kb_service.sync_to_database()
+        print(f"✓ Knowledge base synced: {result.total} items "
+              f"({result.added} added, {result.changed} changed, "
+              f"{result.unchanged} unchanged, {result.removed} removed)")
 
         # Verify import
         categories = await mongodb.db.knowledge_base.distinct("category")
@@ -93,7 +79,8 @@ def check_environment():
     settings = get_settings()
 
     checks = [
-        ("OpenAI API Key", bool(settings.openai_api_key)),
+        ("OpenAI API Key", settings.llm_backend != "openai" or bool(settings.openai_api_key)),
+        ("LLM Base URL", settings.llm_backend != "openai_compatible" or bool(settings.llm_base_url)),
         ("MongoDB URL", bool(settings.mongodb_url)),
         ("Redis URL", bool(settings.redis_url)),
         ("RabbitMQ URL", bool(settings.rabbitmq_url)),
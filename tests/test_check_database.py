@@ -0,0 +1,26 @@
+"""Test the report statistics aggregation of the check_database script."""
+
+from scripts.check_database import report_stats_pipeline
+
+
+def _stages(pipeline):
+    """Operator names of pipeline stages."""
+    return [next(iter(stage)) for stage in pipeline]
+
+
+def test_stats_pipeline_projects_then_facets():
+    """Test the pipeline narrows documents once, then computes every statistic in one $facet."""
+    pipeline = report_stats_pipeline(days=7, top_users=3)
+
+    assert _stages(pipeline) == ["$project", "$facet"]
+    assert set(pipeline[1]["$facet"]) == {"generation", "usage", "per_user", "per_day"}
+
+
+def test_per_user_facet_bounded():
+    """Test per-user stats use $topN without nested facets or pushed rows."""
+    per_user = report_stats_pipeline(top_users=3)[1]["$facet"]["per_user"]
+
+    assert "$facet" not in _stages(per_user)
+    summary = per_user[-1]["$group"]
+    assert summary["top"]["$topN"]["n"] == 3
+    assert not any("$push" in accumulator for accumulator in summary.values() if isinstance(accumulator, dict))
@@ -0,0 +1,99 @@
+"""Test startup connection management."""
+
+import pytest
+
+from app.core.connections import ConnectionManager
+from app.services.rabbitmq_service import RabbitMQService
+
+
+@pytest.mark.asyncio
+async def test_flaky_backend_retried_and_timed():
+    """Test a backend failing once is retried, and its connect latency recorded."""
+    calls = {"flaky": 0}
+
+    async def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] == 1:
+            raise ConnectionError("refused")
+
+    async def healthy():
+        pass
+
+    manager = ConnectionManager(attempts=3, base_delay=0.01, max_delay=0.01)
+    await manager.connect_all({"flaky": flaky, "healthy": healthy})
+
+    stats = manager.stats()
+    assert stats["flaky"]["attempts"] == 2
+    assert stats["healthy"]["attempts"] == 1
+    assert stats["flaky"]["connected"] and stats["flaky"]["connect_seconds"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_attempts():
+    """Test the last error is raised once all attempts fail."""
+    async def down():
+        raise ConnectionError("refused")
+
+    manager = ConnectionManager(attempts=2, base_delay=0.01, max_delay=0.01)
+    with pytest.raises(ConnectionError):
+        await manager.connect_all({"down": down})
+
+    stats = manager.stats()["down"]
+    assert not stats["connected"]
+    assert stats["attempts"] == 2
+    assert stats["error"] == "refused"
+
+
+@pytest.mark.asyncio
+async def test_connected_backends_closed_when_another_fails():
+    """Test backends that connected are closed when another backend cannot connect."""
+    closed = []
+
+    async def healthy():
+        pass
+
+    async def down():
+        raise ConnectionError("refused")
+
+    async def close_healthy():
+        closed.append("healthy")
+
+    async def close_down():
+        closed.append("down")
+
+    manager = ConnectionManager(attempts=1)
+    with pytest.raises(ConnectionError):
+        await manager.connect_all(
+            {"healthy": healthy, "down": down},
+            disconnects={"healthy": close_healthy, "down": close_down},
+        )
+
+    assert closed == ["healthy"]
+
+
+@pytest.mark.asyncio
+async def test_rabbitmq_connection_closed_when_setup_fails(monkeypatch):
+    """Test a RabbitMQ connect failing after the connection opened closes it before a retry."""
+    import aio_pika
+
+    class Connection:
+        closed = False
+
+        async def channel(self):
+            raise ConnectionError("channel refused")
+
+        async def close(self):
+            self.closed = True
+
+    connection = Connection()
+
+    async def connect_robust(*args, **kwargs):
+        return connection
+
+    monkeypatch.setattr(aio_pika, "connect_robust", connect_robust)
+    service = RabbitMQService()
+    with pytest.raises(ConnectionError):
+        await service.connect()
+
+    assert connection.closed
+    assert service.connection is None and service.channel is None
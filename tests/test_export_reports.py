@@ -0,0 +1,17 @@
+"""Test resumable report export."""
+
+import pytest
+
+from scripts.export_reports import export_range
+
+
+@pytest.mark.asyncio
+async def test_resume_without_state_keeps_existing_output(tmp_path):
+    """Test --resume with no state file refuses to truncate an existing export."""
+    output = tmp_path / "reports.jsonl.gz"
+    output.write_bytes(b"previous export")
+
+    with pytest.raises(FileExistsError):
+        await export_range(output, compression="gzip", resume=True)
+
+    assert output.read_bytes() == b"previous export"
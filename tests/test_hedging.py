@@ -0,0 +1,105 @@
+"""Test hedged LLM requests."""
+
+import asyncio
+
+import pytest
+
+from app.services.hedging import HedgingPolicy, LatencyTracker
+
+
+def test_percentile_needs_min_samples():
+    """Test percentiles are only reported once enough samples exist."""
+    tracker = LatencyTracker()
+    for i in range(1, 21):
+        tracker.record("alcohol", i / 10)
+
+    assert tracker.percentile("alcohol", 0.95, min_samples=50) is None
+    assert tracker.percentile("alcohol", 0.95, min_samples=20) == pytest.approx(1.9)
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_loser_cancelled():
+    """Test a call slower than p95 is hedged and the slow primary cancelled."""
+    policy = HedgingPolicy(percentile=0.95, max_fraction=1.0, min_samples=1)
+    policy.latencies.record("alcohol", 0.01)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "primary"
+
+    async def fast():
+        return "hedge"
+
+    assert await policy.run("alcohol", slow, fast) == "hedge"
+    assert cancelled == [True]
+    assert policy.stats()["hedge_wins"] == 1
+    # The hedged time says nothing about the primary's latency
+    assert list(policy.latencies.samples["alcohol"]) == [0.01]
+
+
+@pytest.mark.asyncio
+async def test_hedges_capped_by_fraction():
+    """Test no hedge is issued once the hedge budget is used up."""
+    policy = HedgingPolicy(percentile=0.95, max_fraction=0.0, min_samples=1)
+    policy.latencies.record("alcohol", 0.001)
+
+    async def primary():
+        await asyncio.sleep(0.01)
+        return "primary"
+
+    async def hedge():
+        return "hedge"
+
+    assert await policy.run("alcohol", primary, hedge) == "primary"
+    assert policy.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_run_cancels_primary():
+    """Test cancelling a call while it waits on the threshold cancels the primary."""
+    policy = HedgingPolicy(percentile=0.95, max_fraction=1.0, min_samples=1)
+    policy.latencies.record("alcohol", 5)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def hedge():
+        return "hedge"
+
+    run = asyncio.ensure_future(policy.run("alcohol", slow, hedge))
+    await asyncio.sleep(0.01)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+
+    assert cancelled == [True]
+    assert policy.stats()["cancelled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_primary_winning_hedged_call_records_its_latency():
+    """Test a hedged call the primary still wins records the primary's latency."""
+    policy = HedgingPolicy(percentile=0.95, max_fraction=1.0, min_samples=1)
+    policy.latencies.record("alcohol", 0.01)
+
+    async def primary():
+        await asyncio.sleep(0.03)
+        return "primary"
+
+    async def slower_hedge():
+        await asyncio.sleep(5)
+        return "hedge"
+
+    assert await policy.run("alcohol", primary, slower_hedge) == "primary"
+    assert policy.hedges == 1
+    assert policy.latencies.samples["alcohol"][-1] >= 0.03
@@ -0,0 +1,41 @@
+"""Test near-duplicate paragraph elimination."""
+
+from app.services.kb_dedup import deduplicate_documents, find_near_duplicates
+
+
+def _doc(item_id, content):
+    """Build a minimal normalized KB document."""
+    return {
+        "id": item_id,
+        "category": "healthy_eating",
+        "source_url": f"https://example.com/{item_id}",
+        "normalized_content": content,
+    }
+
+
+def test_find_near_duplicates_keeps_first():
+    """Test later near-duplicate paragraphs map to the first occurrence."""
+    paragraphs = [
+        "Eat plenty of vegetables, fruit and wholegrain foods every day for good health.",
+        "Walking for thirty minutes most days of the week helps with weight control.",
+        "Eat plenty of vegetables, fruit and wholegrain foods every single day for good health.",
+    ]
+    assert find_near_duplicates(paragraphs, threshold=0.5) == {2: 0}
+
+
+def test_short_paragraphs_are_never_collapsed():
+    """Test headings repeated across files are kept."""
+    assert find_near_duplicates(["Background", "Background"], threshold=0.5) == {}
+
+
+def test_deduplicate_documents_keeps_attribution():
+    """Test dropped copies are attributed on the kept paragraph."""
+    shared = "This summary is general information and not a substitute for medical advice."
+    docs = [_doc("first", f"Intro one.\n{shared}\n"), _doc("second", f"Intro two.\n{shared}\n")]
+
+    removed = deduplicate_documents(docs, threshold=0.5)
+
+    assert removed == {"healthy_eating": 1}
+    assert shared not in docs[1]["deduplicated_content"]
+    assert "[also: https://example.com/second]" in docs[0]["deduplicated_content"]
+    assert docs[1]["duplicate_paragraphs"] == [{"line": 1, "duplicate_of": "first"}]
@@ -0,0 +1,65 @@
+"""Test patient-relevant knowledge base retrieval."""
+
+from app.models.schemas import ReportGenerationRequest
+from app.services.kb_retrieval import (
+    BM25Index,
+    KnowledgeBaseRetriever,
+    build_patient_query,
+    chunk_kb_content,
+)
+
+
+def _item(item_id, category, applies_to, chunks):
+    """Build a minimal KB item document."""
+    return {
+        "id": item_id,
+        "title": item_id.title(),
+        "category": category,
+        "applies_to": applies_to,
+        "source_url": f"https://example.com/{item_id}",
+        "content": "\n\n".join(chunks),
+        "chunks": chunks,
+    }
+
+
+def test_chunking_starts_new_chunk_at_headings():
+    """Test chunks break at section headings."""
+    content = "Background\n\nSome text here.\n\nMain Recommendations\n\nMore text."
+    chunks = chunk_kb_content(content, max_words=100)
+
+    assert chunks == ["Background\n\nSome text here.", "Main Recommendations\n\nMore text."]
+
+
+def test_bm25_ranks_matching_document_first():
+    """Test BM25 scores the document sharing query terms highest."""
+    index = BM25Index(["salt and blood pressure", "fruit and vegetables", "walking daily"])
+    scores = index.scores("lower blood pressure")
+
+    assert scores[0] > scores[1]
+    assert scores[0] > scores[2]
+
+
+def test_retriever_filters_by_applies_to():
+    """Test items for other patient groups are excluded."""
+    retriever = KnowledgeBaseRetriever(
+        [
+            _item("general", "alcohol", ["all"], ["Drink less alcohol."]),
+            _item("pregnancy", "alcohol", ["pregnancy"], ["No alcohol when pregnant."]),
+        ],
+        top_k=5,
+    )
+    results = retriever.retrieve("alcohol", "alcohol", {"all"})
+
+    assert [item["id"] for item, _ in results] == ["general"]
+
+
+def test_patient_query_tags(sample_request_message):
+    """Test tags are derived from risk factors and lifestyle."""
+    request = ReportGenerationRequest(**sample_request_message)
+    request.cvd_summary.modifiable_risk_factors = ["high LDL cholesterol", "overweight"]
+
+    query, tags = build_patient_query(request)
+
+    assert "cholesterol" in query
+    assert {"all", "hyperlipidaemia", "overweight"} <= tags
+    assert "smoker" not in tags
@@ -0,0 +1,78 @@
+"""Test incremental knowledge base sync."""
+
+import pytest
+from pymongo import DeleteMany, ReplaceOne
+
+from app.services.knowledge_base import KnowledgeBaseService
+
+
+class FakeCollection:
+    """In-memory knowledge_base collection applying bulk writes."""
+
+    def __init__(self):
+        self.docs = {}
+        self.bulk_writes = []
+
+    async def find(self, query, projection):
+        for doc in list(self.docs.values()):
+            yield {"id": doc["id"], "content_hash": doc.get("content_hash")}
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append(operations)
+        for operation in operations:
+            if isinstance(operation, ReplaceOne):
+                self.docs[operation._filter["id"]] = dict(operation._doc)
+            elif isinstance(operation, DeleteMany):
+                for item_id in operation._filter["id"]["$in"]:
+                    self.docs.pop(item_id, None)
+
+
+def _doc(item_id, content_hash, **fields):
+    """Build a minimal KB document."""
+    return {"id": item_id, "category": "alcohol", "content_hash": content_hash, **fields}
+
+
+def _service(collection, docs):
+    """Build a service over the fake collection that imports the given documents."""
+    service = KnowledgeBaseService()
+    service.kb_collection = collection
+
+    async def build_documents():
+        return docs
+
+    service.build_documents = build_documents
+    return service
+
+
+@pytest.mark.asyncio
+async def test_second_sync_writes_only_changes():
+    """Test a re-import adds, replaces and deletes only what changed."""
+    collection = FakeCollection()
+    first = [_doc("a", "h1"), _doc("b", "h2", summary="Old summary"), _doc("c", "h3")]
+    result = await _service(collection, first).sync_to_database()
+    assert (result.added, result.changed, result.unchanged, result.removed) == (3, 0, 0, 0)
+
+    second = [_doc("a", "h1"), _doc("b", "h2-new"), _doc("d", "h4")]
+    result = await _service(collection, second).sync_to_database()
+
+    assert (result.added, result.changed, result.unchanged, result.removed) == (1, 1, 1, 1)
+    assert collection.bulk_writes[-1] == [
+        ReplaceOne({"id": "b"}, _doc("b", "h2-new"), upsert=True),
+        ReplaceOne({"id": "d"}, _doc("d", "h4"), upsert=True),
+        DeleteMany({"id": {"$in": ["c"]}}),
+    ]
+    assert sorted(collection.docs) == ["a", "b", "d"]
+    assert "summary" not in collection.docs["b"]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_sync_skips_bulk_write():
+    """Test re-importing identical content issues no writes."""
+    collection = FakeCollection()
+    docs = [_doc("a", "h1")]
+    await _service(collection, docs).sync_to_database()
+
+    result = await _service(collection, docs).sync_to_database()
+
+    assert result.unchanged == 1
+    assert len(collection.bulk_writes) == 1
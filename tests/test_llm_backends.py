@@ -0,0 +1,74 @@
+"""Test LLM backend selection and the local backend."""
+
+import json
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.models.schemas import CategoryReport, ReportPersonalization
+from app.services.llm_backends import LLMBackend, LocalBackend, LocalChatModel, OpenAIBackend, get_llm_backend
+
+CONTENT = (
+    "# Cutting Down on Alcohol\n\n"
+    "Source: https://example.org/alcohol\n\n"
+    "Drink no more than 10 standard drinks a week.\n\n"
+    "---\n\n"
+)
+
+
+def test_unknown_backend_rejected():
+    """Test an unknown backend name raises a clear error."""
+    with pytest.raises(ValueError):
+        get_llm_backend("nonexistent")
+
+
+def test_misconfigured_backends_fail_on_creation(monkeypatch):
+    """Test a backend without chat_model, or OpenAI without a key, fails when created."""
+    class IncompleteBackend(LLMBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+    monkeypatch.setattr("app.services.llm_backends.settings.openai_api_key", "")
+    with pytest.raises(ValueError):
+        OpenAIBackend()
+
+
+@pytest.mark.asyncio
+async def test_local_report_is_schema_valid():
+    """Test the local model writes a CategoryReport from the KB content."""
+    model = LocalBackend(ttft=0, prefill_tps=0, decode_tps=0).chat_model("gpt-4o", 0.7, 2000)
+    messages = [
+        SystemMessage(content="system"),
+        HumanMessage(content=f"Content:\n{CONTENT}\n\nCreate a one-page friendly summary "
+                             "report about alcohol from the content above."),
+    ]
+
+    response = await model.ainvoke(messages)
+    report = CategoryReport(**json.loads(response.content))
+
+    assert report.category == "alcohol"
+    assert "(https://example.org/alcohol)" in report.text
+    assert model.usage["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_local_stream_matches_invoke():
+    """Test streamed chunks join to the same deterministic output."""
+    model = LocalChatModel("gpt-4o", 2000)
+    messages = [HumanMessage(content=f"Content:\n{CONTENT}\n\nCondense the content above about alcohol.")]
+
+    chunks = [chunk.content async for chunk in model.astream(messages)]
+
+    assert "".join(chunks) == (await model.ainvoke(messages)).content
+
+
+def test_local_personalization_returns_prefaces():
+    """Test the local model answers the personalization prompt with one preface per category."""
+    task = "Write a preface for each of these categories: alcohol, blood_pressure.\nKeep each preface to about 5 words."
+    output = LocalChatModel.respond([HumanMessage(content=f"Content:\nAge: 35, sex: male\n\n{task}")])
+
+    prefaces = ReportPersonalization(**json.loads(output)).prefaces
+    assert [preface.category for preface in prefaces] == ["alcohol", "blood_pressure"]
+    assert prefaces[0].text == "Age: 35, sex: male"
@@ -0,0 +1,51 @@
+"""Test the shared LLM HTTP client."""
+
+import pytest
+
+from app.services.llm_client import LLMHttpClient
+
+
+@pytest.mark.asyncio
+async def test_client_is_shared_until_closed():
+    """Test every caller gets the same pooled client until it is closed."""
+    shared = LLMHttpClient(max_connections=7, max_keepalive_connections=3)
+    client = shared.get()
+
+    assert shared.get() is client
+    stats = shared.pool_stats()
+    assert stats["max_connections"] == 7
+    assert stats["open_connections"] == 0
+    assert stats["connection_reuse_ratio"] == 0.0
+
+    await shared.aclose()
+    assert client.is_closed
+    assert shared.get() is not client
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_installed_httpx_pool_is_inspectable():
+    """Test the private pool attributes the connection stats read exist in the installed httpx."""
+    shared = LLMHttpClient()
+    client = shared.get()
+
+    assert hasattr(client._transport, "_pool")
+    assert hasattr(client._transport._pool, "connections")
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stats_degrade_without_pool_internals(monkeypatch):
+    """Test pool stats still report requests when httpx internals are unavailable."""
+    shared = LLMHttpClient()
+    client = shared.get()
+    monkeypatch.setattr(client, "_transport", object())
+
+    await shared._on_response(None)
+    stats = shared.pool_stats()
+
+    assert stats["requests"] == 1
+    assert stats["open_connections"] is None
+    assert stats["connection_reuse_ratio"] is None
+    monkeypatch.undo()
+    await shared.aclose()
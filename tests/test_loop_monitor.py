@@ -0,0 +1,64 @@
+"""Test the event-loop lag monitor."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.loop_monitor import LoopLagMonitor
+
+
+def block_loop(seconds: float):
+    """Synchronous work that never yields to the loop."""
+    time.sleep(seconds)
+
+
+def test_lag_histogram_buckets():
+    """Test lag samples land in their millisecond buckets."""
+    monitor = LoopLagMonitor(interval=0.1, threshold=0.1, max_stalls=5)
+    for lag in (0.0005, 0.003, 0.003, 3.0):
+        monitor.record(lag)
+
+    stats = monitor.stats()
+    assert stats["samples"] == 4
+    assert stats["histogram"]["le_1ms"] == 1
+    assert stats["histogram"]["le_5ms"] == 2
+    assert stats["histogram"]["gt_2500ms"] == 1
+    assert stats["max_lag_ms"] == pytest.approx(3000)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_captured_as_stall():
+    """Test blocking the loop records the lag and the blocking code's stack."""
+    monitor = LoopLagMonitor(interval=0.02, threshold=0.05, max_stalls=5)
+    monitor.start()
+    await asyncio.sleep(0.1)
+
+    block_loop(0.3)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 1
+    assert stats["max_lag_ms"] >= 200
+    assert any("block_loop" in frame for frame in stats["recent_stalls"][0]["stack"])
+
+
+@pytest.mark.asyncio
+async def test_stall_just_over_threshold_captured():
+    """Test a block barely past the threshold is caught when the sample interval is longer."""
+    monitor = LoopLagMonitor(interval=0.25, threshold=0.05, max_stalls=5)
+    monitor.start()
+    heartbeat = monitor._heartbeat
+    while monitor._heartbeat == heartbeat:
+        await asyncio.sleep(0.005)
+
+    # Block across the next expected wake-up: the loop is ~0.13s late
+    await asyncio.sleep(0.2)
+    block_loop(0.18)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 1
+    assert any("block_loop" in frame for frame in stats["recent_stalls"][0]["stack"])
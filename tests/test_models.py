@@ -10,6 +10,7 @@ from app.models.schemas import (
     Assessment,
     CategoryReport,
     CategoryReportItem,
+    KnowledgeBaseImportResult,
     MedicalReport,
 )
 
@@ -75,10 +76,9 @@ def test_category_report_valid():
     report = CategoryReport(
         category="weight_management",
         text="This is a friendly report with [links](https://example.com).",
-        sources=["https://example.com", "https://example.org"]
     )
     assert report.category == "weight_management"
-    assert len(report.sources) == 2
+    assert "sources" not in report.model_dump()
 
 
 def test_medical_report_minimal():
@@ -134,3 +134,9 @@ def test_medical_report_with_category_reports():
     )
     assert len(report.category_reports) == 1
     assert report.category_reports[0].category == "test"
+
+
+def test_knowledge_base_import_result_total():
+    """Test import result total excludes removed items."""
+    result = KnowledgeBaseImportResult(added=2, changed=1, unchanged=5, removed=3)
+    assert result.total == 8
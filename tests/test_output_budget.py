@@ -0,0 +1,47 @@
+"""Test per-category output budgets."""
+
+from app.services.output_budget import OutputBudgetPolicy, OutputLengthTracker
+
+
+def _policy(**overrides):
+    """Build a policy with fixed parameters."""
+    return OutputBudgetPolicy(
+        ratio=0.5, min_words=100, max_words=400, tokens_per_word=1.5,
+        headroom=2.0, overhead_tokens=50, overrides=overrides,
+    )
+
+
+def test_target_words_scale_with_source_and_clamp():
+    """Test targets follow the source length within the configured range."""
+    policy = _policy(alcohol=250)
+
+    assert policy.target_words("healthy_eating", 600) == 300
+    assert policy.target_words("smoking", 100) == 100
+    assert policy.target_words("weight_management", 2000) == 400
+    assert policy.target_words("alcohol", 2000) == 250
+
+
+def test_max_tokens_include_headroom():
+    """Test the token cap leaves headroom over the target."""
+    assert _policy().max_tokens(300) == 300 * 1.5 * 2.0 + 50
+
+
+def test_source_words_from_metadata_dicts():
+    """Test source words are summed per category."""
+    items = [
+        {"category": "alcohol", "summary_length_words": 300},
+        {"category": "alcohol", "summary_length_words": 100},
+        {"category": "smoking", "summary_length_words": 250},
+    ]
+    assert OutputBudgetPolicy.source_words(items) == {"alcohol": 400, "smoking": 250}
+
+
+def test_length_tracker_reports_over_budget_share():
+    """Test requested vs actual averages and over-budget ratio."""
+    tracker = OutputLengthTracker()
+    tracker.record("alcohol", 200, 180)
+    tracker.record("alcohol", 200, 260)
+
+    stats = tracker.stats()["alcohol"]
+    assert stats["avg_actual_words"] == 220
+    assert stats["over_budget_ratio"] == 0.5
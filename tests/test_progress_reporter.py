@@ -0,0 +1,61 @@
+"""Test throttled progress reporting."""
+
+import pytest
+
+from app.models.schemas import CategoryReportItem
+from app.services.progress_reporter import ProgressReporter
+
+
+def _reporter(messages, min_interval=60.0):
+    """Build a reporter collecting published messages."""
+    async def publish(message):
+        messages.append(message)
+
+    return ProgressReporter("req-1", "user-1", 2, publish, min_interval=min_interval)
+
+
+@pytest.mark.asyncio
+async def test_streamed_progress_is_throttled():
+    """Test only the first streamed update inside the interval is sent."""
+    messages = []
+    reporter = _reporter(messages)
+    reporter._last_sent = -1e9
+
+    await reporter.on_tokens("alcohol", 10)
+    await reporter.on_tokens("alcohol", 20)
+
+    assert len(messages) == 1
+    assert messages[0]["status"] == "processing"
+
+
+@pytest.mark.asyncio
+async def test_category_complete_always_sent():
+    """Test completed categories are published with their report."""
+    messages = []
+    reporter = _reporter(messages)
+    report = CategoryReportItem(category="alcohol", text="Text", sources=[])
+
+    await reporter.on_category_complete(report)
+    await reporter.on_category_complete(report)
+
+    assert [m["progress"] for m in messages] == [50, 99]
+    assert messages[0]["category_report"]["category"] == "alcohol"
+
+
+@pytest.mark.asyncio
+async def test_streamed_progress_uses_category_budget():
+    """Test streamed progress is measured against each category's expected output."""
+    messages = []
+
+    async def publish(message):
+        messages.append(message)
+
+    reporter = ProgressReporter(
+        "req-1", "user-1", 2, publish, min_interval=0.0,
+        expected_tokens={"alcohol": 200, "sleep": 200},
+    )
+
+    await reporter.on_tokens("alcohol", 100)
+    await reporter.on_tokens("alcohol,sleep", 200)
+
+    assert [m["progress"] for m in messages] == [25, 50]
@@ -0,0 +1,78 @@
+"""Test prompt compilation layout and prefix hashing."""
+
+from langchain_core.output_parsers import JsonOutputParser
+
+from app.models.schemas import (
+    CategoryReport,
+    MultiCategoryReport,
+    ReportGenerationRequest,
+    ReportPersonalization,
+)
+from app.services.prompt_compiler import PromptCompiler, format_patient_context
+
+
+def _compiler():
+    """Build a compiler around the category report parser."""
+    return PromptCompiler(
+        JsonOutputParser(pydantic_object=CategoryReport),
+        JsonOutputParser(pydantic_object=MultiCategoryReport),
+        JsonOutputParser(pydantic_object=ReportPersonalization),
+    )
+
+
+def test_format_instructions_in_system_prefix():
+    """Test the schema sits in the static system message, not after the content."""
+    compiler = _compiler()
+    prompt = compiler.compile_report("alcohol", "Drink less.")
+
+    system, human = prompt.messages
+    assert compiler.format_instructions in system.content
+    assert compiler.format_instructions not in human.content
+    assert human.content.startswith("Content:\nDrink less.")
+
+
+def test_prefix_hashes_are_stable():
+    """Test identical content yields identical prefix hashes."""
+    compiler = _compiler()
+    first = compiler.compile_report("alcohol", "Drink less.")
+    second = compiler.compile_report("alcohol", "Drink less.")
+    other = compiler.compile_report("alcohol", "Drink water.")
+
+    assert first.static_prefix_hash == other.static_prefix_hash
+    assert first.content_prefix_hash == second.content_prefix_hash
+    assert first.content_prefix_hash != other.content_prefix_hash
+    assert compiler.reuse_stats()["distinct_content_prefixes"] == 2
+
+
+def test_multi_report_lists_every_category():
+    """Test the single-call prompt contains each category section."""
+    compiler = _compiler()
+    prompt = compiler.compile_multi_report({"alcohol": "Drink less.", "blood_pressure": "Less salt."})
+
+    human = prompt.messages[1].content
+    assert "## Category: alcohol\n\nDrink less." in human
+    assert "## Category: blood_pressure\n\nLess salt." in human
+    assert human.endswith("categories: alcohol, blood_pressure.\n"
+                          "Include inline source links in markdown format throughout each text.")
+
+
+def test_target_length_follows_task():
+    """Test the requested length is stated after the task, outside the cached prefix."""
+    compiler = _compiler()
+    with_budget = compiler.compile_report("alcohol", "Drink less.", target_words=250)
+    without = compiler.compile_report("alcohol", "Drink less.")
+
+    assert with_budget.messages[1].content.endswith("Keep it to about 250 words.")
+    assert with_budget.content_prefix_hash == without.content_prefix_hash
+
+
+def test_personalization_uses_patient_context_only(sample_request_message):
+    """Test the personalization prompt carries the patient profile, not the name or KB content."""
+    request = ReportGenerationRequest(**sample_request_message)
+    prompt = _compiler().compile_personalization(format_patient_context(request), ["healthy_eating"], 80)
+
+    human = prompt.messages[1].content
+    assert "Cardiovascular risk: low (5.0% over 5 years)" in human
+    assert "- Continue healthy lifestyle" in human
+    assert "Test Patient" not in human
+    assert human.endswith("categories: healthy_eating.\nKeep each preface to about 80 words.")
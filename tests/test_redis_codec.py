@@ -0,0 +1,40 @@
+"""Test Redis value encoding."""
+
+import json
+
+import pytest
+
+from app.services.redis_codec import MARKER, RedisCodec
+
+REPORT = {"patient": {"name": "Test", "age": 35}, "category_reports": [{"text": "word " * 500}]}
+
+
+def test_round_trip_compresses_above_threshold():
+    """Test large values are compressed and decode back unchanged."""
+    codec = RedisCodec("json", "zlib", threshold=1024)
+    encoded = codec.encode(REPORT)
+
+    assert encoded.startswith(MARKER + b"jz")
+    assert len(encoded) < len(json.dumps(REPORT))
+    assert codec.decode(encoded) == REPORT
+
+
+def test_small_values_stay_uncompressed():
+    """Test values under the threshold are stored without compression."""
+    encoded = RedisCodec("json", "zlib", threshold=1024).encode({"requests": 1})
+
+    assert encoded == MARKER + b'jn{"requests":1}'
+
+
+def test_plain_json_entries_still_decode():
+    """Test values written before the codec (JSON text) are still readable."""
+    codec = RedisCodec("json", "zlib")
+
+    assert codec.decode(json.dumps(REPORT)) == REPORT
+    assert codec.decode(json.dumps(REPORT).encode("utf-8")) == REPORT
+
+
+def test_unknown_codec_rejected():
+    """Test an unsupported compression raises a clear error."""
+    with pytest.raises(ValueError):
+        RedisCodec("json", "lz4")
@@ -0,0 +1,31 @@
+"""Test report storage pagination helpers."""
+
+from datetime import datetime
+
+from app.services.report_storage import (
+    REPORT_SUMMARY_PROJECTION,
+    ReportStorageService,
+)
+
+
+def test_keyset_query_first_page():
+    """Test first page filters by user only."""
+    query = ReportStorageService._keyset_query("user-1", None)
+    assert query == {"user_id": "user-1"}
+
+
+def test_keyset_query_after_cursor():
+    """Test cursor seeks strictly past (created_at, report_id)."""
+    created_at = datetime(2025, 1, 1, 12, 0, 0)
+    query = ReportStorageService._keyset_query("user-1", (created_at, "r-5"))
+
+    assert query["user_id"] == "user-1"
+    assert {"created_at": {"$lt": created_at}} in query["$or"]
+    assert {"created_at": created_at, "report_id": {"$lt": "r-5"}} in query["$or"]
+
+
+def test_summary_projection_excludes_content():
+    """Test summary projection omits heavy report fields."""
+    assert REPORT_SUMMARY_PROJECTION["report_id"] == 1
+    assert "generated_files" not in REPORT_SUMMARY_PROJECTION
+    assert "category_reports.text" not in REPORT_SUMMARY_PROJECTION
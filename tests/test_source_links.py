@@ -0,0 +1,39 @@
+"""Test deterministic sources and inline link validation."""
+
+from app.services.source_links import content_urls, extract_sources, validate_links
+
+CONTENT = (
+    "# Cutting Down\n\n"
+    "Source: https://example.org/alcohol\n\n"
+    "Drink less. [also: https://example.org/drinks, https://example.org/alcohol/]\n\n"
+    "---\n\n"
+    "# Heart Health\n\n"
+    "Source: https://example.org/heart\n\n"
+    "See the [guidelines](https://guidelines.example.org/bp).\n\n"
+    "---\n\n"
+)
+
+
+def test_sources_from_item_lines_and_dedup_annotations():
+    """Test sources come from Source lines and merged duplicates, deduplicated."""
+    assert extract_sources(CONTENT) == [
+        "https://example.org/alcohol",
+        "https://example.org/drinks",
+        "https://example.org/heart",
+    ]
+
+
+def test_unknown_links_are_unlinked():
+    """Test links outside the content are replaced by their label."""
+    text = (
+        "Cut down ([NHS](https://example.org/alcohol/)), check "
+        "[your BP](https://guidelines.example.org/bp) and [this](https://made-up.example.com)."
+    )
+    allowed = extract_sources(CONTENT) + content_urls(CONTENT)
+
+    cleaned, removed = validate_links(text, allowed)
+
+    assert "[NHS](https://example.org/alcohol/)" in cleaned
+    assert "[your BP](https://guidelines.example.org/bp)" in cleaned
+    assert "and this." in cleaned
+    assert removed == ["https://made-up.example.com"]
@@ -0,0 +1,68 @@
+"""Test worker import time against a budget.
+
+Importing the worker runs in a fresh interpreter with ``-X importtime``; the
+per-module breakdown is printed (``pytest -s``) to locate regressions.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Loaded in ReportWorker.startup() or on first use, never at import
+DEFERRED_PACKAGES = {
+    "aio_pika",
+    "httpx",
+    "langchain_core",
+    "langchain_openai",
+    "motor",
+    "openai",
+    "pymongo",
+    "redis",
+    "tiktoken",
+}
+
+WORKER_IMPORT_BUDGET_SECONDS = 1.0
+
+
+def import_times(module: str) -> dict:
+    """Import a module in a fresh interpreter.
+
+    Returns:
+        (self seconds, cumulative seconds) per imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return times
+
+
+def test_worker_import_defers_heavy_packages():
+    """Test importing the worker loads no LLM, database or broker client package."""
+    times = import_times("app.worker")
+
+    loaded = sorted({name.split(".")[0] for name in times} & DEFERRED_PACKAGES)
+    assert loaded == []
+
+
+def test_worker_import_within_budget():
+    """Test the worker module imports within the startup-time budget."""
+    times = import_times("app.worker")
+
+    print(f"\n{'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+    for name, (self_s, cumulative_s) in sorted(times.items(), key=lambda item: -item[1][0])[:20]:
+        print(f"{name:<48} {self_s * 1000:>9.1f} {cumulative_s * 1000:>14.1f}")
+
+    assert times["app.worker"][1] <= WORKER_IMPORT_BUDGET_SECONDS
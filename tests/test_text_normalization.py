@@ -0,0 +1,30 @@
+"""Test knowledge base content normalization."""
+
+from app.utils.text_normalization import normalize_kb_content
+
+
+def test_strips_preamble_and_separators():
+    """Test chat preamble and decorative separators are removed."""
+    content = (
+        "Here is a 400-word plain-language summary of the “Alcohol” guidance:\n\n"
+        "⸻\n\n"
+        "Background\n\n"
+        "Alcohol carries health risks.  ￼\n"
+    )
+    normalized = normalize_kb_content(content)
+
+    assert normalized == "Background\n\nAlcohol carries health risks.\n"
+
+
+def test_normalizes_bullets_and_whitespace():
+    """Test bullet glyphs become markdown bullets and blank runs collapse."""
+    content = "Tips\n\t•\tEat   well\n\n\n\n\t•\tMove more\n"
+    normalized = normalize_kb_content(content)
+
+    assert normalized == "Tips\n- Eat well\n\n- Move more\n"
+
+
+def test_strips_embedded_metadata_block():
+    """Test trailing copy of metadata.json entry is removed."""
+    content = 'Body text.\n\nMetadata\n{\n  "file_name": "x.json",\n  "id": "x"\n}'
+    assert normalize_kb_content(content) == "Body text.\n"
@@ -0,0 +1,69 @@
+"""Test token budget planning."""
+
+import sys
+
+import pytest
+
+from app.services.report_generator import ReportGeneratorService
+from app.services.token_budget import KB_ITEM_SEPARATOR, TokenBudgetPlanner
+from app.utils.tokens import count_tokens, get_encoding
+
+
+def test_small_content_fits():
+    """Test content under budget fits in a single call."""
+    planner = TokenBudgetPlanner(model="gpt-4o", budget=1000, chunk_tokens=200)
+    assert planner.fits("A short piece of guidance.")
+
+
+def test_split_keeps_chunks_within_limit():
+    """Test oversized content is split into chunks under chunk_tokens."""
+    planner = TokenBudgetPlanner(model="gpt-4o", budget=100, chunk_tokens=50)
+    item = "Eat more vegetables and whole grains every day. " * 20
+    content = KB_ITEM_SEPARATOR.join([item, item, "Short item.\n\n"])
+
+    chunks = planner.split(content)
+
+    assert len(chunks) > 1
+    assert all(planner.measure(chunk) <= planner.chunk_tokens for chunk in chunks)
+
+
+def test_budget_for_model_override():
+    """Test per-model budgets override the default budget."""
+    budgets = {"small-model": 1234}
+    assert TokenBudgetPlanner.budget_for_model("small-model", budgets) == 1234
+
+
+def test_counts_offline_without_tiktoken(monkeypatch):
+    """Test token counts fall back to a deterministic estimate when tiktoken cannot load."""
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    get_encoding.cache_clear()
+    try:
+        planner = TokenBudgetPlanner(model="gpt-4o", budget=100, chunk_tokens=10)
+        text = "Walk for thirty minutes after dinner. " * 5
+
+        assert count_tokens(text, "gpt-4o") == count_tokens(text, "gpt-4o") > 0
+        assert "".join(planner._split_tokens(text)) == text
+    finally:
+        get_encoding.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_content_still_over_budget_is_truncated(monkeypatch):
+    """Test content that summaries cannot shrink is cut to the budget."""
+    generator = object.__new__(ReportGeneratorService)
+    generator.planner = TokenBudgetPlanner(model="gpt-4o", budget=50, chunk_tokens=25)
+    calls = []
+
+    async def summarize(chunk, category):
+        # A summary that does not shrink its chunk
+        calls.append(chunk)
+        return chunk
+
+    monkeypatch.setattr(generator, "_summarize_chunk", summarize)
+    content = "Eat more vegetables and whole grains every day. " * 40
+
+    fitted = await generator.fit_to_budget(content, "nutrition")
+
+    assert generator.planner.measure(fitted) <= generator.planner.budget
+    assert fitted.startswith("Eat more vegetables")
+    assert len(calls) > 0
@@ -0,0 +1,200 @@
+"""Test the two-tier cache against an in-memory Redis."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.redis_codec import RedisCodec
+from app.services.two_tier_cache import LocalCache, TwoTierCache
+
+settings = get_settings()
+
+
+class FakePipeline:
+    """Queue commands and run them on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.commands.append(lambda: self.redis.setex(key, ttl, value))
+
+    def delete(self, *keys):
+        self.commands.append(lambda: self.redis.delete(*keys))
+
+    def publish(self, channel, message):
+        self.commands.append(lambda: self.redis.publish(channel, message))
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakePubSub:
+    """Subscription delivering published messages through a queue."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+        self.queue.put_nowait({"type": "subscribe", "data": 1})
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self):
+        for queues in self.redis.subscribers.values():
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class FakeRedis:
+    """The subset of redis.asyncio.Redis the cache uses, in memory."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.subscribers = {}
+        self.mget_calls = 0
+
+    async def mget(self, keys):
+        self.mget_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "data": message})
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+def _cache(redis, **kwargs):
+    """Build a cache over a fake Redis service."""
+    service = SimpleNamespace(client=redis, codec=RedisCodec("json", "none"))
+    return TwoTierCache(redis=service, max_bytes=1024 * 1024, **kwargs)
+
+
+async def _deliver():
+    """Let listener tasks process published messages."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_evicts_least_recently_used_over_max_bytes():
+    """Test the cache stays within its byte budget, evicting the oldest unused entry."""
+    cache = LocalCache(max_bytes=100)
+    cache.put("a", 1, 40, ttl=60)
+    cache.put("b", 2, 40, ttl=60)
+    cache.get("a")
+    cache.put("c", 3, 40, ttl=60)
+
+    assert cache.get("a") == (True, 1)
+    assert cache.get("b") == (False, None)
+    assert cache.bytes == 80
+    assert cache.evictions == 1
+
+
+def test_expired_and_oversized_entries_not_served():
+    """Test expired entries are dropped and values larger than the cache are not stored."""
+    cache = LocalCache(max_bytes=100)
+    cache.put("old", 1, 10, ttl=0.01)
+    cache.put("huge", 2, 500, ttl=60)
+    time.sleep(0.02)
+
+    assert cache.get("old") == (False, None)
+    assert cache.get("huge") == (False, None)
+    assert cache.bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_backfills_local_tier():
+    """Test a local miss is read from Redis once, then served locally."""
+    redis = FakeRedis()
+    await _cache(redis).set_many("guide", {"alcohol:v1": {"text": "Drink less"}})
+    cache = _cache(redis)
+
+    assert await cache.get("guide", "alcohol:v1") == {"text": "Drink less"}
+    assert await cache.get("guide", "alcohol:v1") == {"text": "Drink less"}
+
+    assert redis.mget_calls == 1
+    assert cache.stats()["redis_hits"] == 1
+    assert cache.stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_keys_negatively_cached():
+    """Test a Redis miss is remembered locally for the negative TTL."""
+    redis = FakeRedis()
+    cache = _cache(redis, negative_ttl=30)
+
+    assert await cache.get_many("guide", ["alcohol:v1", "sleep:v1"]) == {}
+    assert await cache.get_many("guide", ["alcohol:v1", "sleep:v1"]) == {}
+
+    assert redis.mget_calls == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["negative_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_ttl_per_namespace():
+    """Test writes use their namespace's Redis TTL, falling back to the default."""
+    redis = FakeRedis()
+    cache = _cache(redis, namespace_ttls={"guide": 123})
+
+    await cache.set("guide", "alcohol:v1", {"text": "Guide"})
+    await cache.set("misc", "key", {"text": "Other"})
+
+    assert redis.ttls["guide:alcohol:v1"] == 123
+    assert redis.ttls["misc:key"] == settings.redis_cache_ttl
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_other_processes():
+    """Test a write drops other caches' local copies but not the writer's own."""
+    redis = FakeRedis()
+    writer, reader = _cache(redis), _cache(redis)
+    await writer.start()
+    await reader.start()
+    await _deliver()
+    try:
+        await writer.set("guide", "alcohol:v1", {"text": "Old"})
+        await _deliver()
+        assert await reader.get("guide", "alcohol:v1") == {"text": "Old"}
+
+        await writer.set("guide", "alcohol:v1", {"text": "New"})
+        await _deliver()
+
+        assert await reader.get("guide", "alcohol:v1") == {"text": "New"}
+        assert reader.stats()["redis_hits"] == 2
+        assert reader.stats()["invalidations_received"] == 2
+
+        assert await writer.get("guide", "alcohol:v1") == {"text": "New"}
+        assert writer.stats()["local_hits"] == 1
+        assert writer.stats()["invalidations_received"] == 0
+    finally:
+        await writer.stop()
+        await reader.stop()
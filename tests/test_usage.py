@@ -0,0 +1,39 @@
+"""Test token usage and cost accounting."""
+
+import asyncio
+
+import pytest
+
+from app.services.usage import estimate_cost, get_price, record_usage, track_usage, worker_usage
+
+
+def test_dated_model_uses_longest_prefix_price():
+    """Test dated model names are priced as their base model."""
+    assert get_price("gpt-4o-mini-2024-07-18") == get_price("gpt-4o-mini")
+    assert get_price("gpt-4o-2024-08-06") == get_price("gpt-4o")
+
+
+def test_cached_tokens_are_discounted():
+    """Test cached prompt tokens cost less than uncached ones."""
+    full = estimate_cost("gpt-4o", 1_000_000, 0)
+    cached = estimate_cost("gpt-4o", 1_000_000, 0, cached_tokens=1_000_000)
+
+    assert full == pytest.approx(2.50)
+    assert cached == pytest.approx(1.25)
+
+
+@pytest.mark.asyncio
+async def test_request_usage_includes_concurrent_calls():
+    """Test calls made in tasks inside track_usage count for the request."""
+    before = worker_usage.calls
+
+    async def call():
+        record_usage("gpt-4o", {"input_tokens": 100, "output_tokens": 20})
+
+    with track_usage() as usage:
+        await asyncio.gather(call(), call())
+    record_usage("gpt-4o", {"input_tokens": 5, "output_tokens": 5})
+
+    assert usage.calls == 2
+    assert usage.total_tokens == 240
+    assert worker_usage.calls == before + 3